@@ -0,0 +1,132 @@
+import hashlib
+import math
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+CATALOG_VERSION_KEY = "books:catalog-version"
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+
+
+def bump_catalog_version():
+    # Whole seconds like `Last-Modified`, one more than the last version
+    # so a second change within the same second is not a 304
+    modified = math.ceil(time.time())
+    previous = cache.get(CATALOG_VERSION_KEY)
+    if previous is not None:
+        modified = max(modified, previous[1] + 1)
+    version = (uuid.uuid4().hex, modified)
+    cache.set(CATALOG_VERSION_KEY, version, None)
+    return version
+
+
+def get_catalog_version():
+    """Return `(token, modified timestamp)` of the current catalog."""
+    return cache.get(CATALOG_VERSION_KEY) or bump_catalog_version()
+
+
+async def aget_catalog_version():
+    return (
+        await cache.aget(CATALOG_VERSION_KEY)
+        or await sync_to_async(bump_catalog_version)()
+    )
+
+
+def invalidate_catalog():
+    """
+    Bump the catalog version right away and once more after commit,
+    so a response rendered from not yet committed rows is never reused.
+    """
+    bump_catalog_version()
+    transaction.on_commit(bump_catalog_version)
+
+
+class CatalogCacheMixin:
+    """
+    Cache `list` and `retrieve` responses under the catalog version
+    and answer conditional GETs with 304 without touching the database.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, super().retrieve, *args, **kwargs
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(
+            request, super().alist, *args, **kwargs
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response(
+            request, super().aretrieve, *args, **kwargs
+        )
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        cache_key, headers, not_modified = self.get_validators(
+            request, get_catalog_version()
+        )
+        if not_modified is not None:
+            return not_modified
+
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data, headers=headers)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(cache_key, response.data, RESPONSE_CACHE_TIMEOUT)
+            for header, value in headers.items():
+                response[header] = value
+        return response
+
+    async def acached_response(self, request, handler, *args, **kwargs):
+        cache_key, headers, not_modified = self.get_validators(
+            request, await aget_catalog_version()
+        )
+        if not_modified is not None:
+            return not_modified
+
+        data = await cache.aget(cache_key)
+        if data is not None:
+            return Response(data, headers=headers)
+
+        response = await handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            await cache.aset(cache_key, response.data, RESPONSE_CACHE_TIMEOUT)
+            for header, value in headers.items():
+                response[header] = value
+        return response
+
+    @staticmethod
+    def get_validators(request, version):
+        """
+        Return the response cache key and validator headers of the
+        catalog `version`, and a 304 response when they match.
+        """
+        token, modified = version
+        etag = '"{}"'.format(
+            hashlib.md5(
+                f"{token}:{request.accepted_media_type}:"
+                f"{request.get_full_path()}".encode()
+            ).hexdigest()
+        )
+        headers = {"ETag": etag, "Last-Modified": http_date(modified)}
+
+        # `If-None-Match` takes precedence over `If-Modified-Since`
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=modified
+        )
+        if not_modified is not None:
+            for header, value in headers.items():
+                not_modified[header] = value
+        return f"books:response:{etag}", headers, not_modified
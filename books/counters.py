@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+
+from books.models import Book
+from borrowings.models import Borrowing
+
+RECONCILE_CHUNK_SIZE = 1000
+
+# Counters of one chunk of books recounted from their borrowings,
+# only the drifted rows are written
+RECONCILE_CHUNK_SQL = """
+    WITH chunk AS (
+        SELECT
+            book.id,
+            count(borrowing.id) AS total,
+            count(borrowing.id) FILTER (
+                WHERE borrowing.actual_return_date IS NULL
+            ) AS active
+        FROM {book} AS book
+        LEFT JOIN {borrowing} AS borrowing ON borrowing.book_id = book.id
+        WHERE book.id = ANY(%(ids)s)
+        GROUP BY book.id
+    )
+    UPDATE {book} AS book
+    SET total_borrows = chunk.total, active_borrows = chunk.active
+    FROM chunk
+    WHERE book.id = chunk.id
+        AND (book.total_borrows, book.active_borrows)
+            IS DISTINCT FROM (chunk.total, chunk.active)
+"""
+
+
+@dataclass
+class Reconciliation:
+    books: int = 0
+    repaired: int = 0
+    chunks: int = 0
+
+
+def reconcile_book_counters(chunk_size=RECONCILE_CHUNK_SIZE):
+    """
+    Recount `Book.total_borrows` and `Book.active_borrows` from the
+    borrowings and repair the books whose counters drifted.
+
+    Every chunk of books is locked and recounted in a transaction of
+    its own, so borrows and returns of those books wait for the
+    recount instead of being overwritten by it.
+    """
+    reconciliation = Reconciliation()
+    sql = RECONCILE_CHUNK_SQL.format(
+        book=Book._meta.db_table, borrowing=Borrowing._meta.db_table
+    )
+    after = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                Book.objects.select_for_update()
+                .filter(pk__gt=after)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            with connection.cursor() as cursor:
+                cursor.execute(sql, {"ids": ids})
+                reconciliation.repaired += cursor.rowcount
+        reconciliation.books += len(ids)
+        reconciliation.chunks += 1
+        after = ids[-1]
+    return reconciliation
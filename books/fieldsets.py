@@ -0,0 +1,92 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def get_requested_fields(request):
+    """Names from `?fields=id,title` of a GET request, or None."""
+    if request is None or request.method != "GET":
+        return None
+    fields = request.query_params.get("fields")
+    if not fields:
+        return None
+    return {name.strip() for name in fields.split(",") if name.strip()}
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Serialize only the fields listed in `?fields=`.
+    Unknown names are ignored, all fields are kept
+    when none of the listed names is known.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = get_requested_fields(self.context.get("request"))
+        if requested and requested & set(self.fields):
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
+class SparseFieldsetMixin:
+    """
+    Load only the columns the sparse serializer needs in `list`
+    and `retrieve`, and join only the requested related models.
+    """
+
+    sparse_fieldset_actions = ("list", "retrieve")
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if (
+            self.action not in self.sparse_fieldset_actions
+            or not get_requested_fields(self.request)
+        ):
+            return queryset
+
+        paths, related = self.get_field_paths(self.get_serializer().fields)
+        model_fields = {
+            field.name for field in queryset.model._meta.concrete_fields
+        }
+        # Keep the keyset pagination key loaded to build the cursor
+        for name in getattr(self.paginator, "ordering", None) or ():
+            if name.lstrip("-") in model_fields:
+                paths.add(name.lstrip("-"))
+
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        # Annotations are selected anyway and can not be deferred
+        return queryset.only(
+            "pk",
+            *(path for path in paths if self.is_column(queryset.model, path)),
+        )
+
+    @staticmethod
+    def is_column(model, path):
+        """Whether `path` leads to a concrete model field."""
+        *relations, name = path.split("__")
+        try:
+            for relation in relations:
+                model = model._meta.get_field(relation).related_model
+            return model._meta.get_field(name).concrete
+        except FieldDoesNotExist:
+            return False
+
+    @staticmethod
+    def get_field_paths(fields):
+        """Map serializer fields to `.only()` paths and relations."""
+        paths, related = set(), set()
+        for field in fields.values():
+            path = field.source.replace(".", "__")
+            if isinstance(field, serializers.BaseSerializer):
+                related.add(path)
+                paths.update(
+                    f"{path}__{child.source.replace('.', '__')}"
+                    for child in field.fields.values()
+                )
+            elif "__" in path:
+                related.add(path.rsplit("__", 1)[0])
+                paths.add(path)
+            else:
+                paths.add(path)
+        return paths, related
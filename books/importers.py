@@ -0,0 +1,160 @@
+import csv
+import json
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+
+from books.cache import invalidate_catalog
+from books.models import Book
+
+FILE_FORMATS = ("csv", "jsonl")
+# Files are decoded with `errors="replace"`, rows with it are invalid
+REPLACEMENT_CHARACTER = "\ufffd"
+INVALID_ENCODING = "Invalid UTF-8 text"
+
+
+def read_rows(lines, file_format):
+    """
+    Yield `(line number, row dict or None, parse error or None)`
+    from an iterable of text lines, one row at a time.
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            if any(
+                REPLACEMENT_CHARACTER in value
+                for value in row.values()
+                if isinstance(value, str)
+            ):
+                yield reader.line_num, None, INVALID_ENCODING
+                continue
+            yield reader.line_num, row, None
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        if REPLACEMENT_CHARACTER in line:
+            yield line_number, None, INVALID_ENCODING
+            continue
+        try:
+            row = json.loads(line, parse_float=Decimal)
+        except ValueError as error:
+            yield line_number, None, f"Invalid JSON: {error}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, row, None
+
+
+class BookImporter:
+    """
+    Validate books with the `Book` field rules and write them
+    in batches through COPY. In upsert mode books with the same
+    title and author are updated instead of duplicated.
+    """
+
+    fields = ("title", "author", "cover", "inventory", "daily_fee")
+
+    def __init__(self, upsert=False, batch_size=5000, on_error=None):
+        self.upsert = upsert
+        self.batch_size = batch_size
+        self.on_error = on_error
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+
+    def run(self, lines, file_format):
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"Unsupported format `{file_format}`")
+
+        batch = []
+        for line_number, row, error in read_rows(lines, file_format):
+            try:
+                if error:
+                    raise ValidationError(error)
+                batch.append(self.clean(row))
+            except ValidationError as error:
+                self.failed += 1
+                if self.on_error:
+                    self.on_error(line_number, self.format_error(error))
+                continue
+
+            if len(batch) >= self.batch_size:
+                self.write(batch)
+                batch = []
+        if batch:
+            self.write(batch)
+
+        invalidate_catalog()
+        return self
+
+    def clean(self, row):
+        values, errors = [], {}
+        for name in self.fields:
+            field = Book._meta.get_field(name)
+            try:
+                values.append(field.clean(row.get(name), None))
+            except ValidationError as error:
+                errors[name] = error.messages
+        if errors:
+            raise ValidationError(errors)
+        return values
+
+    @staticmethod
+    def format_error(error):
+        if hasattr(error, "error_dict"):
+            return error.message_dict
+        return {"non_field_errors": error.messages}
+
+    def write(self, batch):
+        with transaction.atomic(), connection.cursor() as cursor:
+            if self.upsert:
+                self.upsert_batch(cursor, batch)
+            else:
+                self.copy(cursor, Book._meta.db_table, batch)
+                self.created += len(batch)
+
+    def copy(self, cursor, table, batch):
+        columns = ", ".join(self.fields)
+        with cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+            for values in batch:
+                copy.write_row(values)
+
+    def upsert_batch(self, cursor, batch):
+        table = Book._meta.db_table
+        columns = ", ".join(self.fields)
+        cursor.execute(
+            "CREATE TEMP TABLE book_import ("
+            "position serial, title varchar(255), author varchar(255), "
+            "cover varchar(63), inventory integer, "
+            "daily_fee numeric(10, 2)"
+            ")"
+        )
+        self.copy(cursor, "book_import", batch)
+        # The last row wins when the batch repeats a title and author
+        cursor.execute(
+            "CREATE TEMP TABLE book_import_latest AS "
+            "SELECT DISTINCT ON (title, author) * FROM book_import "
+            "ORDER BY title, author, position DESC"
+        )
+        cursor.execute(
+            f"UPDATE {table} AS book "
+            "SET cover = latest.cover, inventory = latest.inventory, "
+            "daily_fee = latest.daily_fee "
+            "FROM book_import_latest AS latest "
+            "WHERE book.title = latest.title "
+            "AND book.author = latest.author"
+        )
+        self.updated += cursor.rowcount
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) "
+            f"SELECT {columns} FROM book_import_latest AS latest "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {table} AS book "
+            "WHERE book.title = latest.title "
+            "AND book.author = latest.author)"
+        )
+        self.created += cursor.rowcount
+        cursor.execute("DROP TABLE book_import, book_import_latest")
@@ -0,0 +1,110 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from books.models import Book
+from books.serializers import BookListSerializer
+from borrowings.models import Borrowing
+
+SEED_SQL = """
+    WITH books AS (
+        INSERT INTO {book} (title, author, cover, inventory, daily_fee)
+        SELECT 'Book ' || i, 'Author ' || i %% 100, 'Soft', 0, 1
+        FROM generate_series(1, %(books)s) AS i
+        RETURNING id
+    ),
+    users AS (
+        INSERT INTO {user} (
+            email, password, is_superuser, is_staff, is_active,
+            first_name, last_name, date_joined
+        )
+        SELECT
+            'availability' || i || '@benchmark.test', '!', false, false,
+            true, '', '', now()
+        FROM generate_series(1, %(borrowings)s) AS i
+        RETURNING id
+    )
+    INSERT INTO {borrowing} (
+        user_id, book_id, borrow_date, expected_return_date
+    )
+    SELECT
+        users.id,
+        books.id,
+        current_date,
+        current_date + (random() * 30)::int
+    FROM books CROSS JOIN users
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare `next_available_date` from one annotated subquery with "
+        "a query per book on a page of a throwaway out of stock catalog"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=10000)
+        parser.add_argument(
+            "--borrowings",
+            type=int,
+            default=20,
+            help="Active borrowings of every book",
+        )
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    SEED_SQL.format(
+                        book=Book._meta.db_table,
+                        user=get_user_model()._meta.db_table,
+                        borrowing=Borrowing._meta.db_table,
+                    ),
+                    {
+                        "books": options["books"],
+                        "borrowings": options["borrowings"],
+                    },
+                )
+                cursor.execute(f"ANALYZE {Borrowing._meta.db_table}")
+            page = slice(0, options["page_size"])
+
+            def annotated():
+                books = Book.objects.with_next_available_date()[page]
+                return BookListSerializer(books, many=True).data
+
+            def per_book():
+                data = BookListSerializer(Book.objects.all()[page], many=True)
+                for book in data.data:
+                    book["next_available_date"] = (
+                        Borrowing.objects.filter(
+                            book_id=book["id"], actual_return_date__isnull=True
+                        )
+                        .order_by("expected_return_date")
+                        .values_list("expected_return_date", flat=True)
+                        .first()
+                    )
+                return data.data
+
+            self.benchmark("annotated subquery", annotated, options)
+            self.benchmark("query per book", per_book, options)
+            transaction.set_rollback(True)
+
+    def benchmark(self, label, render, options):
+        timings = []
+        for _ in range(options["repeat"]):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                render()
+                timings.append(time.perf_counter() - started)
+        timings.sort()
+        median = timings[len(timings) // 2]
+
+        self.stdout.write(
+            f"{label:<20} median {median * 1000:8.2f}ms, "
+            f"{len(queries)} queries for {options['page_size']} books"
+        )
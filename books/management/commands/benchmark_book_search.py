@@ -0,0 +1,134 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from books.models import Book
+from books.views import SUGGEST_LIMIT
+
+WORDS = [
+    "shadow", "river", "crown", "garden", "winter", "silent", "empire",
+    "secret", "ocean", "fire", "glass", "iron", "forest", "night", "storm",
+    "golden", "last", "lost", "hidden", "dragon", "kingdom", "mountain",
+    "dream", "journey", "city", "light", "stone", "wolf", "star", "house",
+    "island", "memory", "blood", "sea", "war", "peace", "heart", "road",
+]
+FIRST_NAMES = [
+    "John", "Mary", "Agatha", "George", "Ursula", "Isaac", "Jane", "Leo",
+    "Virginia", "Ernest", "Terry", "Neil", "Toni", "Haruki", "Arthur",
+]
+LAST_NAMES = [
+    "Tolkien", "Christie", "Orwell", "Le Guin", "Asimov", "Austen",
+    "Tolstoy", "Woolf", "Hemingway", "Pratchett", "Gaiman", "Morrison",
+    "Murakami", "Clarke", "Shelley", "Dickens", "Bradbury", "Atwood",
+]
+
+SEED_SQL = """
+    INSERT INTO books_book (title, author, cover, inventory, daily_fee)
+    SELECT
+        initcap(
+            (%(words)s::text[])[1 + (random() * 1000)::int %% %(n_words)s]
+            || ' ' ||
+            (%(words)s::text[])[1 + (random() * 1000)::int %% %(n_words)s]
+            || ' ' ||
+            (%(words)s::text[])[1 + (random() * 1000)::int %% %(n_words)s]
+        ) || ' ' || i,
+        (%(first)s::text[])[1 + (random() * 1000)::int %% %(n_first)s]
+        || ' ' ||
+        (%(last)s::text[])[1 + (random() * 1000)::int %% %(n_last)s],
+        CASE WHEN i %% 2 = 0 THEN 'Soft' ELSE 'Hard' END,
+        (random() * 10)::int,
+        round((random() * 5)::numeric, 2)
+    FROM generate_series(1, %(books)s) AS i
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway catalog and show timings and query plans "
+        "of the book full-text search and suggestions"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=1_000_000)
+        parser.add_argument(
+            "--query",
+            action="append",
+            dest="queries",
+            help="Search text to benchmark, can be repeated",
+        )
+        parser.add_argument(
+            "--suggest",
+            action="append",
+            dest="prefixes",
+            help="Typed prefix to benchmark suggestions for, can be repeated",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Commit the seeded books instead of rolling them back",
+        )
+
+    def handle(self, *args, **options):
+        queries = options["queries"] or [
+            "tolkien",
+            "dragon kingdom",
+            "asimov -storm",
+            "tolkien 424242",
+        ]
+        prefixes = options["prefixes"] or ["tolk", "tolkein", "dragn kin"]
+        with transaction.atomic():
+            self.seed(options["books"])
+            for text in queries:
+                self.benchmark(
+                    f"?q={text}",
+                    Book.objects.search(text).values("id", "title")[:5],
+                    options["repeat"],
+                )
+            for text in prefixes:
+                self.benchmark(
+                    f"suggest/?q={text}",
+                    Book.objects.suggest(text, SUGGEST_LIMIT),
+                    options["repeat"],
+                )
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+    def seed(self, books):
+        self.stdout.write(f"Seeding {books} books...")
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                SEED_SQL,
+                {
+                    "words": WORDS,
+                    "n_words": len(WORDS),
+                    "first": FIRST_NAMES,
+                    "n_first": len(FIRST_NAMES),
+                    "last": LAST_NAMES,
+                    "n_last": len(LAST_NAMES),
+                    "books": books,
+                },
+            )
+            cursor.execute("ANALYZE books_book")
+        self.stdout.write(
+            f"Seeded in {time.perf_counter() - started:.1f}s, "
+            f"catalog size: {Book.objects.count()}"
+        )
+
+    def benchmark(self, label, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = list(queryset.all())
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{label}"))
+        self.stdout.write(
+            f"rows: {len(results)}, "
+            f"median {timings[len(timings) // 2] * 1000:.2f}ms, "
+            f"max {timings[-1] * 1000:.2f}ms"
+        )
+        self.stdout.write(queryset.explain(analyze=True, buffers=True))
@@ -0,0 +1,85 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from books.fastpath import build_rows, get_values_plan
+from books.models import Book
+from books.renderers import ORJSONRenderer
+from books.serializers import BookSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare serializer + JSONRenderer with the `.values()` fast path "
+        "+ orjson on a throwaway catalog"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            Book.objects.bulk_create(
+                Book(
+                    title=f"Book {i}",
+                    author=f"Author {i % 100}",
+                    cover="Soft" if i % 2 else "Hard",
+                    inventory=i % 10,
+                    daily_fee=Decimal(i % 500) / 100,
+                )
+                for i in range(options["books"])
+            )
+            queryset = Book.objects.order_by("id")
+            plan = get_values_plan(BookSerializer().fields)
+            keys = [key for _, key, _ in plan]
+
+            serialized = BookSerializer(queryset, many=True).data
+            fast = build_rows(queryset.values(*keys), plan)
+            if JSONRenderer().render(serialized) != ORJSONRenderer().render(
+                fast
+            ):
+                self.stderr.write("The fast path output differs")
+
+            self.benchmark(
+                "serializer + JSONRenderer",
+                lambda: JSONRenderer().render(
+                    BookSerializer(queryset.all(), many=True).data
+                ),
+                options,
+            )
+            self.benchmark(
+                "values() + ORJSONRenderer",
+                lambda: ORJSONRenderer().render(
+                    build_rows(queryset.values(*keys), plan)
+                ),
+                options,
+            )
+            self.benchmark(
+                "JSONRenderer only",
+                lambda: JSONRenderer().render(fast),
+                options,
+            )
+            self.benchmark(
+                "ORJSONRenderer only",
+                lambda: ORJSONRenderer().render(fast),
+                options,
+            )
+            transaction.set_rollback(True)
+
+    def benchmark(self, label, render, options):
+        timings = []
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        median = timings[len(timings) // 2]
+
+        self.stdout.write(
+            f"{label:<28} median {median * 1000:8.2f}ms, "
+            f"{options['books'] / median:,.0f} rows/s"
+        )
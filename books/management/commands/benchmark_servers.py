@@ -0,0 +1,170 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+import aiohttp
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from books.models import Book
+from borrowings.models import Borrowing
+
+SERVERS = {
+    "wsgi": [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        "library_service.wsgi",
+        "--bind=127.0.0.1:{port}",
+        "--workers={workers}",
+    ],
+    "asgi": [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "library_service.asgi:application",
+        "--port={port}",
+        "--workers={workers}",
+        "--no-access-log",
+        "--log-level=warning",
+    ],
+}
+STARTUP_TIMEOUT = 30
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec and latency percentiles of the book and "
+        "borrowing reads under gunicorn (WSGI) and uvicorn (ASGI) with the "
+        "same number of worker processes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=5000)
+        parser.add_argument("--concurrency", type=int, default=200)
+        parser.add_argument("--port", type=int, default=8100)
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument(
+            "--servers",
+            nargs="+",
+            choices=tuple(SERVERS),
+            default=list(SERVERS),
+        )
+
+    def handle(self, *args, **options):
+        book = Book.objects.order_by("id").first()
+        if book is None:
+            raise CommandError("Import some books first")
+
+        paths = [
+            "/api/v1/books/?pagination=cursor",
+            f"/api/v1/books/{book.id}/",
+            "/api/v1/borrowings/?pagination=cursor",
+        ]
+        borrowing = Borrowing.objects.order_by("id").first()
+        if borrowing is not None:
+            paths.append(f"/api/v1/borrowings/{borrowing.id}/")
+
+        # A staff user reads the borrowings of all users
+        user = get_user_model().objects.create_user(
+            email=f"benchmark-{uuid.uuid4().hex}@test.com", is_staff=True
+        )
+        try:
+            token = RefreshToken.for_user(user).access_token
+            headers = {"Authorize": f"Bearer {token}"}
+            for server in options["servers"]:
+                self.benchmark(server, paths, headers, options)
+        finally:
+            user.delete()
+
+    def benchmark(self, server, paths, headers, options):
+        process = subprocess.Popen(
+            [
+                arg.format(port=options["port"], workers=options["workers"])
+                for arg in SERVERS[server]
+            ],
+            cwd=settings.BASE_DIR,
+            # Without DEBUG and the debug toolbar, like in production
+            env={
+                **os.environ,
+                "DEBUG": "False",
+                "ALLOWED_HOSTS": "127.0.0.1",
+            },
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            self.wait_for_port(options["port"])
+            for path in paths:
+                url = f"http://127.0.0.1:{options['port']}{path}"
+                latencies, errors, elapsed = asyncio.run(
+                    self.load(url, headers, options)
+                )
+                latencies.sort()
+                self.stdout.write(
+                    f"{server} {path:<36} "
+                    f"{len(latencies) / elapsed:>7.0f} req/s  "
+                    f"p50 {self.percentile(latencies, 50):>7.1f}ms  "
+                    f"p99 {self.percentile(latencies, 99):>7.1f}ms  "
+                    f"errors {errors}"
+                )
+        finally:
+            process.terminate()
+            process.wait()
+
+    @staticmethod
+    def wait_for_port(port):
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection(("127.0.0.1", port), 1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"The server did not start on port {port}")
+
+    @staticmethod
+    async def load(url, headers, options):
+        """Send `--requests` GETs from `--concurrency` clients."""
+        latencies, errors = [], 0
+        remaining = options["requests"]
+        connector = aiohttp.TCPConnector(limit=options["concurrency"])
+
+        async def client(session):
+            nonlocal errors, remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    async with session.get(url, headers=headers) as response:
+                        await response.read()
+                        ok = response.status == 200
+                except aiohttp.ClientError:
+                    ok = False
+                if ok:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors += 1
+
+        async with aiohttp.ClientSession(connector=connector) as session:
+            # Warm up the caches and the connections of the worker
+            async with session.get(url, headers=headers) as response:
+                await response.read()
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(client(session) for _ in range(options["concurrency"]))
+            )
+            return latencies, errors, time.perf_counter() - started
+
+    @staticmethod
+    def percentile(latencies, percent):
+        if not latencies:
+            return 0.0
+        index = min(len(latencies) - 1, len(latencies) * percent // 100)
+        return latencies[index]
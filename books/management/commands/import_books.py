@@ -0,0 +1,56 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books.importers import BookImporter, FILE_FORMATS
+
+
+class Command(BaseCommand):
+    help = "Import books from a CSV or JSONL file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, `-` for stdin")
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=FILE_FORMATS,
+            help="File format, guessed from the file extension by default",
+        )
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help="Update books with the same title and author",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["file_format"] or path.rsplit(".", 1)[-1]
+        if file_format == "ndjson":
+            file_format = "jsonl"
+        if file_format not in FILE_FORMATS:
+            raise CommandError("Use --format to set the file format")
+
+        importer = BookImporter(
+            upsert=options["upsert"],
+            batch_size=options["batch_size"],
+            on_error=self.report_error,
+        )
+        if path == "-":
+            importer.run(sys.stdin, file_format)
+        else:
+            with open(
+                path, newline="", encoding="utf-8-sig", errors="replace"
+            ) as file:
+                importer.run(file, file_format)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created: {importer.created}, updated: {importer.updated}, "
+                f"failed: {importer.failed}"
+            )
+        )
+
+    def report_error(self, line, errors):
+        self.stderr.write(f"Line {line}: {json.dumps(errors)}")
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from books.cache import invalidate_catalog
+from books.counters import RECONCILE_CHUNK_SIZE, reconcile_book_counters
+
+
+class Command(BaseCommand):
+    help = "Repair drifted borrow counters of books from their borrowings"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=RECONCILE_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        reconciliation = reconcile_book_counters(options["chunk_size"])
+        if reconciliation.repaired:
+            invalidate_catalog()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{reconciliation.repaired} of {reconciliation.books} "
+                f"books repaired in {reconciliation.chunks} chunks "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        )
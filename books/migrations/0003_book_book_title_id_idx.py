@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:51
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the index without locking writes to the books table
+    atomic = False
+
+    dependencies = [
+        ("books", "0002_alter_book_inventory"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="book",
+            index=models.Index(fields=["title", "id"], name="book_title_id_idx"),
+        ),
+    ]
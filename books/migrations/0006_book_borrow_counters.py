@@ -0,0 +1,58 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:16
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+BACKFILL_SQL = """
+    UPDATE books_book AS book
+    SET total_borrows = counts.total, active_borrows = counts.active
+    FROM (
+        SELECT
+            book_id,
+            count(*) AS total,
+            count(*) FILTER (WHERE actual_return_date IS NULL) AS active
+        FROM borrowings_borrowing
+        GROUP BY book_id
+    ) AS counts
+    WHERE book.id = counts.book_id
+"""
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking writes to the books table
+    atomic = False
+
+    dependencies = [
+        ("books", "0005_book_trigram_indexes"),
+        ("borrowings", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="active_borrows",
+            field=models.PositiveIntegerField(
+                db_default=0, default=0, editable=False
+            ),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="total_borrows",
+            field=models.PositiveIntegerField(
+                db_default=0, default=0, editable=False
+            ),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+        AddIndexConcurrently(
+            model_name="book",
+            index=models.Index(
+                fields=["total_borrows", "id"], name="book_popularity_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="book",
+            index=models.Index(
+                fields=["active_borrows", "id"], name="book_active_borrows_idx"
+            ),
+        ),
+    ]
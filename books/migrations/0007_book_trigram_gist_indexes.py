@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:36
+
+from django.contrib.postgres.indexes import GistIndex
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking writes to the books table,
+    # suggestions keep the GIN indexes until the GiST ones are ready
+    atomic = False
+
+    dependencies = [
+        ("books", "0006_book_borrow_counters"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="book",
+            index=GistIndex(
+                fields=["title"],
+                name="book_title_trgm_gist_idx",
+                opclasses=["gist_trgm_ops"],
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="book",
+            index=GistIndex(
+                fields=["author"],
+                name="book_author_trgm_gist_idx",
+                opclasses=["gist_trgm_ops"],
+            ),
+        ),
+        RemoveIndexConcurrently(
+            model_name="book",
+            name="book_title_trgm_idx",
+        ),
+        RemoveIndexConcurrently(
+            model_name="book",
+            name="book_author_trgm_idx",
+        ),
+    ]
@@ -1,5 +1,97 @@
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+    TrigramWordDistance,
+    TrigramWordSimilarity,
+)
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models.functions import Cast, Greatest
+
+
+class BookQuerySet(models.QuerySet):
+    def check_out(self):
+        """Take a copy of the books and count the borrowing."""
+        return self.update(
+            inventory=models.F("inventory") - 1,
+            total_borrows=models.F("total_borrows") + 1,
+            active_borrows=models.F("active_borrows") + 1,
+        )
+
+    def check_in(self):
+        """Put a returned copy of the books back."""
+        return self.update(
+            inventory=models.F("inventory") + 1,
+            # Borrowings made around the counters must not break returns
+            active_borrows=Greatest(models.F("active_borrows") - 1, 0),
+        )
+
+    def search(self, text):
+        """Full-text search by title and author, most relevant first."""
+        query = SearchQuery(text, config="english", search_type="websearch")
+        # `ts_rank` returns a real, cast it so the rank survives a round trip
+        # through a pagination cursor without losing precision
+        rank = Cast(
+            SearchRank(models.F("search_vector"), query), models.FloatField()
+        )
+        return (
+            self.filter(search_vector=query)
+            .annotate(rank=rank)
+            .order_by("-rank", "title", "id")
+        )
+
+    def with_next_available_date(self):
+        """
+        Annotate books out of inventory with the earliest expected
+        return date of their borrowed copies, in one subquery.
+        """
+        borrowing = self.model._meta.get_field("borrowings").related_model
+        returns = (
+            borrowing.objects.filter(
+                book=models.OuterRef("pk"), actual_return_date__isnull=True
+            )
+            .order_by("expected_return_date")
+            .values("expected_return_date")[:1]
+        )
+        return self.annotate(
+            next_available_date=models.Case(
+                models.When(inventory=0, then=models.Subquery(returns)),
+                output_field=models.DateField(),
+            )
+        )
+
+    def suggest(self, text, limit, threshold=0.5):
+        """
+        Typo-tolerant prefix matches by title or author, closest first,
+        for autocomplete. The `limit` closest titles and authors are read
+        in distance order from the GiST trigram indexes, so a very common
+        word does not rank half the catalog. Books as close as the last
+        of them are taken in index order.
+        """
+        closest = [
+            self.values("id").order_by(distance)[:limit]
+            for distance in (
+                TrigramWordDistance(text, "title"),
+                TrigramWordDistance(text, "author"),
+            )
+        ]
+        return (
+            self.filter(id__in=closest[0].union(closest[1]))
+            .annotate(
+                similarity=Greatest(
+                    TrigramWordSimilarity(text, "title"),
+                    TrigramWordSimilarity(text, "author"),
+                )
+            )
+            # Lower than the default `pg_trgm.word_similarity_threshold`
+            # to tolerate a typo in short words
+            .filter(similarity__gte=threshold)
+            .order_by("-similarity", "title", "id")
+            .values("id", "title", "author")[:limit]
+        )
 
 
 class Book(models.Model):
@@ -12,9 +104,48 @@ class Book(models.Model):
     cover = models.CharField(max_length=63, choices=CoverChoices.choices)
     inventory = models.IntegerField(validators=[MinValueValidator(0)])
     daily_fee = models.DecimalField(max_digits=10, decimal_places=2)
+    # Kept up to date by the borrow and return paths,
+    # repaired by `reconcile_book_counters`
+    # Database defaults too, imports COPY rows without these columns
+    total_borrows = models.PositiveIntegerField(
+        default=0, db_default=0, editable=False
+    )
+    active_borrows = models.PositiveIntegerField(
+        default=0, db_default=0, editable=False
+    )
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("title", weight="A", config="english")
+            + SearchVector("author", weight="B", config="english")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = BookQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.title}, author: {self.author}"
 
     class Meta:
         ordering = ["title"]
+        indexes = [
+            models.Index(fields=["title", "id"], name="book_title_id_idx"),
+            models.Index(
+                fields=["total_borrows", "id"], name="book_popularity_idx"
+            ),
+            models.Index(
+                fields=["active_borrows", "id"], name="book_active_borrows_idx"
+            ),
+            GinIndex(fields=["search_vector"], name="book_search_vector_idx"),
+            GistIndex(
+                fields=["title"],
+                name="book_title_trgm_gist_idx",
+                opclasses=["gist_trgm_ops"],
+            ),
+            GistIndex(
+                fields=["author"],
+                name="book_author_trgm_gist_idx",
+                opclasses=["gist_trgm_ops"],
+            ),
+        ]
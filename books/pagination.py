@@ -0,0 +1,185 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, Cursor
+
+
+class LimitOffsetPagination(pagination.LimitOffsetPagination):
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset` with the async ORM."""
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [
+            item
+            async for item in queryset[self.offset : self.offset + self.limit]
+        ]
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over a unique composite key (ex. `title, id`).
+    The whole key of the boundary row is stored in the cursor, so every
+    page is a single index range scan without OFFSET and COUNT(*).
+    """
+
+    ordering = ("id",)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([item async for item in queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Slice of the queryset with the page and the row after it."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+
+        self.keyset = self.get_ordering(request, queryset, view)
+        ordering = self.keyset
+        if reverse:
+            ordering = [self._invert(field) for field in ordering]
+        queryset = queryset.order_by(*ordering)
+
+        if self.cursor:
+            position = self.decode_position(ordering)
+            try:
+                queryset = queryset.filter(self._after(ordering, position))
+            except (TypeError, ValueError, ValidationError):
+                # Values that do not fit the key fields
+                raise NotFound(self.invalid_cursor_message)
+        return queryset[: self.page_size + 1]
+
+    def decode_position(self, ordering):
+        """The key of the boundary row, one value per ordering field."""
+        try:
+            position = json.loads(self.cursor.position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def set_page(self, results):
+        reverse = bool(self.cursor and self.cursor.reverse)
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        position = self._get_position_from_instance(self.page[-1], None)
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=position)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        position = self._get_position_from_instance(self.page[0], None)
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=position)
+        )
+
+    def _get_position_from_instance(self, instance, ordering):
+        return json.dumps(
+            [
+                (
+                    instance[field.lstrip("-")]
+                    if isinstance(instance, dict)
+                    else getattr(instance, field.lstrip("-"))
+                )
+                for field in self.keyset
+            ],
+            cls=DjangoJSONEncoder,
+        )
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def _after(ordering, position):
+        """
+        Build `(f1, f2, ...) > (v1, v2, ...)` for the given ordering.
+        The leading `f1 >= v1` bound lets Postgres start the index scan
+        at the cursor instead of filtering the whole index.
+        """
+        condition = None
+        for field, value in reversed(list(zip(ordering, position))):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            after = Q(**{f"{name}__{lookup}": value})
+            if condition is not None:
+                after |= Q(**{name: value}) & condition
+            condition = after
+
+        first = ordering[0]
+        bound = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{bound}": position[0]}) & condition
+
+
+class KeysetPaginationMixin:
+    """
+    Switch a viewset to `keyset_pagination_class`
+    when the client asks for it with `?pagination=cursor`.
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    @property
+    def paginator(self):
+        request = getattr(self, "request", None)
+        if (
+            not hasattr(self, "_paginator")
+            and request is not None
+            and request.query_params.get("pagination") == "cursor"
+        ):
+            self._paginator = self.keyset_pagination_class()
+        return super().paginator
+
+
+class BookKeysetPagination(KeysetPagination):
+    ordering = ("title", "id")
+
+    def get_ordering(self, request, queryset, view):
+        # Search results and `?ordering=` come sorted by a unique key
+        return tuple(queryset.query.order_by) or self.ordering
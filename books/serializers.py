@@ -1,15 +1,74 @@
 from rest_framework import serializers
 
+from books.fieldsets import SparseFieldsetSerializerMixin
+from books.importers import FILE_FORMATS
 from books.models import Book
 
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
+    next_available_date = serializers.DateField(
+        read_only=True,
+        allow_null=True,
+        help_text=(
+            "Earliest expected return date of a borrowed copy "
+            "while the book is out of inventory"
+        ),
+    )
+
     class Meta:
         model = Book
-        fields = "id", "title", "author", "cover", "inventory", "daily_fee"
+        fields = (
+            "id",
+            "title",
+            "author",
+            "cover",
+            "inventory",
+            "daily_fee",
+            "total_borrows",
+            "active_borrows",
+            "next_available_date",
+        )
+
 
+class BookListSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
+    next_available_date = serializers.DateField(
+        read_only=True, allow_null=True
+    )
 
-class BookListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
-        fields = "id", "title", "author", "daily_fee"
+        fields = (
+            "id",
+            "title",
+            "author",
+            "daily_fee",
+            "total_borrows",
+            "next_available_date",
+        )
+
+
+class BookImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(
+        choices=FILE_FORMATS,
+        required=False,
+        help_text="Guessed from the file extension by default",
+    )
+    upsert = serializers.BooleanField(
+        default=False,
+        help_text="Update books with the same title and author",
+    )
+
+    def validate(self, data):
+        if "file_format" not in data:
+            extension = data["file"].name.rsplit(".", 1)[-1].lower()
+            data["file_format"] = "jsonl" if extension == "ndjson" else extension
+        if data["file_format"] not in FILE_FORMATS:
+            raise serializers.ValidationError(
+                {"file_format": "Can not guess the file format"}
+            )
+        return data
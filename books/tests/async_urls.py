@@ -0,0 +1,18 @@
+from django.test import override_settings
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from books.views import BookViewSet
+from borrowings.views import BorrowingViewSet
+
+# The API routes as served by the ASGI entry point
+with override_settings(ASYNC_VIEWS=True):
+    books = DefaultRouter()
+    books.register("", BookViewSet, basename="books")
+    borrowings = DefaultRouter()
+    borrowings.register("", BorrowingViewSet, basename="borrowings")
+
+    urlpatterns = [
+        path("api/v1/books/", include((books.urls, "books"))),
+        path("api/v1/borrowings/", include((borrowings.urls, "borrowings"))),
+    ]
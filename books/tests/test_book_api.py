@@ -1,13 +1,30 @@
+import json
+from base64 import b64encode
+from datetime import date, timedelta
 from decimal import Decimal
+from urllib.parse import urlencode
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 from books.models import Book
 from books.serializers import BookListSerializer, BookSerializer
+from borrowings.models import Borrowing
 
 BOOK_URL = reverse("books:books-list")
+SUGGEST_URL = reverse("books:books-suggest")
+IMPORT_URL = reverse("books:books-import-books")
+EXPORT_URL = reverse("books:books-export")
+IMPORT_CSV = (
+    b"title,author,cover,inventory,daily_fee\n"
+    b"Dune,Frank Herbert,Hard,3,0.50\n"
+    b"Emma,Jane Austen,Paper,2,0.10\n"
+)
 
 
 def create_book(**kwargs):
@@ -40,6 +57,259 @@ class PublicBookApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(serializer.data, response.data["results"])
 
+    def test_book_list_cursor_pagination(self):
+        for i in range(11):
+            create_book(title=f"Book {i % 3}")
+        expected_ids = list(
+            Book.objects.order_by("title", "id").values_list("id", flat=True)
+        )
+
+        pages = []
+        url = f"{BOOK_URL}?pagination=cursor"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            pages.append([book["id"] for book in response.data["results"]])
+            url = response.data["next"]
+        response = self.client.get(response.data["previous"])
+
+        self.assertEqual(sum(pages, []), expected_ids)
+        self.assertEqual(
+            [book["id"] for book in response.data["results"]], pages[-2]
+        )
+
+    def test_book_list_invalid_cursor(self):
+        for position in ("not json", '{"title": "x"}', '["x"]', '["x", "y"]'):
+            cursor = b64encode(urlencode({"p": position}).encode()).decode()
+            response = self.client.get(
+                BOOK_URL, {"pagination": "cursor", "cursor": cursor}
+            )
+            self.assertEqual(
+                response.status_code, status.HTTP_404_NOT_FOUND, position
+            )
+
+    def test_book_search(self):
+        by_title = create_book(title="Dragon Kingdom", author="Jane Doe")
+        by_author = create_book(title="Silent River", author="Dragon Smith")
+        create_book(title="Winter Garden", author="John Doe")
+
+        response = self.client.get(BOOK_URL, {"q": "dragons"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(
+            [book["id"] for book in response.data["results"]],
+            [by_title.id, by_author.id],
+        )
+
+    def test_book_search_follows_updates(self):
+        book = create_book(title="Winter Garden")
+        Book.objects.filter(id=book.id).update(title="Summer Garden")
+
+        response_1 = self.client.get(BOOK_URL, {"q": "winter"})
+        response_2 = self.client.get(BOOK_URL, {"q": "summer"})
+
+        self.assertEqual(response_1.data["count"], 0)
+        self.assertEqual(response_2.data["results"][0]["id"], book.id)
+
+    def test_book_search_cursor_pagination(self):
+        for i in range(7):
+            create_book(title=f"Dragon {i}", author="Dragon Author" * (i % 2))
+        expected_ids = list(
+            Book.objects.search("dragon").values_list("id", flat=True)
+        )
+
+        response_1 = self.client.get(
+            BOOK_URL, {"q": "dragon", "pagination": "cursor"}
+        )
+        response_2 = self.client.get(response_1.data["next"])
+        ids = [
+            book["id"]
+            for response in (response_1, response_2)
+            for book in response.data["results"]
+        ]
+
+        self.assertEqual(ids, expected_ids)
+        self.assertIsNone(response_2.data["next"])
+
+    def test_book_suggest(self):
+        hobbit = create_book(title="The Hobbit", author="J. R. R. Tolkien")
+        silmarillion = create_book(
+            title="The Silmarillion", author="J. R. R. Tolkien"
+        )
+        create_book(title="Dune", author="Frank Herbert")
+
+        response_1 = self.client.get(SUGGEST_URL, {"q": "hobb"})
+        response_2 = self.client.get(SUGGEST_URL, {"q": "tolkein"})
+
+        self.assertEqual(response_1.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response_1.data,
+            [
+                {
+                    "id": hobbit.id,
+                    "title": hobbit.title,
+                    "author": hobbit.author,
+                }
+            ],
+        )
+        self.assertEqual(
+            {book["id"] for book in response_2.data},
+            {hobbit.id, silmarillion.id},
+        )
+
+    def test_book_suggest_is_capped(self):
+        for i in range(15):
+            create_book(title=f"Dragon {i}")
+
+        response_1 = self.client.get(SUGGEST_URL, {"q": "drag"})
+        response_2 = self.client.get(SUGGEST_URL, {"q": " "})
+
+        self.assertEqual(len(response_1.data), 10)
+        self.assertEqual(response_2.data, [])
+
+    def test_book_suggest_closest_first(self):
+        for i in range(15):
+            create_book(title=f"Dragon {i}")
+        drag_racing = create_book(title="Drag Racing")
+
+        response = self.client.get(SUGGEST_URL, {"q": "drag"})
+
+        self.assertEqual(len(response.data), 10)
+        self.assertEqual(response.data[0]["id"], drag_racing.id)
+
+    def test_book_list_served_from_cache(self):
+        response_1 = self.client.get(BOOK_URL)
+        with self.assertNumQueries(0):
+            response_2 = self.client.get(BOOK_URL)
+
+        self.assertEqual(response_2.status_code, status.HTTP_200_OK)
+        self.assertEqual(response_1.data, response_2.data)
+        self.assertEqual(response_1["ETag"], response_2["ETag"])
+
+    def test_book_detail_not_modified(self):
+        url = book_detail_url(self.book.id)
+        response_1 = self.client.get(url)
+        with self.assertNumQueries(0):
+            response_2 = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response_1["ETag"]
+            )
+            response_3 = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response_1["Last-Modified"]
+            )
+
+        self.assertEqual(response_2.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response_3.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response_2["ETag"], response_1["ETag"])
+
+    def test_book_change_within_a_second_is_not_hidden(self):
+        url = book_detail_url(self.book.id)
+        response_1 = self.client.get(url)
+        self.book.title = "New Title"
+        self.book.save()
+        response_2 = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response_1["Last-Modified"]
+        )
+
+        self.assertEqual(response_2.status_code, status.HTTP_200_OK)
+        self.assertEqual(response_2.data["title"], "New Title")
+        self.assertNotEqual(
+            response_2["Last-Modified"], response_1["Last-Modified"]
+        )
+
+    def test_book_change_invalidates_cache(self):
+        url = book_detail_url(self.book.id)
+        response_1 = self.client.get(url)
+        self.book.title = "New Title"
+        self.book.save()
+        response_2 = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response_1["ETag"]
+        )
+
+        self.assertEqual(response_2.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response_2["ETag"], response_1["ETag"])
+        self.assertEqual(response_2.data["title"], "New Title")
+
+    def test_book_export_ndjson(self):
+        create_book(title="Dune", daily_fee=1.5)
+        response = self.client.get(EXPORT_URL)
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(
+            rows[1],
+            {
+                "id": rows[1]["id"],
+                "title": "Dune",
+                "author": "Test Author",
+                "cover": "Soft",
+                "inventory": 5,
+                "daily_fee": "1.50",
+            },
+        )
+
+    def test_book_export_csv(self):
+        response = self.client.get(EXPORT_URL, {"file_format": "csv"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(lines[0], "id,title,author,cover,inventory,daily_fee")
+        self.assertEqual(
+            lines[1], f"{self.book.id},Test Book,Test Author,Soft,5,0.99"
+        )
+
+    def test_book_export_unknown_format(self):
+        response = self.client.get(EXPORT_URL, {"file_format": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_book_list_sparse_fieldset(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(BOOK_URL, {"fields": "id,title"})
+        select = queries.captured_queries[-1]["sql"]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"],
+            [{"id": self.book.id, "title": self.book.title}],
+        )
+        self.assertIn('"title"', select)
+        self.assertNotIn('"author"', select)
+        self.assertNotIn('"search_vector"', select)
+
+    def test_book_detail_sparse_fieldset(self):
+        response = self.client.get(
+            book_detail_url(self.book.id), {"fields": "inventory,unknown"}
+        )
+        self.assertEqual(response.data, {"inventory": 5})
+
+    def test_book_list_unknown_fields_ignored(self):
+        response = self.client.get(BOOK_URL, {"fields": "unknown"})
+        serializer = BookListSerializer(Book.objects.all(), many=True)
+        self.assertEqual(response.data["results"], serializer.data)
+
+    def test_book_list_renders_like_serializer(self):
+        create_book(title="Кобзар \u2028", daily_fee=Decimal("12.50"))
+        response = self.client.get(BOOK_URL)
+        serializer = BookListSerializer(Book.objects.all(), many=True)
+        expected = JSONRenderer().render(
+            {
+                "count": 2,
+                "next": None,
+                "previous": None,
+                "results": serializer.data,
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, expected)
+
 
 class PrivateBookApiTests(TestCase):
     def setUp(self):
@@ -99,6 +369,13 @@ class PrivateBookApiTests(TestCase):
         response = self.client.put(url, payload)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_import_books_forbidden(self):
+        upload = SimpleUploadedFile("books.csv", IMPORT_CSV)
+        response = self.client.post(
+            IMPORT_URL, {"file": upload}, format="multipart"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_delete_book_forbidden(self):
         url = book_detail_url(self.book.id)
         response = self.client.delete(url)
@@ -169,3 +446,103 @@ class AdminBookApiTests(TestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Book.objects.filter(id=book.id).exists())
+
+    def test_import_books(self):
+        upload = SimpleUploadedFile("books.csv", IMPORT_CSV)
+        response = self.client.post(
+            IMPORT_URL, {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["failed"], 1)
+        self.assertEqual(response.data["errors"][0]["line"], 3)
+        self.assertIn("cover", response.data["errors"][0]["errors"])
+        self.assertTrue(Book.objects.filter(title="Dune").exists())
+
+    def test_import_books_invalid_utf8(self):
+        upload = SimpleUploadedFile(
+            "books.csv",
+            b"title,author,cover,inventory,daily_fee\n"
+            b"Dune,Frank Herbert,Hard,3,0.50\n"
+            b"Caf\xe9,Unknown,Soft,1,0.50\n",
+        )
+        response = self.client.post(
+            IMPORT_URL, {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["failed"], 1)
+        self.assertEqual(response.data["errors"][0]["line"], 3)
+        self.assertTrue(Book.objects.filter(title="Dune").exists())
+
+    def test_import_books_unknown_format(self):
+        upload = SimpleUploadedFile("books.xlsx", IMPORT_CSV)
+        response = self.client.post(
+            IMPORT_URL, {"file": upload}, format="multipart"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BookAvailabilityTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"user{i}@test.com") for i in range(3)
+        )
+
+    def create_borrowed_book(self, *return_dates, inventory=0, **kwargs):
+        book = create_book(inventory=inventory, **kwargs)
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                user=user,
+                book=book,
+                expected_return_date=expected_return_date,
+                actual_return_date=actual_return_date,
+            )
+            for user, (expected_return_date, actual_return_date) in zip(
+                self.users, return_dates
+            )
+        )
+        return book
+
+    def test_next_available_date_of_book_out_of_inventory(self):
+        book = self.create_borrowed_book(
+            (date(2025, 3, 12), None),
+            (date(2025, 3, 8), date(2025, 3, 1)),
+            (date(2025, 3, 10), None),
+        )
+        response = self.client.get(book_detail_url(book.id))
+        self.assertEqual(response.data["next_available_date"], "2025-03-10")
+
+    def test_next_available_date_of_available_book_is_null(self):
+        in_stock = self.create_borrowed_book(
+            (date(2025, 3, 10), None), inventory=1
+        )
+        never_back = self.create_borrowed_book()
+        for book in (in_stock, never_back):
+            response = self.client.get(book_detail_url(book.id))
+            self.assertIsNone(response.data["next_available_date"])
+
+    def test_book_list_next_available_date_without_n_plus_one(self):
+        def list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(BOOK_URL, {"limit": 50})
+            return response, len(queries)
+
+        self.create_borrowed_book((date(2025, 3, 10), None), title="A")
+        _, single = list_queries()
+        for i in range(20):
+            self.create_borrowed_book(
+                (date(2025, 4, 1) + timedelta(days=i), None),
+                (date(2025, 3, 20), None),
+                title=f"B{i:02}",
+            )
+        response, many = list_queries()
+
+        self.assertEqual(single, many)
+        self.assertEqual(
+            [book["next_available_date"] for book in response.data["results"]],
+            ["2025-03-10"] + ["2025-03-20"] * 20,
+        )
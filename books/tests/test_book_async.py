@@ -0,0 +1,102 @@
+from asgiref.sync import iscoroutinefunction
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import resolve
+from rest_framework import status
+
+from books.models import Book
+from books.serializers import BookListSerializer, BookSerializer
+from books.tests.test_book_api import (
+    BOOK_URL,
+    EXPORT_URL,
+    book_detail_url,
+    create_book,
+)
+
+
+@override_settings(ROOT_URLCONF="books.tests.async_urls")
+class AsyncBookViewTests(TestCase):
+    def setUp(self):
+        self.client = AsyncClient()
+        self.book = create_book(title="Book A")
+        create_book(title="Book B")
+
+    async def test_book_list(self):
+        response = await self.client.get(BOOK_URL)
+        books = BookListSerializer(
+            [book async for book in Book.objects.all()], many=True
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 2)
+        self.assertEqual(
+            [book["id"] for book in response.json()["results"]],
+            [book["id"] for book in books.data],
+        )
+
+    async def test_book_list_cursor_pagination(self):
+        for i in range(5):
+            await Book.objects.acreate(
+                title=f"Book C{i}",
+                author="Author",
+                cover="Soft",
+                inventory=1,
+                daily_fee=1,
+            )
+        first = await self.client.get(BOOK_URL, {"pagination": "cursor"})
+        second = await self.client.get(first.json()["next"])
+
+        self.assertEqual(
+            [book["title"] for book in first.json()["results"]],
+            ["Book A", "Book B", "Book C0", "Book C1", "Book C2"],
+        )
+        self.assertEqual(
+            [book["title"] for book in second.json()["results"]],
+            ["Book C3", "Book C4"],
+        )
+
+    async def test_book_detail(self):
+        response = await self.client.get(book_detail_url(self.book.id))
+        book = await Book.objects.with_next_available_date().aget(
+            id=self.book.id
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()["id"], BookSerializer(book).data["id"]
+        )
+        self.assertEqual(
+            (await self.client.get(book_detail_url(0))).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    async def test_conditional_get(self):
+        response = await self.client.get(BOOK_URL)
+        not_modified = await self.client.get(
+            BOOK_URL, headers={"If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(
+            not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+    async def test_export_streamed_from_async_iterator(self):
+        response = await self.client.get(EXPORT_URL, {"file_format": "csv"})
+        lines = b"".join(
+            [chunk async for chunk in response.streaming_content]
+        ).splitlines()
+
+        self.assertTrue(response.is_async)
+        self.assertEqual(
+            lines[0], b"id,title,author,cover,inventory,daily_fee"
+        )
+        self.assertEqual(len(lines), 3)
+
+    def test_reads_served_as_coroutines_under_asgi_only(self):
+        self.assertTrue(iscoroutinefunction(resolve(BOOK_URL).func))
+        self.assertFalse(iscoroutinefunction(resolve(EXPORT_URL).func))
+        self.assertFalse(
+            iscoroutinefunction(resolve(BOOK_URL, "library_service.urls").func)
+        )
+
+    async def test_create_requires_admin(self):
+        response = await self.client.post(BOOK_URL, {"title": "New"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
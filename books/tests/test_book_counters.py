@@ -0,0 +1,252 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book
+from books.tests.test_book_api import BOOK_URL, create_book
+from borrowings.models import Borrowing, Reservation
+
+BORROWING_URL = reverse("borrowings:borrowings-list")
+CHECKOUT_URL = reverse("borrowings:borrowings-checkout")
+RETURN_BATCH_URL = reverse("borrowings:borrowings-return-batch")
+
+
+def borrowing_return_url(borrowing_id):
+    return reverse(
+        "borrowings:borrowings-return-borrowing", args=[borrowing_id]
+    )
+
+
+class BookCounterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@test.com")
+        self.client.force_authenticate(self.user)
+        self.expected_return_date = now().date() + timedelta(days=10)
+
+    def assertCounters(self, book, total_borrows, active_borrows):
+        book.refresh_from_db()
+        self.assertEqual(
+            (book.total_borrows, book.active_borrows),
+            (total_borrows, active_borrows),
+        )
+
+    def borrow(self, book):
+        return self.client.post(
+            BORROWING_URL,
+            {
+                "book": book.id,
+                "expected_return_date": self.expected_return_date,
+            },
+        )
+
+    def test_borrow_and_return(self):
+        book = create_book(inventory=2)
+        first = self.borrow(book).data["id"]
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(email="other@test.com")
+        )
+        self.borrow(book)
+        self.assertCounters(book, 2, 2)
+
+        self.client.force_authenticate(self.user)
+
+        self.client.post(
+            borrowing_return_url(first), {"actual_return_date": ""}
+        )
+        self.assertCounters(book, 2, 1)
+
+    def test_borrow_out_of_inventory_not_counted(self):
+        book = create_book(inventory=0)
+        response = self.borrow(book)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertCounters(book, 0, 0)
+
+    def test_checkout_and_batch_return(self):
+        books = [create_book(title=f"Book {i}") for i in range(3)]
+        response = self.client.post(
+            CHECKOUT_URL,
+            {
+                "books": [book.id for book in books],
+                "expected_return_date": self.expected_return_date,
+            },
+            format="json",
+        )
+        for book in books:
+            self.assertCounters(book, 1, 1)
+
+        self.client.post(
+            RETURN_BATCH_URL,
+            {
+                "borrowings": [
+                    item["id"] for item in response.data["borrowings"][:2]
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(
+            [
+                (book.total_borrows, book.active_borrows)
+                for book in Book.objects.order_by("title")
+            ],
+            [(1, 0), (1, 0), (1, 1)],
+        )
+
+    def test_return_to_reservation_counts_new_borrow(self):
+        book = create_book(inventory=1)
+        borrowing_id = self.borrow(book).data["id"]
+        Reservation.objects.create(
+            user=get_user_model().objects.create_user(
+                email="waiting@test.com"
+            ),
+            book=book,
+        )
+        self.client.post(
+            borrowing_return_url(borrowing_id), {"actual_return_date": ""}
+        )
+        self.assertCounters(book, 2, 1)
+
+
+class BookPopularityApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.books = [
+            create_book(title=f"Book {i}", total_borrows=borrows)
+            for i, borrows in enumerate((3, 10, 0, 3))
+        ]
+        Book.objects.filter(pk=self.books[0].pk).update(active_borrows=1)
+
+    def list_ids(self, **params):
+        response = self.client.get(BOOK_URL, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book["id"] for book in response.data["results"]]
+
+    def test_order_by_popularity(self):
+        first, second, third, fourth = self.books
+        self.assertEqual(
+            self.list_ids(ordering="-popularity"),
+            [second.id, fourth.id, first.id, third.id],
+        )
+        self.assertEqual(
+            self.list_ids(ordering="popularity"),
+            [third.id, first.id, fourth.id, second.id],
+        )
+
+    def test_order_by_popularity_cursor_pagination(self):
+        for i in range(4):
+            create_book(title=f"Tied {i}", total_borrows=3)
+        pages = []
+        url = f"{BOOK_URL}?ordering=-popularity&pagination=cursor"
+        while url:
+            response = self.client.get(url)
+            pages.append([book["id"] for book in response.data["results"]])
+            url = response.data["next"]
+
+        self.assertEqual(
+            sum(pages, []),
+            list(
+                Book.objects.order_by("-total_borrows", "-id").values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+        self.assertEqual(len(pages), 2)
+
+    def test_order_by_popularity_cursor_pagination_sparse_fields(self):
+        for i in range(4):
+            create_book(title=f"Tied {i}", total_borrows=3)
+        titles = []
+        url = f"{BOOK_URL}?ordering=-popularity&pagination=cursor&fields=title"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                {key for book in response.data["results"] for key in book},
+                {"title"},
+            )
+            titles += [book["title"] for book in response.data["results"]]
+            url = response.data["next"]
+
+        self.assertEqual(
+            titles,
+            list(
+                Book.objects.order_by("-total_borrows", "-id").values_list(
+                    "title", flat=True
+                )
+            ),
+        )
+
+    def test_unknown_ordering_ignored(self):
+        self.assertEqual(
+            self.list_ids(ordering="-inventory"),
+            self.list_ids(),
+        )
+
+    def test_filter_borrowed_books(self):
+        self.assertEqual(self.list_ids(is_borrowed="true"), [self.books[0].id])
+
+    def test_popularity_ordering_uses_index(self):
+        Book.objects.bulk_create(
+            Book(
+                title=f"Filler {i}",
+                author="Author",
+                cover="Soft",
+                inventory=1,
+                daily_fee=1,
+                total_borrows=i % 50,
+            )
+            for i in range(2000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE books_book")
+        plan = Book.objects.order_by("-total_borrows", "-id")[:20].explain()
+        self.assertIn("book_popularity_idx", plan)
+
+
+class ReconcileBookCountersTests(TestCase):
+    def test_reconcile_repairs_drift(self):
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"user{i}@test.com") for i in range(3)
+        )
+        drifted, accurate, unborrowed = (
+            create_book(title=f"Book {i}") for i in range(3)
+        )
+        for user in users:
+            Borrowing.objects.create(
+                user=user,
+                book=drifted,
+                expected_return_date=now().date(),
+                actual_return_date=now().date() if user != users[0] else None,
+            )
+        Borrowing.objects.create(
+            user=users[0], book=accurate, expected_return_date=now().date()
+        )
+        Book.objects.filter(pk=drifted.pk).update(
+            total_borrows=1, active_borrows=2
+        )
+        Book.objects.filter(pk=accurate.pk).update(
+            total_borrows=1, active_borrows=1
+        )
+        Book.objects.filter(pk=unborrowed.pk).update(active_borrows=4)
+
+        out = StringIO()
+        call_command("reconcile_book_counters", chunk_size=2, stdout=out)
+
+        self.assertIn("2 of 3 books repaired in 2 chunks", out.getvalue())
+        self.assertEqual(
+            list(
+                Book.objects.order_by("title").values_list(
+                    "total_borrows", "active_borrows"
+                )
+            ),
+            [(3, 1), (1, 1), (0, 0)],
+        )
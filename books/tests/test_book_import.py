@@ -0,0 +1,117 @@
+import json
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from books.models import Book
+from books.tests.test_book_api import create_book
+
+CSV_HEADER = "title,author,cover,inventory,daily_fee\n"
+
+
+class ImportBooksCommandTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_file(self, name, content):
+        path = Path(self.directory.name) / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def import_books(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command(
+            "import_books", path, "--batch-size=2", *args, stdout=out, stderr=err
+        )
+        return out.getvalue(), err.getvalue()
+
+    def test_import_csv(self):
+        path = self.write_file(
+            "books.csv",
+            CSV_HEADER
+            + "Dune,Frank Herbert,Hard,3,0.50\n"
+            + '"Good Omens, Nice",Terry Pratchett,Soft,1,1.25\n'
+            + "Emma,Jane Austen,Soft,0,0.10\n",
+        )
+        out, err = self.import_books(path)
+
+        self.assertIn("Created: 3, updated: 0, failed: 0", out)
+        self.assertEqual(err, "")
+        book = Book.objects.get(title="Good Omens, Nice")
+        self.assertEqual(book.author, "Terry Pratchett")
+        self.assertEqual(book.daily_fee, Decimal("1.25"))
+
+    def test_import_jsonl(self):
+        rows = [
+            {
+                "title": "Dune",
+                "author": "Frank Herbert",
+                "cover": "Hard",
+                "inventory": 3,
+                "daily_fee": 0.5,
+            },
+            {
+                "title": "Emma",
+                "author": "Jane Austen",
+                "cover": "Soft",
+                "inventory": 2,
+                "daily_fee": "1.99",
+            },
+        ]
+        path = self.write_file(
+            "books.jsonl", "\n".join(json.dumps(row) for row in rows)
+        )
+        out, err = self.import_books(path)
+
+        self.assertIn("Created: 2", out)
+        self.assertEqual(
+            Book.objects.get(title="Emma").daily_fee, Decimal("1.99")
+        )
+
+    def test_import_reports_invalid_rows(self):
+        path = self.write_file(
+            "books.csv",
+            CSV_HEADER
+            + "Dune,Frank Herbert,Paper,3,0.50\n"
+            + "Emma,Jane Austen,Soft,-1,0.10\n"
+            + "Ulysses,James Joyce,Soft,1,0.125\n"
+            + ",James Joyce,Soft,1,0.12\n"
+            + "Beloved,Toni Morrison,Soft,1,0.99\n",
+        )
+        out, err = self.import_books(path)
+        errors = err.splitlines()
+
+        self.assertIn("Created: 1, updated: 0, failed: 4", out)
+        self.assertEqual(len(errors), 4)
+        self.assertTrue(errors[0].startswith("Line 2:"))
+        self.assertIn("cover", errors[0])
+        self.assertIn("inventory", errors[1])
+        self.assertIn("daily_fee", errors[2])
+        self.assertIn("title", errors[3])
+        self.assertEqual(
+            list(Book.objects.values_list("title", flat=True)), ["Beloved"]
+        )
+
+    def test_import_upsert(self):
+        existing = create_book(title="Dune", author="Frank Herbert")
+        path = self.write_file(
+            "books.csv",
+            CSV_HEADER
+            + "Dune,Frank Herbert,Hard,1,0.50\n"
+            + "Emma,Jane Austen,Soft,2,0.10\n"
+            + "Emma,Jane Austen,Hard,7,0.20\n",
+        )
+        out, err = self.import_books(path, "--upsert", "--batch-size=5")
+        existing.refresh_from_db()
+        emma = Book.objects.get(title="Emma")
+
+        self.assertIn("Created: 1, updated: 1, failed: 0", out)
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertEqual(existing.inventory, 1)
+        self.assertEqual(existing.cover, "Hard")
+        self.assertEqual(emma.inventory, 7)
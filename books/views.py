@@ -1,15 +1,247 @@
-from rest_framework import viewsets
+import codecs
 
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    inline_serializer,
+    OpenApiParameter,
+)
+from rest_framework import viewsets, serializers, status
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+
+from books.async_views import AsyncReadMixin
+from books.cache import CatalogCacheMixin
+from books.exporters import EXPORT_FORMATS, stream_export
+from books.fastpath import ValuesListMixin
+from books.fieldsets import SparseFieldsetMixin
+from books.importers import BookImporter
 from books.models import Book
-from books.serializers import BookSerializer, BookListSerializer
+from books.pagination import KeysetPaginationMixin, BookKeysetPagination
+from books.serializers import (
+    BookSerializer,
+    BookListSerializer,
+    BookImportSerializer,
+)
+
+SUGGEST_LIMIT = 10
+# `?ordering=` values and the index-backed keys they sort by
+ORDERINGS = {
+    "popularity": ("total_borrows", "id"),
+    "-popularity": ("-total_borrows", "-id"),
+    "active_borrows": ("active_borrows", "id"),
+    "-active_borrows": ("-active_borrows", "-id"),
+}
+IMPORT_REPORTED_ERRORS = 100
+EXPORT_FIELDS = ("id", "title", "author", "cover", "inventory", "daily_fee")
 
 
-class BookViewSet(viewsets.ModelViewSet):
+@extend_schema_view(
+    list=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                type=str,
+                description=(
+                    "Full-text search by title and author, "
+                    "most relevant first (ex. `?q=tolkien hobbit`)"
+                ),
+            ),
+            OpenApiParameter(
+                "ordering",
+                type=str,
+                enum=tuple(ORDERINGS),
+                description=(
+                    "Sort by times borrowed or copies borrowed now "
+                    "(ex. `?ordering=-popularity`)"
+                ),
+            ),
+            OpenApiParameter(
+                "is_borrowed",
+                type=str,
+                description=(
+                    "Only books with copies borrowed now "
+                    "(ex. `?is_borrowed=true`)"
+                ),
+            ),
+            OpenApiParameter(
+                "fields",
+                type=str,
+                description=(
+                    "Comma-separated fields to return "
+                    "(ex. `?fields=id,title`)"
+                ),
+            ),
+            OpenApiParameter(
+                "pagination",
+                type=str,
+                description=(
+                    "Use keyset pagination ordered by `title, id` "
+                    "instead of limit/offset (ex. `?pagination=cursor`)"
+                ),
+            ),
+        ]
+    ),
+    retrieve=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "fields",
+                type=str,
+                description=(
+                    "Comma-separated fields to return "
+                    "(ex. `?fields=id,inventory`)"
+                ),
+            ),
+        ]
+    ),
+)
+class BookViewSet(
+    CatalogCacheMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+    KeysetPaginationMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+    keyset_pagination_class = BookKeysetPagination
+
+    def get_queryset(self):
+        """
+        Search books by title and author with `?q=`,
+        sort them by popularity with `?ordering=`.
+        """
+        queryset = self.queryset
+        if self.action == "retrieve":
+            return queryset.with_next_available_date()
+        if self.action != "list":
+            return queryset
+
+        queryset = queryset.with_next_available_date()
+
+        q = self.request.query_params.get("q")
+        if q:
+            queryset = queryset.search(q)
+
+        if self.request.query_params.get("is_borrowed") == "true":
+            queryset = queryset.filter(active_borrows__gt=0)
+
+        ordering = self.request.query_params.get("ordering")
+        if ordering in ORDERINGS:
+            queryset = queryset.order_by(*ORDERINGS[ordering])
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
             return BookListSerializer
 
+        if self.action == "import_books":
+            return BookImportSerializer
+
         return BookSerializer
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                type=str,
+                description=(
+                    "Beginning of a title or author, typos are tolerated "
+                    "(ex. `?q=tolkein`)"
+                ),
+            ),
+        ],
+        responses=inline_serializer(
+            "BookSuggestion",
+            fields={
+                "id": serializers.IntegerField(),
+                "title": serializers.CharField(),
+                "author": serializers.CharField(),
+            },
+            many=True,
+        ),
+        description="Autocomplete suggestions for book titles and authors",
+    )
+    @action(methods=["GET"], detail=False, pagination_class=None)
+    def suggest(self, request, *args, **kwargs):
+        """
+        Rows are returned straight from `.values()`
+        to keep the endpoint cheap on every keystroke.
+        """
+        q = request.query_params.get("q", "").strip()
+        if not q:
+            return Response([])
+        return Response(list(self.get_queryset().suggest(q, SUGGEST_LIMIT)))
+
+    @extend_schema(
+        description=(
+            "Bulk import books from a CSV or JSONL file (admin only). "
+            f"Invalid rows are skipped, the first {IMPORT_REPORTED_ERRORS} "
+            "of them are reported with their line numbers."
+        ),
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_books(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        errors = []
+
+        def report_error(line, line_errors):
+            if len(errors) < IMPORT_REPORTED_ERRORS:
+                errors.append({"line": line, "errors": line_errors})
+
+        importer = BookImporter(
+            upsert=serializer.validated_data["upsert"],
+            on_error=report_error,
+        )
+        importer.run(
+            codecs.iterdecode(
+                serializer.validated_data["file"],
+                "utf-8-sig",
+                errors="replace",
+            ),
+            serializer.validated_data["file_format"],
+        )
+
+        return Response(
+            {
+                "created": importer.created,
+                "updated": importer.updated,
+                "failed": importer.failed,
+                "errors": errors,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "file_format",
+                type=str,
+                enum=tuple(EXPORT_FORMATS),
+                description="Export format, `ndjson` by default",
+            ),
+        ],
+        responses={(200, "application/x-ndjson"): str, (200, "text/csv"): str},
+        description="Stream the whole catalog as NDJSON or CSV",
+    )
+    @action(methods=["GET"], detail=False)
+    def export(self, request, *args, **kwargs):
+        file_format = request.query_params.get("file_format", "ndjson")
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"file_format": f"Use one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = self.get_queryset().order_by("id")
+        return stream_export(
+            request, queryset, EXPORT_FIELDS, file_format, "books"
+        )
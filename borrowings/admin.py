@@ -1,5 +1,8 @@
 from django.contrib import admin
 
-from borrowings.models import Borrowing
+from borrowings.models import Borrowing, Fine, Reminder, Reservation
 
 admin.site.register(Borrowing)
+admin.site.register(Fine)
+admin.site.register(Reminder)
+admin.site.register(Reservation)
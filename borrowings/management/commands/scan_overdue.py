@@ -0,0 +1,32 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from borrowings.overdue import SCAN_CHUNK_SIZE, ScanInProgress, scan_overdue
+
+
+class Command(BaseCommand):
+    help = "Calculate fines of overdue borrowings"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=date.fromisoformat,
+            help="Calculate fines as of YYYY-MM-DD, today by default",
+        )
+        parser.add_argument("--chunk-size", type=int, default=SCAN_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            scan = scan_overdue(options["date"], options["chunk_size"])
+        except ScanInProgress as error:
+            raise CommandError(error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{scan.overdue} overdue borrowings as of {scan.as_of}, "
+                f"{scan.changed} fines changed, {scan.chunks} chunks "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        )
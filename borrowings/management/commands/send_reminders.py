@@ -0,0 +1,64 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from borrowings.reminders import (
+    CONCURRENCY,
+    DUE_SOON_DAYS,
+    RemindersInProgress,
+    send_reminders,
+)
+from notifications.breaker import CALL_TIMEOUT, CircuitBreaker
+
+
+class Command(BaseCommand):
+    help = (
+        "Send Telegram reminders about borrowings due soon or overdue, "
+        "meant to be run daily by a scheduler such as cron"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=date.fromisoformat,
+            help="Send reminders as of YYYY-MM-DD, today by default",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=DUE_SOON_DAYS,
+            help="Remind about borrowings due within this many days",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=CONCURRENCY,
+            help="Messages sent at the same time",
+        )
+        parser.add_argument(
+            "--call-timeout",
+            type=float,
+            default=CALL_TIMEOUT,
+            help="Seconds a single Telegram call may take",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            run = send_reminders(
+                options["date"],
+                days=options["days"],
+                concurrency=options["concurrency"],
+                breaker=CircuitBreaker(call_timeout=options["call_timeout"]),
+            )
+        except RemindersInProgress as error:
+            raise CommandError(error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{run.sent} reminders sent to {run.users - run.failed} "
+                f"users in {run.messages} messages as of {run.as_of}, "
+                f"{run.failed} users failed, "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the index without locking writes to the borrowings table
+    atomic = False
+
+    dependencies = [
+        ("books", "0005_book_trigram_indexes"),
+        ("borrowings", "0003_borrowing_active_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Fine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("days_overdue", models.PositiveIntegerField()),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("calculated_at", models.DateTimeField()),
+            ],
+        ),
+        AddIndexConcurrently(
+            model_name="borrowing",
+            index=models.Index(
+                condition=models.Q(("actual_return_date__isnull", True)),
+                fields=["expected_return_date", "id"],
+                include=("book",),
+                name="borrowing_overdue_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="fine",
+            name="borrowing",
+            field=models.OneToOneField(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="fine",
+                to="borrowings.borrowing",
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:11
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the index without locking writes to the borrowings table
+    atomic = False
+
+    dependencies = [
+        ("books", "0005_book_trigram_indexes"),
+        ("borrowings", "0006_reservation"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="borrowing",
+            index=models.Index(
+                condition=models.Q(("actual_return_date__isnull", True)),
+                fields=["book", "expected_return_date"],
+                name="borrowing_book_next_return_idx",
+            ),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.core.validators import MinValueValidator
 from django.db import models
 
 from books.models import Book
@@ -9,9 +10,15 @@ class Borrowing(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="borrowings",
+        # Covered by borrowing_user_returned_idx
+        db_index=False,
     )
     book = models.ForeignKey(
-        Book, on_delete=models.CASCADE, related_name="borrowings"
+        Book,
+        on_delete=models.CASCADE,
+        related_name="borrowings",
+        # Covered by borrowing_book_returned_idx
+        db_index=False,
     )
     borrow_date = models.DateField(auto_now_add=True)
     expected_return_date = models.DateField()
@@ -19,6 +26,160 @@ class Borrowing(models.Model):
 
     class Meta:
         unique_together = ("user", "book")
+        indexes = [
+            models.Index(
+                fields=["borrow_date", "id"],
+                name="borrowing_borrow_date_id_idx",
+            ),
+            models.Index(
+                fields=["borrow_date", "id"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_active_idx",
+            ),
+            models.Index(
+                fields=["expected_return_date", "id"],
+                # Lets the overdue scan read chunks from the index only
+                include=["book"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_overdue_idx",
+            ),
+            models.Index(
+                fields=["user", "actual_return_date"],
+                name="borrowing_user_returned_idx",
+            ),
+            models.Index(
+                fields=["book", "actual_return_date"],
+                name="borrowing_book_returned_idx",
+            ),
+            models.Index(
+                fields=["book", "expected_return_date"],
+                # Earliest return of a book is the first entry of the index
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_book_next_return_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user} borrowed {self.book}"
+
+
+class Fine(models.Model):
+    """Fine of an overdue borrowing, kept up to date by `scan_overdue`."""
+
+    borrowing = models.OneToOneField(
+        Borrowing, on_delete=models.CASCADE, related_name="fine"
+    )
+    days_overdue = models.PositiveIntegerField()
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    calculated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.amount} for {self.borrowing}"
+
+
+class Reminder(models.Model):
+    """Due date reminder already sent, so it is not sent twice."""
+
+    class Kind(models.TextChoices):
+        DUE_SOON = "due_soon"
+        OVERDUE = "overdue"
+
+    borrowing = models.ForeignKey(
+        Borrowing, on_delete=models.CASCADE, related_name="reminders"
+    )
+    kind = models.CharField(max_length=15, choices=Kind)
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["borrowing", "kind"], name="unique_borrowing_reminder"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} reminder for {self.borrowing}"
+
+
+class ReservationQuerySet(models.QuerySet):
+    def with_position(self):
+        """Annotate the place of waiting reservations in their waitlist."""
+        ahead = (
+            Reservation.objects.filter(
+                models.Q(created_at__lt=models.OuterRef("created_at"))
+                | models.Q(
+                    created_at=models.OuterRef("created_at"),
+                    id__lte=models.OuterRef("id"),
+                ),
+                book=models.OuterRef("book"),
+                status=Reservation.Status.WAITING,
+            )
+            .order_by()
+            .values("book")
+            .annotate(count=models.Count("id"))
+            .values("count")
+        )
+        return self.annotate(
+            position=models.Case(
+                models.When(
+                    status=Reservation.Status.WAITING,
+                    then=models.Subquery(ahead),
+                )
+            )
+        )
+
+
+class Reservation(models.Model):
+    """Place in the waitlist of a book that is out of inventory."""
+
+    class Status(models.TextChoices):
+        WAITING = "waiting"
+        FULFILLED = "fulfilled"
+        CANCELLED = "cancelled"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="reservations",
+    )
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, related_name="reservations"
+    )
+    status = models.CharField(
+        max_length=15, choices=Status, default=Status.WAITING
+    )
+    loan_days = models.PositiveSmallIntegerField(
+        default=14,
+        validators=[MinValueValidator(1)],
+        help_text="Days to keep the book once a copy is assigned",
+    )
+    borrowing = models.OneToOneField(
+        Borrowing,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="reservation",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    fulfilled_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ReservationQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "book"],
+                condition=models.Q(status="waiting"),
+                name="unique_waiting_reservation",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["book", "created_at", "id"],
+                condition=models.Q(status="waiting"),
+                name="reservation_waiting_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.status} for {self.book}"
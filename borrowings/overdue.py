@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+
+from django.db import connection
+from django.utils import timezone
+
+from books.models import Book
+from borrowings.models import Borrowing, Fine
+
+SCAN_CHUNK_SIZE = 10000
+SCAN_LOCK_ID = 0x0F1E
+
+# One chunk of overdue borrowings in `(expected_return_date, id)` order,
+# walked through `borrowing_overdue_idx`, with fines upserted in bulk
+SCAN_CHUNK_SQL = """
+    WITH chunk AS (
+        SELECT borrowing.id, borrowing.expected_return_date, book.daily_fee
+        FROM {borrowing} AS borrowing
+        JOIN {book} AS book ON book.id = borrowing.book_id
+        WHERE borrowing.actual_return_date IS NULL
+            AND borrowing.expected_return_date < %(as_of)s
+            AND (borrowing.expected_return_date, borrowing.id)
+                > (%(after_date)s, %(after_id)s)
+        ORDER BY borrowing.expected_return_date, borrowing.id
+        LIMIT %(chunk_size)s
+    ),
+    upserted AS (
+        INSERT INTO {fine} (
+            borrowing_id, days_overdue, amount, calculated_at
+        )
+        SELECT
+            id,
+            %(as_of)s - expected_return_date,
+            daily_fee * (%(as_of)s - expected_return_date),
+            now()
+        FROM chunk
+        ON CONFLICT (borrowing_id) DO UPDATE SET
+            days_overdue = EXCLUDED.days_overdue,
+            amount = EXCLUDED.amount,
+            calculated_at = EXCLUDED.calculated_at
+        WHERE ({fine}.days_overdue, {fine}.amount)
+            IS DISTINCT FROM (EXCLUDED.days_overdue, EXCLUDED.amount)
+        RETURNING 1
+    )
+    SELECT
+        count(*),
+        max(expected_return_date),
+        (array_agg(id ORDER BY expected_return_date DESC, id DESC))[1],
+        (SELECT count(*) FROM upserted)
+    FROM chunk
+"""
+
+
+class ScanInProgress(Exception):
+    pass
+
+
+@dataclass
+class OverdueScan:
+    as_of: object
+    overdue: int = 0
+    changed: int = 0
+    chunks: int = 0
+
+
+def scan_overdue(as_of=None, chunk_size=SCAN_CHUNK_SIZE):
+    """
+    Compute fines of not returned borrowings past their expected
+    return date as `Book.daily_fee` times days overdue, as of `as_of`.
+
+    Each chunk is a single statement committed on its own, so locks
+    stay short and an interrupted scan keeps its progress. Fines are
+    upserted, so the scan can be repeated at any time, and only one
+    scan runs at once.
+    """
+    scan = OverdueScan(as_of=as_of or timezone.localdate())
+    sql = SCAN_CHUNK_SQL.format(
+        borrowing=Borrowing._meta.db_table,
+        book=Book._meta.db_table,
+        fine=Fine._meta.db_table,
+    )
+    params = {
+        "as_of": scan.as_of,
+        "after_date": "-infinity",
+        "after_id": 0,
+        "chunk_size": chunk_size,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [SCAN_LOCK_ID])
+        if not cursor.fetchone()[0]:
+            raise ScanInProgress("Another overdue scan is running")
+        try:
+            while True:
+                cursor.execute(sql, params)
+                count, last_date, last_id, changed = cursor.fetchone()
+                if not count:
+                    break
+                scan.overdue += count
+                scan.changed += changed
+                scan.chunks += 1
+                params["after_date"], params["after_id"] = last_date, last_id
+                if count < chunk_size:
+                    break
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [SCAN_LOCK_ID])
+    return scan
@@ -0,0 +1,5 @@
+from books.pagination import KeysetPagination
+
+
+class BorrowingKeysetPagination(KeysetPagination):
+    ordering = ("borrow_date", "id")
@@ -0,0 +1,211 @@
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+import telegram
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, Exists, OuterRef, Value, When
+from django.utils import timezone
+from telegram.error import RetryAfter
+from telegram.request import HTTPXRequest
+
+from borrowings.models import Borrowing, Reminder
+from notifications.breaker import CircuitBreaker
+from notifications.sender import (
+    MAX_RETRY_AFTER,
+    build_digests,
+    get_retry_after,
+)
+
+DUE_SOON_DAYS = 2
+CONCURRENCY = 20
+# Sent reminders are recorded after every chunk of users
+DISPATCH_CHUNK_SIZE = 1000
+REMINDER_LOCK_ID = 0x0F1F
+
+
+class RemindersInProgress(Exception):
+    pass
+
+
+@dataclass
+class ReminderRun:
+    as_of: object
+    users: int = 0
+    sent: int = 0
+    failed: int = 0
+    messages: int = 0
+
+
+def find_reminders(as_of, days=DUE_SOON_DAYS):
+    """
+    Reminders not sent yet for borrowings due within `days` days
+    of `as_of` or already overdue, grouped per user as
+    `(chat_id, [(borrowing_id, kind, title, expected_return_date)])`.
+    Users without a Telegram chat are skipped.
+    """
+    reminders = (
+        Borrowing.objects.filter(
+            actual_return_date__isnull=True,
+            expected_return_date__lte=as_of + timedelta(days=days),
+            user__telegram_chat_id__isnull=False,
+        )
+        .annotate(
+            kind=Case(
+                When(
+                    expected_return_date__lt=as_of,
+                    then=Value(Reminder.Kind.OVERDUE),
+                ),
+                default=Value(Reminder.Kind.DUE_SOON),
+            )
+        )
+        .filter(
+            ~Exists(
+                Reminder.objects.filter(
+                    borrowing=OuterRef("pk"), kind=OuterRef("kind")
+                )
+            )
+        )
+        .order_by("user_id", "expected_return_date", "id")
+        .values_list(
+            "user__telegram_chat_id",
+            "id",
+            "kind",
+            "book__title",
+            "expected_return_date",
+        )
+    )
+    return [
+        (chat_id, [reminder[1:] for reminder in group])
+        for chat_id, group in itertools.groupby(
+            reminders, key=lambda reminder: reminder[0]
+        )
+    ]
+
+
+def build_reminder(items):
+    """Texts of the messages reminding a user about `items`."""
+    lines = ["Please return the books you borrowed from the library:"]
+    for _, kind, title, expected_return_date in items:
+        if kind == Reminder.Kind.OVERDUE:
+            lines.append(f"{title} - overdue since {expected_return_date}")
+        else:
+            lines.append(f"{title} - due {expected_return_date}")
+    # Long lists are split to fit in the message length limit
+    return [
+        "\n".join(lines[index] for index in digest)
+        for digest in build_digests(lines)
+    ]
+
+
+class ReminderDispatcher:
+    """
+    Send reminders to many chats at once. At most `concurrency`
+    messages are in flight, over a pool of as many kept-alive
+    connections, and a flood limit pauses all of them.
+    """
+
+    def __init__(self, concurrency=CONCURRENCY, breaker=None):
+        self.request = HTTPXRequest(connection_pool_size=concurrency)
+        self.bot = telegram.Bot(
+            settings.BOT_TOKEN,
+            base_url=settings.TELEGRAM_BASE_URL,
+            request=self.request,
+        )
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.breaker = breaker or CircuitBreaker()
+        self.paused_until = 0
+        self.messages = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.request.shutdown()
+
+    async def dispatch(self, reminders):
+        """Send `(chat_id, texts)` reminders, return which were sent."""
+        results = await asyncio.gather(
+            *(self.deliver(chat_id, texts) for chat_id, texts in reminders),
+            return_exceptions=True,
+        )
+        return [result is None for result in results]
+
+    async def deliver(self, chat_id, texts):
+        async with self.semaphore:
+            for text in texts:
+                await self.send(chat_id, text)
+
+    async def send(self, chat_id, text):
+        while True:
+            await asyncio.sleep(max(self.paused_until - time.monotonic(), 0))
+            try:
+                await self.breaker.call(
+                    self.bot.send_message, chat_id=chat_id, text=text
+                )
+            except RetryAfter as error:
+                retry_after = get_retry_after(error)
+                if retry_after > MAX_RETRY_AFTER:
+                    raise
+                self.paused_until = max(
+                    self.paused_until, time.monotonic() + retry_after
+                )
+                continue
+            self.messages += 1
+            return
+
+
+async def dispatch_reminders(run, reminders, concurrency, breaker=None):
+    async with ReminderDispatcher(concurrency, breaker) as dispatcher:
+        for start in range(0, len(reminders), DISPATCH_CHUNK_SIZE):
+            chunk = reminders[start : start + DISPATCH_CHUNK_SIZE]
+            sent = await dispatcher.dispatch(
+                [(chat_id, build_reminder(items)) for chat_id, items in chunk]
+            )
+            delivered = [
+                Reminder(borrowing_id=borrowing_id, kind=kind)
+                for (_, items), ok in zip(chunk, sent)
+                if ok
+                for borrowing_id, kind, *_ in items
+            ]
+            await sync_to_async(Reminder.objects.bulk_create)(
+                delivered, ignore_conflicts=True
+            )
+            run.users += len(chunk)
+            run.sent += len(delivered)
+            run.failed += sent.count(False)
+        run.messages = dispatcher.messages
+
+
+def send_reminders(
+    as_of=None, days=DUE_SOON_DAYS, concurrency=CONCURRENCY, breaker=None
+):
+    """
+    Remind users about borrowings due within `days` days of `as_of`
+    and about overdue ones, in one Telegram message per user.
+
+    Every borrowing gets one due soon and one overdue reminder at
+    most: sent reminders are recorded and skipped by later runs,
+    failed ones are sent again by the next run. Only one run
+    dispatches reminders at once.
+    """
+    run = ReminderRun(as_of=as_of or timezone.localdate())
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [REMINDER_LOCK_ID])
+        if not cursor.fetchone()[0]:
+            raise RemindersInProgress("Reminders are already being sent")
+        try:
+            reminders = find_reminders(run.as_of, days)
+            # Queries run in this thread, the event loop in another
+            async_to_sync(dispatch_reminders)(
+                run, reminders, concurrency, breaker
+            )
+        finally:
+            cursor.execute(
+                "SELECT pg_advisory_unlock(%s)", [REMINDER_LOCK_ID]
+            )
+    return run
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from books.models import Book
+from borrowings.models import Borrowing, Reservation
+from notifications.outbox import enqueue_notification
+
+
+def return_copy(book):
+    """
+    Put a returned copy of `book` back, handing it over to the oldest
+    waiting reservation if there is one. Must run in the transaction
+    of the return, return the borrowing of the reservation or None.
+
+    Raising the inventory first locks the book row, so returns and new
+    reservations of the book line up behind each other and no copy
+    stays on the shelf while somebody waits for it.
+    """
+    Book.objects.filter(pk=book.pk).check_in()
+    return assign_copy(book)
+
+
+def assign_copy(book):
+    """
+    Hand a copy of `book` from the inventory over to the oldest
+    waiting reservation, return its borrowing or None when nobody
+    waits. The book row must be locked by the caller.
+    """
+    while True:
+        reservation = (
+            Reservation.objects.select_for_update(
+                skip_locked=True, of=("self",)
+            )
+            .select_related("user")
+            .filter(book=book, status=Reservation.Status.WAITING)
+            .order_by("created_at", "id")
+            .first()
+        )
+        if reservation is None:
+            return None
+        try:
+            with transaction.atomic():
+                borrowing = Borrowing.objects.create(
+                    user=reservation.user,
+                    book=book,
+                    expected_return_date=timezone.localdate()
+                    + timedelta(days=reservation.loan_days),
+                )
+            break
+        except IntegrityError:
+            # The user has borrowed the book since, drop the reservation
+            reservation.status = Reservation.Status.CANCELLED
+            reservation.save(update_fields=["status"])
+
+    Book.objects.filter(pk=book.pk).check_out()
+    reservation.status = Reservation.Status.FULFILLED
+    reservation.borrowing = borrowing
+    reservation.fulfilled_at = timezone.now()
+    reservation.save(update_fields=["status", "borrowing", "fulfilled_at"])
+    if reservation.user.telegram_chat_id:
+        enqueue_notification(
+            f"A copy of `{book.title}` you reserved is yours, "
+            f"please return it by {borrowing.expected_return_date}",
+            chat_id=reservation.user.telegram_chat_id,
+        )
+    return borrowing
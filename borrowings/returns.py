@@ -0,0 +1,100 @@
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.db import connection, transaction
+
+from books.cache import invalidate_catalog
+from books.models import Book
+from borrowings.models import Borrowing, Reservation
+from borrowings.reservations import assign_copy
+
+# Returned copies per book put back in one statement, like `check_in`
+RESTORE_INVENTORY_SQL = """
+    UPDATE {book} AS book
+    SET
+        inventory = book.inventory + returned.copies,
+        active_borrows = greatest(book.active_borrows - returned.copies, 0)
+    FROM (VALUES {values}) AS returned (id, copies)
+    WHERE book.id = returned.id
+"""
+
+
+@dataclass
+class BatchReturn:
+    returned: list = field(default_factory=list)
+    already_returned: list = field(default_factory=list)
+    not_found: list = field(default_factory=list)
+
+
+def restore_inventory(copies):
+    """Add `{book_id: copies}` back to the inventories of the books."""
+    book_ids = sorted(copies)
+    # Lock in id order, like checkouts do, so the two cannot deadlock
+    list(
+        Book.objects.select_for_update()
+        .filter(pk__in=book_ids)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            RESTORE_INVENTORY_SQL.format(
+                book=Book._meta.db_table,
+                values=", ".join(["(%s, %s)"] * len(book_ids)),
+            ),
+            [
+                param
+                for book_id in book_ids
+                for param in (book_id, copies[book_id])
+            ],
+        )
+
+
+def return_borrowings(queryset, borrowing_ids, actual_return_date):
+    """
+    Return the borrowings of `queryset` with `borrowing_ids` in one
+    transaction. Borrowings returned before are reported rather than
+    failing the others, ones missing from `queryset` as not found.
+    Returned copies go to waiting reservations first, like single
+    returns do.
+    """
+    with transaction.atomic():
+        returned = list(
+            queryset.filter(
+                id__in=borrowing_ids, actual_return_date__isnull=True
+            )
+            .select_for_update(of=("self",))
+            .order_by("id")
+            .values_list("id", "book_id")
+        )
+        Borrowing.objects.filter(
+            id__in=[borrowing_id for borrowing_id, _ in returned]
+        ).update(actual_return_date=actual_return_date)
+        found = set(
+            queryset.filter(id__in=borrowing_ids).values_list("id", flat=True)
+        )
+
+        copies = Counter(book_id for _, book_id in returned)
+        if copies:
+            restore_inventory(copies)
+            reserved = Book.objects.filter(
+                pk__in=Reservation.objects.filter(
+                    book__in=copies, status=Reservation.Status.WAITING
+                ).values("book")
+            ).order_by("pk")
+            for book in reserved:
+                for _ in range(copies[book.id]):
+                    if assign_copy(book) is None:
+                        break
+            invalidate_catalog()
+
+    returned = {borrowing_id for borrowing_id, _ in returned}
+    result = BatchReturn()
+    for borrowing_id in borrowing_ids:
+        if borrowing_id in returned:
+            result.returned.append(borrowing_id)
+        elif borrowing_id in found:
+            result.already_returned.append(borrowing_id)
+        else:
+            result.not_found.append(borrowing_id)
+    return result
@@ -1,11 +1,21 @@
 from django.db import transaction, IntegrityError
+from django.utils import timezone
 from rest_framework import serializers
 
+from books.cache import invalidate_catalog
+from books.fieldsets import SparseFieldsetSerializerMixin
+from books.models import Book
 from books.serializers import BookSerializer
-from borrowings.models import Borrowing
+from borrowings.models import Borrowing, Reservation
+from notifications.outbox import enqueue_notification
 
+MAX_CHECKOUT_BOOKS = 50
+MAX_RETURN_BORROWINGS = 200
 
-class BorrowingListSerializer(serializers.ModelSerializer):
+
+class BorrowingListSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     book_title = serializers.CharField(source="book.title", read_only=True)
 
     class Meta:
@@ -19,8 +29,22 @@ class BorrowingListSerializer(serializers.ModelSerializer):
         )
 
 
-class BorrowingDetailSerializer(serializers.ModelSerializer):
-    book = BookSerializer(read_only=True)
+class BorrowingBookSerializer(BookSerializer):
+    # Borrowed books are not annotated with `with_next_available_date()`
+    next_available_date = None
+
+    class Meta(BookSerializer.Meta):
+        fields = tuple(
+            field
+            for field in BookSerializer.Meta.fields
+            if field != "next_available_date"
+        )
+
+
+class BorrowingDetailSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
+    book = BorrowingBookSerializer(read_only=True)
     user = serializers.CharField(source="user.email", read_only=True)
 
     class Meta:
@@ -52,12 +76,31 @@ class BorrowingCreateSerializer(serializers.ModelSerializer):
         book = validated_data.pop("book")
         try:
             with transaction.atomic():
-                book.inventory -= 1
-                book.save()
+                taken = Book.objects.filter(
+                    pk=book.pk, inventory__gt=0
+                ).check_out()
+                if not taken:
+                    raise serializers.ValidationError(
+                        {
+                            "detail": f"Book `{book.title}` "
+                            f"does not have in inventory"
+                        }
+                    )
+                invalidate_catalog()
                 borrowing = Borrowing.objects.create(
                     book=book,
                     **validated_data,
                 )
+                # A copy that turned up ends the user's own wait
+                Reservation.objects.filter(
+                    user=borrowing.user,
+                    book=book,
+                    status=Reservation.Status.WAITING,
+                ).update(
+                    status=Reservation.Status.FULFILLED,
+                    borrowing=borrowing,
+                    fulfilled_at=timezone.now(),
+                )
                 return borrowing
         except IntegrityError:
             raise serializers.ValidationError(
@@ -65,7 +108,221 @@ class BorrowingCreateSerializer(serializers.ModelSerializer):
             )
 
 
+class CheckoutSerializer(serializers.Serializer):
+    books = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=MAX_CHECKOUT_BOOKS,
+        write_only=True,
+        help_text="Ids of the books to borrow",
+    )
+    expected_return_date = serializers.DateField()
+    borrowings = BorrowingListSerializer(many=True, read_only=True)
+
+    def validate_books(self, books):
+        if len(set(books)) != len(books):
+            raise serializers.ValidationError("Book ids must be unique")
+        return books
+
+    def create(self, validated_data):
+        """
+        Borrow all the books or none. Book rows are locked in id order,
+        so checkouts sharing books cannot deadlock, then inventories
+        are taken with one UPDATE and borrowings inserted in one batch.
+        """
+        user = validated_data["user"]
+        book_ids = validated_data["books"]
+        try:
+            with transaction.atomic():
+                books = {
+                    book.id: book
+                    for book in Book.objects.select_for_update()
+                    .filter(pk__in=book_ids)
+                    .order_by("pk")
+                    .only("id", "title", "inventory")
+                }
+                borrowed = set(
+                    Borrowing.objects.filter(
+                        user=user, book__in=book_ids
+                    ).values_list("book_id", flat=True)
+                )
+                errors = {}
+                for book_id in book_ids:
+                    book = books.get(book_id)
+                    if book is None:
+                        errors[book_id] = "Book does not exist"
+                    elif book_id in borrowed:
+                        errors[book_id] = (
+                            f"User has already borrowed book `{book.title}`"
+                        )
+                    elif book.inventory < 1:
+                        errors[book_id] = (
+                            f"Book `{book.title}` does not have in inventory"
+                        )
+                if errors:
+                    raise serializers.ValidationError(
+                        {
+                            "books": {
+                                str(book_id): [error]
+                                for book_id, error in errors.items()
+                            }
+                        }
+                    )
+
+                Book.objects.filter(pk__in=book_ids).check_out()
+                borrowings = Borrowing.objects.bulk_create(
+                    Borrowing(
+                        user=user,
+                        book=books[book_id],
+                        expected_return_date=validated_data[
+                            "expected_return_date"
+                        ],
+                    )
+                    for book_id in book_ids
+                )
+                by_book = {
+                    borrowing.book_id: borrowing for borrowing in borrowings
+                }
+                reservations = list(
+                    Reservation.objects.filter(
+                        user=user,
+                        book__in=book_ids,
+                        status=Reservation.Status.WAITING,
+                    )
+                )
+                for reservation in reservations:
+                    reservation.status = Reservation.Status.FULFILLED
+                    reservation.borrowing = by_book[reservation.book_id]
+                    reservation.fulfilled_at = timezone.now()
+                Reservation.objects.bulk_update(
+                    reservations, ["status", "borrowing", "fulfilled_at"]
+                )
+                invalidate_catalog()
+                # `bulk_create` sends no signals, one message for all
+                titles = ", ".join(
+                    books[book_id].title for book_id in book_ids
+                )
+                enqueue_notification(
+                    f"New borrowing:\n "
+                    f"User: {user} \n "
+                    f"Books: {titles}\n "
+                    f"Expected return date: "
+                    f"{validated_data['expected_return_date']}\n "
+                    f"Borrow date: {borrowings[0].borrow_date}"
+                )
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {"detail": "User has already borrowed one of the books"}
+            )
+        return {**validated_data, "borrowings": borrowings}
+
+
 class BorrowingReturnSerializer(serializers.ModelSerializer):
     class Meta:
         model = Borrowing
         fields = ("id", "actual_return_date")
+
+
+class ReservationSerializer(serializers.ModelSerializer):
+    book_title = serializers.CharField(source="book.title", read_only=True)
+    position = serializers.IntegerField(
+        read_only=True,
+        allow_null=True,
+        help_text="Place in the waitlist of the book while waiting",
+    )
+
+    class Meta:
+        model = Reservation
+        fields = (
+            "id",
+            "book",
+            "book_title",
+            "status",
+            "loan_days",
+            "position",
+            "borrowing",
+            "created_at",
+            "fulfilled_at",
+        )
+        read_only_fields = (
+            "status",
+            "borrowing",
+            "created_at",
+            "fulfilled_at",
+        )
+
+    def create(self, validated_data):
+        book = validated_data["book"]
+        with transaction.atomic():
+            # Returns lock the book row too, so a copy cannot come back
+            # unnoticed while the reservation is being made
+            inventory = (
+                Book.objects.select_for_update()
+                .values_list("inventory", flat=True)
+                .get(pk=book.pk)
+            )
+            if inventory > 0:
+                raise serializers.ValidationError(
+                    {"detail": f"Book `{book.title}` is in inventory"}
+                )
+            if Borrowing.objects.filter(
+                user=validated_data["user"], book=book
+            ).exists():
+                raise serializers.ValidationError(
+                    {
+                        "detail": "User has already borrowed book "
+                        f"`{book.title}`"
+                    }
+                )
+            try:
+                with transaction.atomic():
+                    reservation = super().create(validated_data)
+            except IntegrityError:
+                raise serializers.ValidationError(
+                    {"detail": f"User already waits for book `{book.title}`"}
+                )
+        return Reservation.objects.with_position().get(pk=reservation.pk)
+
+
+class BorrowingBatchReturnSerializer(serializers.Serializer):
+    borrowings = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=MAX_RETURN_BORROWINGS,
+        write_only=True,
+        help_text="Ids of the borrowings to return",
+    )
+    actual_return_date = serializers.DateField(
+        required=False,
+        allow_null=True,
+        write_only=True,
+        help_text="Today by default",
+    )
+    returned = serializers.ListField(
+        child=serializers.IntegerField(), read_only=True
+    )
+    already_returned = serializers.ListField(
+        child=serializers.IntegerField(), read_only=True
+    )
+    not_found = serializers.ListField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+    def validate_borrowings(self, borrowings):
+        if len(set(borrowings)) != len(borrowings):
+            raise serializers.ValidationError("Borrowing ids must be unique")
+        return borrowings
+
+
+class OverdueScanSerializer(serializers.Serializer):
+    date = serializers.DateField(
+        required=False,
+        write_only=True,
+        help_text="Calculate fines as of this date, today by default",
+    )
+    as_of = serializers.DateField(read_only=True)
+    overdue = serializers.IntegerField(read_only=True)
+    changed = serializers.IntegerField(
+        read_only=True, help_text="Fines created or updated by the scan"
+    )
+    chunks = serializers.IntegerField(read_only=True)
@@ -1,19 +1,8 @@
-import asyncio
-import os
-
-import telegram
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from dotenv import load_dotenv
 
 from borrowings.models import Borrowing
-
-load_dotenv()
-
-TOKEN = os.getenv("BOT_TOKEN")
-CHAT_ID = os.getenv("CHAT_ID")
-
-bot = telegram.Bot(token=TOKEN)
+from notifications.outbox import enqueue_notification
 
 
 @receiver(post_save, sender=Borrowing)
@@ -26,8 +15,4 @@ def notify_new_borrowing(sender, instance, created, **kwargs):
             f"Expected return date: {instance.expected_return_date}\n "
             f"Borrow date: {instance.borrow_date}"
         )
-        asyncio.run(send_telegram_message(message))
-
-
-async def send_telegram_message(message: str):
-    await bot.send_message(chat_id=CHAT_ID, text=message)
+        enqueue_notification(message)
@@ -1,10 +1,12 @@
 from datetime import timedelta
-from unittest.mock import patch, AsyncMock
 
 from django.contrib.auth import get_user_model
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.timezone import now
 
@@ -17,6 +19,7 @@ from borrowings.serializers import (
 )
 
 BORROWING_URL = reverse("borrowings:borrowings-list")
+EXPORT_URL = reverse("borrowings:borrowings-export")
 
 
 def borrowing_detail_url(borrowing_id):
@@ -45,6 +48,10 @@ class PublicBorrowingApiTests(TestCase):
         response = self.client.get(borrowing_detail_url(1))
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_borrowing_export_auth_required(self):
+        response = self.client.get(EXPORT_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
 
 class PrivateBorrowingApiTests(TestCase):
     def setUp(self):
@@ -54,8 +61,7 @@ class PrivateBorrowingApiTests(TestCase):
         )
         self.client.force_authenticate(self.user)
 
-    @patch("borrowings.signals.send_telegram_message", new_callable=AsyncMock)
-    def test_borrowing_list(self, mock_send_telegram_message):
+    def test_borrowing_list(self):
         create_borrowing(user=self.user)
         response = self.client.get(BORROWING_URL)
         borrowings = Borrowing.objects.filter(user=self.user)
@@ -64,8 +70,7 @@ class PrivateBorrowingApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
-    @patch("borrowings.signals.send_telegram_message", new_callable=AsyncMock)
-    def test_filter_borrowings_by_is_active(self, mock_send_telegram_message):
+    def test_filter_borrowings_by_is_active(self):
         borrowing_without_return_date = create_borrowing(user=self.user)
         new_book = create_book(title="Book Title 2")
         return_date = now().date() + timedelta(days=11)
@@ -81,8 +86,78 @@ class PrivateBorrowingApiTests(TestCase):
         self.assertIn(serializer_1.data, response.data["results"])
         self.assertNotIn(serializer_2.data, response.data["results"])
 
-    @patch("borrowings.signals.send_telegram_message", new_callable=AsyncMock)
-    def test_borrowing_detail(self, mock_send_telegram_message):
+    def test_borrowing_export_only_own(self):
+        borrowing = create_borrowing(user=self.user)
+        other_user = get_user_model().objects.create_user(
+            email="other@test.com", password="test_password"
+        )
+        create_borrowing(user=other_user)
+
+        response = self.client.get(EXPORT_URL, {"file_format": "csv"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            lines,
+            [
+                "id,user_id,book_id,borrow_date,"
+                "expected_return_date,actual_return_date",
+                f"{borrowing.id},{self.user.id},{borrowing.book_id},"
+                f"{borrowing.borrow_date},{borrowing.expected_return_date},",
+            ],
+        )
+
+    def test_borrowing_list_sparse_fieldset(self):
+        borrowing = create_borrowing(user=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response_1 = self.client.get(
+                BORROWING_URL, {"fields": "id,expected_return_date"}
+            )
+        select_1 = queries.captured_queries[-1]["sql"]
+        with CaptureQueriesContext(connection) as queries:
+            response_2 = self.client.get(
+                BORROWING_URL, {"fields": "id,book_title"}
+            )
+        select_2 = queries.captured_queries[-1]["sql"]
+
+        self.assertEqual(
+            response_1.data["results"],
+            [
+                {
+                    "id": borrowing.id,
+                    "expected_return_date": str(
+                        borrowing.expected_return_date
+                    ),
+                }
+            ],
+        )
+        self.assertNotIn("JOIN", select_1)
+        self.assertEqual(
+            response_2.data["results"],
+            [{"id": borrowing.id, "book_title": "Test Book"}],
+        )
+        self.assertIn('JOIN "books_book"', select_2)
+        self.assertNotIn('"user_user"', select_2)
+
+    def test_borrowing_detail_sparse_fieldset(self):
+        borrowing = create_borrowing(user=self.user)
+        response = self.client.get(
+            borrowing_detail_url(borrowing.id), {"fields": "user,book"}
+        )
+
+        self.assertEqual(response.data["user"], self.user.email)
+        self.assertEqual(response.data["book"]["id"], borrowing.book_id)
+        self.assertEqual(set(response.data), {"user", "book"})
+
+    def test_borrowing_detail_book_without_next_available_date(self):
+        borrowing = create_borrowing(user=self.user)
+        response = self.client.get(borrowing_detail_url(borrowing.id))
+
+        self.assertEqual(response.data["book"]["id"], borrowing.book_id)
+        self.assertNotIn("next_available_date", response.data["book"])
+
+    def test_borrowing_detail(self):
         borrowing = create_borrowing(user=self.user)
         url = borrowing_detail_url(borrowing.id)
         response = self.client.get(url)
@@ -91,8 +166,7 @@ class PrivateBorrowingApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
-    @patch("borrowings.signals.send_telegram_message", new_callable=AsyncMock)
-    def test_return_borrowing(self, mock_send_telegram_message):
+    def test_return_borrowing(self):
         new_book = create_book(inventory=4)
         borrowing = create_borrowing(user=self.user, book=new_book)
         url = reverse(
@@ -116,10 +190,7 @@ class PrivateBorrowingApiTests(TestCase):
             response_2.data, {"detail": "This book is already returned"}
         )
 
-    @patch("borrowings.signals.send_telegram_message", new_callable=AsyncMock)
-    def test_return_borrowing_without_actual_return_date(
-        self, mock_send_telegram_message
-    ):
+    def test_return_borrowing_without_actual_return_date(self):
         borrowing = create_borrowing(user=self.user)
         url = reverse(
             "borrowings:borrowings-return-borrowing", args=[borrowing.id]
@@ -134,8 +205,32 @@ class PrivateBorrowingApiTests(TestCase):
         )
         self.assertEqual(borrowing.actual_return_date, return_date)
 
-    @patch("borrowings.signals.send_telegram_message", new_callable=AsyncMock)
-    def test_create_borrowing(self, mock_send_telegram_message):
+    def test_borrow_and_return_refresh_cached_book(self):
+        book = create_book(inventory=3)
+        book_url = reverse("books:books-detail", args=[book.id])
+        self.client.get(book_url)
+
+        response = self.client.post(
+            BORROWING_URL,
+            {
+                "book": book.id,
+                "expected_return_date": now().date() + timedelta(days=10),
+            },
+        )
+        inventory_after_borrow = self.client.get(book_url).data["inventory"]
+        self.client.post(
+            reverse(
+                "borrowings:borrowings-return-borrowing",
+                args=[response.data["id"]],
+            ),
+            {"actual_return_date": ""},
+        )
+        inventory_after_return = self.client.get(book_url).data["inventory"]
+
+        self.assertEqual(inventory_after_borrow, 2)
+        self.assertEqual(inventory_after_return, 3)
+
+    def test_create_borrowing(self):
         book = create_book(title="Test Title")
         payload = {
             "book": book.id,
@@ -155,8 +250,7 @@ class PrivateBorrowingApiTests(TestCase):
 
 
 class AdminBorrowingApiTests(TestCase):
-    @patch("borrowings.signals.send_telegram_message", new_callable=AsyncMock)
-    def setUp(self, mock_send_telegram_message):
+    def setUp(self):
         self.client = APIClient()
         self.user = get_user_model().objects.create_superuser(
             email="admin@test.com", password="test_password"
@@ -177,6 +271,25 @@ class AdminBorrowingApiTests(TestCase):
         self.assertEqual(response.data["results"], serializer.data)
         self.assertEqual(response.data["count"], 2)
 
+    def test_borrowing_list_cursor_pagination(self):
+        for _ in range(6):
+            create_borrowing(user=self.test_user)
+        expected_ids = list(
+            Borrowing.objects.order_by("borrow_date", "id").values_list(
+                "id", flat=True
+            )
+        )
+
+        response = self.client.get(BORROWING_URL, {"pagination": "cursor"})
+        first_page = [item["id"] for item in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        second_page = [item["id"] for item in response.data["results"]]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(first_page + second_page, expected_ids)
+
     def test_filter_borrowing_list_by_user_id(self):
         response = self.client.get(BORROWING_URL, {"user_id": self.user.id})
         borrowings_with_correct_user = Borrowing.objects.filter(user=self.user)
@@ -194,3 +307,27 @@ class AdminBorrowingApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn(serializer_1.data[0], response.data["results"])
         self.assertNotIn(serializer_2.data[0], response.data["results"])
+
+    def test_borrowing_list_renders_like_serializer(self):
+        response = self.client.get(BORROWING_URL, {"pagination": "cursor"})
+        serializer = BorrowingListSerializer(
+            Borrowing.objects.order_by("borrow_date", "id"), many=True
+        )
+        expected = JSONRenderer().render(
+            {"next": None, "previous": None, "results": serializer.data}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, expected)
+
+    def test_borrowing_export(self):
+        response = self.client.get(EXPORT_URL)
+        rows = b"".join(response.streaming_content).splitlines()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(rows), 2)
+
+        response = self.client.get(EXPORT_URL, {"user_id": self.user.id})
+        rows = b"".join(response.streaming_content).splitlines()
+
+        self.assertEqual(len(rows), 1)
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase, override_settings
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from books.models import Book
+from borrowings.models import Borrowing
+from borrowings.tests.test_borrowing_api import (
+    BORROWING_URL,
+    borrowing_detail_url,
+    create_borrowing,
+)
+from notifications.models import Notification
+from user.revocation import RevocationFilter, revoke_token
+
+
+@mock.patch("user.revocation.revocations", RevocationFilter())
+@override_settings(ROOT_URLCONF="books.tests.async_urls")
+class AsyncBorrowingViewTests(TestCase):
+    def setUp(self):
+        self.client = AsyncClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.token = RefreshToken.for_user(self.user).access_token
+        self.borrowing = create_borrowing(user=self.user)
+        self.other = create_borrowing(
+            user=get_user_model().objects.create_user(email="other@test.com")
+        )
+
+    def authorize(self, token=None):
+        return {"Authorize": f"Bearer {token or self.token}"}
+
+    async def test_borrowing_list_of_user(self):
+        response = await self.client.get(
+            BORROWING_URL, headers=self.authorize()
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [borrowing["id"] for borrowing in response.json()["results"]],
+            [self.borrowing.id],
+        )
+
+    async def test_borrowing_detail(self):
+        response = await self.client.get(
+            borrowing_detail_url(self.borrowing.id), headers=self.authorize()
+        )
+        other = await self.client.get(
+            borrowing_detail_url(self.other.id), headers=self.authorize()
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["user"], self.user.email)
+        self.assertEqual(response.json()["book"]["id"], self.borrowing.book_id)
+        self.assertEqual(other.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_auth_required(self):
+        anonymous = await self.client.get(BORROWING_URL)
+        invalid = await self.client.get(
+            BORROWING_URL, headers=self.authorize("invalid")
+        )
+        self.assertEqual(anonymous.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(invalid.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_revoked_token_rejected(self):
+        await sync_to_async(revoke_token)(self.token)
+        response = await self.client.get(
+            BORROWING_URL, headers=self.authorize()
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_create_borrowing(self):
+        book = await Book.objects.acreate(
+            title="New",
+            author="Author",
+            cover="Soft",
+            inventory=1,
+            daily_fee=1,
+        )
+        response = await self.client.post(
+            BORROWING_URL,
+            {
+                "book": book.id,
+                "expected_return_date": now().date() + timedelta(days=5),
+            },
+            headers=self.authorize(),
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(
+            await Borrowing.objects.filter(user=self.user, book=book).aexists()
+        )
+        # The notification is queued in the transaction of the borrowing
+        self.assertTrue(
+            await Notification.objects.filter(
+                text__startswith="New borrowing"
+            ).aexists()
+        )
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.tests.test_book_api import create_book
+from borrowings.models import Borrowing, Reservation
+from notifications.models import Notification
+
+CHECKOUT_URL = reverse("borrowings:borrowings-checkout")
+
+
+class CheckoutApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.client.force_authenticate(self.user)
+        self.books = [
+            create_book(title=f"Book {i}", inventory=2) for i in range(3)
+        ]
+        self.expected_return_date = now().date() + timedelta(days=10)
+
+    def checkout(self, book_ids):
+        return self.client.post(
+            CHECKOUT_URL,
+            {
+                "books": book_ids,
+                "expected_return_date": self.expected_return_date,
+            },
+            format="json",
+        )
+
+    def test_checkout_auth_required(self):
+        self.client.force_authenticate(None)
+        response = self.checkout([self.books[0].id])
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_checkout_books(self):
+        book_ids = [book.id for book in reversed(self.books)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.checkout(book_ids)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [item["book_title"] for item in response.data["borrowings"]],
+            ["Book 2", "Book 1", "Book 0"],
+        )
+        self.assertEqual(
+            set(Borrowing.objects.values_list("user", "book")),
+            {(self.user.id, book_id) for book_id in book_ids},
+        )
+        for book in self.books:
+            book.refresh_from_db()
+            self.assertEqual(book.inventory, 1)
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertIn(
+            "Books: Book 2, Book 1, Book 0", Notification.objects.get().text
+        )
+        # The number of queries does not grow with the number of books
+        self.assertLess(len(queries), 15)
+
+    def test_checkout_fails_as_a_whole(self):
+        self.books[1].inventory = 0
+        self.books[1].save()
+        Borrowing.objects.create(
+            user=self.user,
+            book=self.books[2],
+            expected_return_date=self.expected_return_date,
+        )
+        response = self.checkout(
+            [self.books[0].id, self.books[1].id, self.books[2].id, 9999]
+        )
+        self.books[0].refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            set(response.data["books"]),
+            {str(self.books[1].id), str(self.books[2].id), "9999"},
+        )
+        self.assertEqual(self.books[0].inventory, 2)
+        self.assertEqual(Borrowing.objects.count(), 1)
+
+    def test_checkout_duplicate_books_rejected(self):
+        response = self.checkout([self.books[0].id, self.books[0].id])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Borrowing.objects.exists())
+
+    def test_checkout_fulfils_own_reservation(self):
+        reservation = Reservation.objects.create(
+            user=self.user, book=self.books[0]
+        )
+        self.checkout([self.books[0].id])
+        reservation.refresh_from_db()
+
+        self.assertEqual(reservation.status, Reservation.Status.FULFILLED)
+        self.assertEqual(reservation.borrowing.book, self.books[0])
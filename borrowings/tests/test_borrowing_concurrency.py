@@ -0,0 +1,302 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.tests.test_book_api import create_book
+from borrowings.models import Borrowing, Reservation
+
+BORROWING_URL = reverse("borrowings:borrowings-list")
+RESERVATION_URL = reverse("borrowings:reservations-list")
+CHECKOUT_URL = reverse("borrowings:borrowings-checkout")
+RETURN_BATCH_URL = reverse("borrowings:borrowings-return-batch")
+WORKERS = 20
+
+
+def borrowing_return_url(borrowing_id):
+    return reverse(
+        "borrowings:borrowings-return-borrowing", args=[borrowing_id]
+    )
+
+
+def run_concurrently(func, items):
+    """Run `func` for every item in a thread pool, one DB connection each."""
+
+    def target(item):
+        try:
+            return func(item)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        return list(executor.map(target, items))
+
+
+class BorrowingInventoryConcurrencyTests(TransactionTestCase):
+    USERS = 200
+    INVENTORY = 50
+
+    def setUp(self):
+        self.book = create_book(inventory=self.INVENTORY)
+        self.users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"user{i}@test.com")
+            for i in range(self.USERS)
+        )
+
+    def borrow(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(
+            BORROWING_URL,
+            {
+                "book": self.book.id,
+                "expected_return_date": now().date() + timedelta(days=10),
+            },
+        )
+        return response.status_code
+
+    def return_borrowing(self, borrowing):
+        client = APIClient()
+        client.force_authenticate(borrowing.user)
+        response = client.post(
+            borrowing_return_url(borrowing.id), {"actual_return_date": ""}
+        )
+        return response.status_code
+
+    def test_concurrent_borrows_never_oversell(self):
+        statuses = run_concurrently(self.borrow, self.users)
+        self.book.refresh_from_db()
+
+        self.assertEqual(
+            statuses.count(status.HTTP_201_CREATED), self.INVENTORY
+        )
+        self.assertEqual(
+            statuses.count(status.HTTP_400_BAD_REQUEST),
+            self.USERS - self.INVENTORY,
+        )
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(
+            Borrowing.objects.filter(book=self.book).count(), self.INVENTORY
+        )
+
+    def test_concurrent_returns_restore_inventory(self):
+        run_concurrently(self.borrow, self.users[: self.INVENTORY])
+        borrowings = list(
+            Borrowing.objects.filter(book=self.book).select_related("user")
+        )
+
+        # Every borrowing is returned twice at the same time
+        statuses = run_concurrently(self.return_borrowing, borrowings * 2)
+        self.book.refresh_from_db()
+
+        self.assertEqual(statuses.count(status.HTTP_200_OK), self.INVENTORY)
+        self.assertEqual(
+            statuses.count(status.HTTP_400_BAD_REQUEST), self.INVENTORY
+        )
+        self.assertEqual(self.book.inventory, self.INVENTORY)
+        self.assertFalse(
+            Borrowing.objects.filter(actual_return_date__isnull=True).exists()
+        )
+
+    def test_overlapping_batch_returns(self):
+        run_concurrently(self.borrow, self.users[: self.INVENTORY])
+        borrowing_ids = list(
+            Borrowing.objects.filter(book=self.book).values_list(
+                "id", flat=True
+            )
+        )
+        admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="test_password"
+        )
+
+        def return_batch(offset):
+            # Batches overlap by half and list the borrowings in turns
+            batch = borrowing_ids[offset : offset + 10]
+            if offset % 2:
+                batch.reverse()
+            client = APIClient()
+            client.force_authenticate(admin)
+            response = client.post(
+                RETURN_BATCH_URL, {"borrowings": batch}, format="json"
+            )
+            return response.data["returned"]
+
+        returned = run_concurrently(return_batch, range(0, self.INVENTORY, 5))
+        self.book.refresh_from_db()
+
+        self.assertEqual(sorted(sum(returned, [])), sorted(borrowing_ids))
+        self.assertEqual(self.book.inventory, self.INVENTORY)
+
+    def test_concurrent_borrows_and_returns(self):
+        run_concurrently(self.borrow, self.users[: self.INVENTORY])
+        borrowings = list(
+            Borrowing.objects.filter(book=self.book).select_related("user")
+        )
+
+        def borrow_or_return(item):
+            if isinstance(item, Borrowing):
+                return self.return_borrowing(item)
+            return self.borrow(item)
+
+        mixed = [
+            item
+            for pair in zip(borrowings, self.users[self.INVENTORY:])
+            for item in pair
+        ]
+        run_concurrently(borrow_or_return, mixed)
+        self.book.refresh_from_db()
+
+        active = Borrowing.objects.filter(
+            book=self.book, actual_return_date__isnull=True
+        ).count()
+        self.assertGreaterEqual(self.book.inventory, 0)
+        self.assertEqual(self.book.inventory + active, self.INVENTORY)
+
+
+class CheckoutConcurrencyTests(TransactionTestCase):
+    BOOKS = 5
+    INVENTORY = 10
+    USERS = 40
+
+    def setUp(self):
+        self.books = [
+            create_book(title=f"Book {i}", inventory=self.INVENTORY)
+            for i in range(self.BOOKS)
+        ]
+        self.users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"user{i}@test.com")
+            for i in range(self.USERS)
+        )
+
+    def checkout(self, user):
+        # Every user lists the same books in a different order
+        book_ids = [book.id for book in self.books]
+        offset = user.id % self.BOOKS
+        book_ids = book_ids[offset:] + book_ids[:offset]
+        if user.id % 2:
+            book_ids.reverse()
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(
+            CHECKOUT_URL,
+            {
+                "books": book_ids,
+                "expected_return_date": now().date() + timedelta(days=10),
+            },
+            format="json",
+        )
+        return response.status_code
+
+    def test_overlapping_checkouts_never_deadlock_or_oversell(self):
+        statuses = run_concurrently(self.checkout, self.users)
+
+        self.assertEqual(
+            statuses.count(status.HTTP_201_CREATED), self.INVENTORY
+        )
+        self.assertEqual(
+            statuses.count(status.HTTP_400_BAD_REQUEST),
+            self.USERS - self.INVENTORY,
+        )
+        for book in self.books:
+            book.refresh_from_db()
+            self.assertEqual(book.inventory, 0)
+            self.assertEqual(
+                Borrowing.objects.filter(book=book).count(), self.INVENTORY
+            )
+
+
+class ReservationConcurrencyTests(TransactionTestCase):
+    INVENTORY = 20
+    WAITING = 60
+
+    def setUp(self):
+        self.book = create_book(inventory=0)
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"user{i}@test.com")
+            for i in range(self.INVENTORY + self.WAITING)
+        )
+        self.borrowers = users[: self.INVENTORY]
+        self.waiting = users[self.INVENTORY :]
+        self.borrowings = Borrowing.objects.bulk_create(
+            Borrowing(
+                user=user,
+                book=self.book,
+                expected_return_date=now().date() + timedelta(days=10),
+            )
+            for user in self.borrowers
+        )
+
+    def reserve(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(RESERVATION_URL, {"book": self.book.id})
+        return response.status_code
+
+    def return_borrowing(self, borrowing):
+        client = APIClient()
+        client.force_authenticate(borrowing.user)
+        response = client.post(
+            borrowing_return_url(borrowing.id), {"actual_return_date": ""}
+        )
+        return response.status_code
+
+    def test_simultaneous_returns_serve_oldest_reservations(self):
+        for user in self.waiting:
+            self.reserve(user)
+
+        statuses = run_concurrently(self.return_borrowing, self.borrowings)
+        self.book.refresh_from_db()
+        fulfilled = Reservation.objects.filter(
+            status=Reservation.Status.FULFILLED
+        ).select_related("borrowing")
+
+        self.assertEqual(statuses, [status.HTTP_200_OK] * self.INVENTORY)
+        self.assertEqual(self.book.inventory, 0)
+        # Every returned copy went to one of the oldest reservations
+        self.assertEqual(
+            {reservation.user_id for reservation in fulfilled},
+            {user.id for user in self.waiting[: self.INVENTORY]},
+        )
+        self.assertTrue(
+            all(
+                reservation.borrowing.user_id == reservation.user_id
+                for reservation in fulfilled
+            )
+        )
+        self.assertEqual(
+            Borrowing.objects.filter(
+                book=self.book, actual_return_date__isnull=True
+            ).count(),
+            self.INVENTORY,
+        )
+
+    def test_reservations_racing_returns_leave_no_idle_copy(self):
+        mixed = [
+            item
+            for pair in zip(self.borrowings, self.waiting)
+            for item in pair
+        ]
+
+        def reserve_or_return(item):
+            if isinstance(item, Borrowing):
+                return self.return_borrowing(item)
+            return self.reserve(item)
+
+        run_concurrently(reserve_or_return, mixed)
+        self.book.refresh_from_db()
+        waiting = Reservation.objects.filter(
+            status=Reservation.Status.WAITING
+        ).count()
+        active = Borrowing.objects.filter(
+            book=self.book, actual_return_date__isnull=True
+        ).count()
+
+        # A copy is either borrowed or on the shelf with nobody waiting
+        self.assertEqual(self.book.inventory + active, self.INVENTORY)
+        self.assertTrue(self.book.inventory == 0 or waiting == 0)
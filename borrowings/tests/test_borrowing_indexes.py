@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from books.models import Book
+from borrowings.models import Borrowing
+
+USERS = 200
+BOOKS = 200
+# Every user borrowed every book, one borrowing in 50 is still active
+SEED_SQL = """
+    INSERT INTO borrowings_borrowing (
+        user_id, book_id, borrow_date,
+        expected_return_date, actual_return_date
+    )
+    SELECT
+        u.id,
+        b.id,
+        DATE '2025-01-01' + (b.id + u.id) %% 300,
+        DATE '2025-01-15' + (b.id + u.id) %% 300,
+        CASE
+            WHEN (u.id * 7 + b.id) %% 50 = 0 THEN NULL
+            ELSE DATE '2025-01-10' + (b.id + u.id) %% 300
+        END
+    FROM unnest(%s::int[]) AS u(id)
+    CROSS JOIN unnest(%s::int[]) AS b(id)
+"""
+
+
+class BorrowingIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"user{i}@test.com", password="!")
+            for i in range(USERS)
+        )
+        books = Book.objects.bulk_create(
+            Book(
+                title=f"Book {i}",
+                author="Author",
+                cover="Soft",
+                inventory=1,
+                daily_fee=1,
+            )
+            for i in range(BOOKS)
+        )
+        cls.user = users[0]
+        cls.book = books[0]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                SEED_SQL,
+                [[user.id for user in users], [book.id for book in books]],
+            )
+            cursor.execute("ANALYZE borrowings_borrowing")
+
+    def assertUsesIndex(self, queryset, *index_names):
+        plan = queryset.explain()
+        self.assertNotIn("Seq Scan on borrowings_borrowing", plan)
+        self.assertTrue(
+            any(name in plan for name in index_names),
+            f"None of {index_names} used:\n{plan}",
+        )
+
+    def test_seeded_table(self):
+        self.assertEqual(Borrowing.objects.count(), USERS * BOOKS)
+
+    def test_active_borrowings(self):
+        self.assertUsesIndex(
+            Borrowing.objects.filter(actual_return_date__isnull=True),
+            "borrowing_active_idx",
+            "borrowing_overdue_idx",
+            "borrowing_book_next_return_idx",
+        )
+
+    def test_overdue_scan_chunk(self):
+        self.assertUsesIndex(
+            Borrowing.objects.filter(
+                actual_return_date__isnull=True,
+                expected_return_date__lt="2025-06-01",
+            )
+            .order_by("expected_return_date", "id")
+            .values("id", "book_id")[:100],
+            "borrowing_overdue_idx",
+        )
+
+    def test_active_borrowings_keyset_page(self):
+        self.assertUsesIndex(
+            Borrowing.objects.filter(
+                actual_return_date__isnull=True
+            ).order_by("borrow_date", "id")[:5],
+            "borrowing_active_idx",
+        )
+
+    def test_user_borrowings(self):
+        self.assertUsesIndex(
+            Borrowing.objects.filter(user=self.user),
+            "borrowing_user_returned_idx",
+        )
+
+    def test_user_active_borrowings(self):
+        self.assertUsesIndex(
+            Borrowing.objects.filter(
+                user=self.user, actual_return_date__isnull=True
+            ),
+            "borrowing_user_returned_idx",
+            "borrowing_active_idx",
+        )
+
+    def test_book_active_borrowings(self):
+        self.assertUsesIndex(
+            Borrowing.objects.filter(
+                book=self.book, actual_return_date__isnull=True
+            ),
+            "borrowing_book_returned_idx",
+            "borrowing_book_next_return_idx",
+            "borrowing_active_idx",
+        )
+
+    def test_book_next_available_date(self):
+        self.assertUsesIndex(
+            Book.objects.with_next_available_date(),
+            "borrowing_book_next_return_idx",
+        )
@@ -1,5 +1,4 @@
 from datetime import timedelta
-from unittest.mock import patch, AsyncMock
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
@@ -24,8 +23,7 @@ def create_book(**kwargs):
 class BorrowingModelTests(TestCase):
 
     @classmethod
-    @patch("borrowings.signals.send_telegram_message", new_callable=AsyncMock)
-    def setUpTestData(cls, mock_send_telegram_message):
+    def setUpTestData(cls):
         cls.book = create_book()
         cls.user = get_user_model().objects.create_user(
             email="user@test.com",
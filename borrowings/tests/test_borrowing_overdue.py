@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.tests.test_book_api import create_book
+from borrowings.models import Borrowing, Fine
+from borrowings.overdue import scan_overdue
+
+AS_OF = date(2025, 3, 10)
+SCAN_URL = reverse("borrowings:borrowings-scan-overdue")
+
+
+class OverdueScanTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.book = create_book(daily_fee=Decimal("0.75"))
+
+    def borrow(self, days_overdue, **kwargs):
+        return Borrowing.objects.create(
+            user=self.user,
+            book=create_book(daily_fee=self.book.daily_fee),
+            expected_return_date=AS_OF - timedelta(days=days_overdue),
+            **kwargs,
+        )
+
+    def test_fines_of_overdue_borrowings(self):
+        overdue = [self.borrow(days) for days in (1, 4, 4, 30, 2)]
+        self.borrow(0)
+        self.borrow(-5)
+        self.borrow(10, actual_return_date=AS_OF)
+        scan = scan_overdue(AS_OF, chunk_size=2)
+
+        self.assertEqual(scan.overdue, 5)
+        self.assertEqual(scan.changed, 5)
+        self.assertEqual(scan.chunks, 3)
+        self.assertEqual(
+            {
+                fine.borrowing_id: (fine.days_overdue, fine.amount)
+                for fine in Fine.objects.all()
+            },
+            {
+                borrowing.id: (
+                    (AS_OF - borrowing.expected_return_date).days,
+                    Decimal("0.75")
+                    * (AS_OF - borrowing.expected_return_date).days,
+                )
+                for borrowing in overdue
+            },
+        )
+
+    def test_scan_is_repeatable(self):
+        borrowing = self.borrow(3)
+        scan_overdue(AS_OF)
+        scan = scan_overdue(AS_OF)
+
+        self.assertEqual(scan.overdue, 1)
+        self.assertEqual(scan.changed, 0)
+
+        scan = scan_overdue(AS_OF + timedelta(days=1))
+        borrowing.fine.refresh_from_db()
+
+        self.assertEqual(scan.changed, 1)
+        self.assertEqual(borrowing.fine.days_overdue, 4)
+        self.assertEqual(borrowing.fine.amount, Decimal("3.00"))
+
+    def test_scan_overdue_command(self):
+        self.borrow(3)
+        call_command("scan_overdue", f"--date={AS_OF}", stdout=StringIO())
+        self.assertEqual(Fine.objects.get().amount, Decimal("2.25"))
+
+
+class OverdueScanApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        Borrowing.objects.create(
+            user=self.user,
+            book=create_book(daily_fee=Decimal("1.50")),
+            expected_return_date=AS_OF - timedelta(days=2),
+        )
+
+    def test_scan_overdue_admin_required(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(SCAN_URL)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_scan_overdue(self):
+        admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="test_password"
+        )
+        self.client.force_authenticate(admin)
+        response = self.client.post(SCAN_URL, {"date": AS_OF})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {"as_of": str(AS_OF), "overdue": 1, "changed": 1, "chunks": 1},
+        )
+        self.assertEqual(Fine.objects.get().amount, Decimal("3.00"))
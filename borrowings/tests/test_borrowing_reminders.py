@@ -0,0 +1,132 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from books.tests.test_book_api import create_book
+from borrowings.models import Borrowing, Reminder
+from borrowings.reminders import send_reminders
+from notifications.tests.fake_telegram import FakeTelegram
+
+AS_OF = date(2025, 3, 10)
+
+
+class ReminderTests(TestCase):
+    def setUp(self):
+        self.telegram = FakeTelegram().__enter__()
+        self.addCleanup(self.telegram.__exit__)
+        settings = override_settings(
+            BOT_TOKEN="123:abc", TELEGRAM_BASE_URL=self.telegram.base_url
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.users = 0
+
+    def create_user(self, telegram_chat_id=None):
+        self.users += 1
+        return get_user_model().objects.create_user(
+            email=f"user{self.users}@test.com",
+            telegram_chat_id=telegram_chat_id,
+        )
+
+    def borrow(self, user, due_in, title="Dune", **kwargs):
+        return Borrowing.objects.create(
+            user=user,
+            book=create_book(title=title),
+            expected_return_date=AS_OF + timedelta(days=due_in),
+            **kwargs,
+        )
+
+    def messages(self):
+        return {
+            int(message["chat_id"]): message["text"]
+            for message in self.telegram.messages
+        }
+
+    def test_due_soon_and_overdue_reminders(self):
+        user = self.create_user(telegram_chat_id=100)
+        overdue = self.borrow(user, -3, title="Dune")
+        due_soon = self.borrow(user, 2, title="Emma")
+        self.borrow(user, 3, title="Ulysses")
+        self.borrow(user, -5, actual_return_date=AS_OF)
+        self.borrow(self.create_user(), -1)
+        run = send_reminders(AS_OF, days=2)
+
+        self.assertEqual(run.users, 1)
+        self.assertEqual(run.sent, 2)
+        self.assertEqual(run.messages, 1)
+        self.assertEqual(
+            self.messages(),
+            {
+                100: (
+                    "Please return the books you borrowed from the "
+                    "library:\n"
+                    "Dune - overdue since 2025-03-07\n"
+                    "Emma - due 2025-03-12"
+                )
+            },
+        )
+        self.assertEqual(
+            set(Reminder.objects.values_list("borrowing", "kind")),
+            {
+                (overdue.id, Reminder.Kind.OVERDUE),
+                (due_soon.id, Reminder.Kind.DUE_SOON),
+            },
+        )
+
+    def test_sent_reminders_are_not_repeated(self):
+        user = self.create_user(telegram_chat_id=100)
+        self.borrow(user, 1, title="Dune")
+        send_reminders(AS_OF)
+        run = send_reminders(AS_OF)
+
+        self.assertEqual(run.users, 0)
+        self.assertEqual(len(self.telegram.messages), 1)
+
+        run = send_reminders(AS_OF + timedelta(days=2))
+
+        self.assertEqual(run.sent, 1)
+        self.assertIn("Dune - overdue", self.telegram.messages[-1]["text"])
+
+    def test_failed_reminders_are_sent_by_next_run(self):
+        self.telegram.fail_with(400, "Bad Request: chat not found")
+        self.borrow(self.create_user(telegram_chat_id=100), 1)
+        run = send_reminders(AS_OF)
+
+        self.assertEqual(run.failed, 1)
+        self.assertFalse(Reminder.objects.exists())
+
+        run = send_reminders(AS_OF)
+
+        self.assertEqual(run.sent, 1)
+        self.assertEqual(list(self.messages()), [100])
+
+    def test_flood_limit_pauses_sending(self):
+        self.telegram.fail_with(429, "Too Many Requests", retry_after=1)
+        for chat_id in range(3):
+            self.borrow(self.create_user(telegram_chat_id=chat_id), 1)
+        run = send_reminders(AS_OF)
+
+        self.assertEqual(run.sent, 3)
+        self.assertEqual(run.failed, 0)
+
+    def test_concurrent_delivery_is_bounded(self):
+        self.telegram.delay = 0.05
+        for chat_id in range(12):
+            self.borrow(self.create_user(telegram_chat_id=chat_id), 1)
+        run = send_reminders(AS_OF, concurrency=4)
+
+        self.assertEqual(run.sent, 12)
+        self.assertEqual(len(self.messages()), 12)
+        self.assertGreater(self.telegram.max_in_flight, 1)
+        self.assertLessEqual(self.telegram.max_in_flight, 4)
+
+    def test_send_reminders_command(self):
+        self.borrow(self.create_user(telegram_chat_id=100), -1)
+        out = StringIO()
+        call_command("send_reminders", f"--date={AS_OF}", stdout=out)
+
+        self.assertIn("1 reminders sent to 1 users", out.getvalue())
+        self.assertEqual(Reminder.objects.get().kind, Reminder.Kind.OVERDUE)
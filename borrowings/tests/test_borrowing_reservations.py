@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.tests.test_book_api import create_book
+from borrowings.models import Borrowing, Reservation
+from notifications.models import Notification
+
+BORROWING_URL = reverse("borrowings:borrowings-list")
+RESERVATION_URL = reverse("borrowings:reservations-list")
+
+
+def borrowing_return_url(borrowing_id):
+    return reverse(
+        "borrowings:borrowings-return-borrowing", args=[borrowing_id]
+    )
+
+
+def reservation_cancel_url(reservation_id):
+    return reverse("borrowings:reservations-cancel", args=[reservation_id])
+
+
+class ReservationApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = get_user_model().objects.create_user(
+            email="owner@test.com", password="test_password"
+        )
+        self.users = [
+            get_user_model().objects.create_user(
+                email=f"user{i}@test.com",
+                telegram_chat_id=100 + i,
+            )
+            for i in range(3)
+        ]
+        self.book = create_book(title="Dune", inventory=0)
+        self.borrowing = Borrowing.objects.create(
+            user=self.owner,
+            book=self.book,
+            expected_return_date=now().date() + timedelta(days=3),
+        )
+
+    def reserve(self, user, **data):
+        self.client.force_authenticate(user)
+        return self.client.post(
+            RESERVATION_URL, {"book": self.book.id, **data}
+        )
+
+    def return_book(self):
+        self.client.force_authenticate(self.owner)
+        return self.client.post(
+            borrowing_return_url(self.borrowing.id),
+            {"actual_return_date": ""},
+        )
+
+    def test_reserve_book_out_of_inventory(self):
+        first = self.reserve(self.users[0])
+        second = self.reserve(self.users[1])
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.data["status"], Reservation.Status.WAITING)
+        self.assertEqual(first.data["position"], 1)
+        self.assertEqual(second.data["position"], 2)
+
+    def test_reserve_book_in_inventory_rejected(self):
+        self.book.inventory = 1
+        self.book.save()
+        response = self.reserve(self.users[0])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_reserve_twice_rejected(self):
+        self.reserve(self.users[0])
+        response = self.reserve(self.users[0])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_return_assigns_copy_to_oldest_reservation(self):
+        for user in self.users:
+            self.reserve(user, loan_days=7)
+        response = self.return_book()
+        self.book.refresh_from_db()
+        first = Reservation.objects.get(user=self.users[0])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(first.status, Reservation.Status.FULFILLED)
+        self.assertEqual(first.borrowing.user, self.users[0])
+        self.assertEqual(
+            first.borrowing.expected_return_date,
+            now().date() + timedelta(days=7),
+        )
+        self.assertTrue(
+            Notification.objects.filter(
+                chat_id=100, text__contains="`Dune`"
+            ).exists()
+        )
+
+        self.client.force_authenticate(self.users[1])
+        response = self.client.get(RESERVATION_URL)
+        self.assertEqual(response.data["results"][0]["position"], 1)
+
+    def test_return_without_reservations_restores_inventory(self):
+        self.return_book()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 1)
+
+    def test_cancelled_reservation_is_skipped(self):
+        cancelled = self.reserve(self.users[0]).data["id"]
+        self.reserve(self.users[1])
+        self.client.force_authenticate(self.users[0])
+        response = self.client.post(reservation_cancel_url(cancelled))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], Reservation.Status.CANCELLED)
+
+        self.return_book()
+
+        self.assertEqual(
+            Reservation.objects.get(user=self.users[1]).status,
+            Reservation.Status.FULFILLED,
+        )
+
+    def test_borrow_fulfils_own_reservation(self):
+        reservation = self.reserve(self.users[0]).data["id"]
+        self.book.inventory = 1
+        self.book.save()
+        self.client.post(
+            BORROWING_URL,
+            {
+                "book": self.book.id,
+                "expected_return_date": now().date() + timedelta(days=3),
+            },
+        )
+
+        self.assertEqual(
+            Reservation.objects.get(pk=reservation).status,
+            Reservation.Status.FULFILLED,
+        )
+
+    def test_reservations_of_other_users_hidden(self):
+        self.reserve(self.users[0])
+        self.client.force_authenticate(self.users[1])
+        response = self.client.get(RESERVATION_URL)
+        self.assertEqual(response.data["results"], [])
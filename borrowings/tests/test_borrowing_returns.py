@@ -0,0 +1,128 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.tests.test_book_api import create_book
+from borrowings.models import Borrowing, Reservation
+
+RETURN_BATCH_URL = reverse("borrowings:borrowings-return-batch")
+
+
+class BatchReturnApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.other = get_user_model().objects.create_user(
+            email="other@test.com"
+        )
+        self.client.force_authenticate(self.user)
+        self.books = [create_book(inventory=0) for _ in range(3)]
+        self.borrowings = [self.borrow(self.user, book) for book in self.books]
+
+    def borrow(self, user, book, **kwargs):
+        return Borrowing.objects.create(
+            user=user,
+            book=book,
+            expected_return_date=now().date() + timedelta(days=5),
+            **kwargs,
+        )
+
+    def return_batch(self, borrowings, **data):
+        return self.client.post(
+            RETURN_BATCH_URL,
+            {
+                "borrowings": [borrowing.id for borrowing in borrowings],
+                **data,
+            },
+            format="json",
+        )
+
+    def books_from_db(self):
+        for book in self.books:
+            book.refresh_from_db()
+        return self.books
+
+    def test_return_batch(self):
+        shared = self.borrow(self.other, self.books[0])
+        admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="test_password"
+        )
+        self.client.force_authenticate(admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.return_batch(
+                [*self.borrowings, shared],
+                actual_return_date=now().date() - timedelta(days=1),
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["returned"],
+            [borrowing.id for borrowing in [*self.borrowings, shared]],
+        )
+        self.assertEqual(
+            [book.inventory for book in self.books_from_db()], [2, 1, 1]
+        )
+        self.assertFalse(
+            Borrowing.objects.filter(actual_return_date__isnull=True).exists()
+        )
+        self.assertEqual(
+            Borrowing.objects.get(pk=shared.pk).actual_return_date,
+            now().date() - timedelta(days=1),
+        )
+        self.assertLess(len(queries), 15)
+
+    def test_already_returned_reported(self):
+        self.borrowings[1].actual_return_date = now().date()
+        self.borrowings[1].save()
+        response = self.return_batch(self.borrowings)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {
+                "returned": [self.borrowings[0].id, self.borrowings[2].id],
+                "already_returned": [self.borrowings[1].id],
+                "not_found": [],
+            },
+        )
+        self.assertEqual(
+            [book.inventory for book in self.books_from_db()], [1, 0, 1]
+        )
+
+    def test_borrowings_of_other_users_not_found(self):
+        foreign = self.borrow(self.other, create_book(inventory=0))
+        response = self.return_batch([self.borrowings[0], foreign])
+
+        self.assertEqual(response.data["returned"], [self.borrowings[0].id])
+        self.assertEqual(response.data["not_found"], [foreign.id])
+        foreign.refresh_from_db()
+        self.assertIsNone(foreign.actual_return_date)
+
+    def test_returned_copies_go_to_reservations(self):
+        waiting = get_user_model().objects.create_user(
+            email="waiting@test.com"
+        )
+        reservation = Reservation.objects.create(
+            user=waiting, book=self.books[0]
+        )
+        self.return_batch(self.borrowings)
+        reservation.refresh_from_db()
+
+        self.assertEqual(reservation.status, Reservation.Status.FULFILLED)
+        self.assertEqual(reservation.borrowing.user, waiting)
+        self.assertEqual(
+            [book.inventory for book in self.books_from_db()], [0, 1, 1]
+        )
+
+    def test_duplicate_borrowings_rejected(self):
+        response = self.return_batch([self.borrowings[0]] * 2)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
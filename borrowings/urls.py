@@ -1,12 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from borrowings.views import BorrowingViewSet
+from borrowings.views import BorrowingViewSet, ReservationViewSet
 
 app_name = "borrowings"
 
 
 router = DefaultRouter()
+# Before the borrowings, whose detail route would match "reservations/"
+router.register("reservations", ReservationViewSet, basename="reservations")
 router.register("", BorrowingViewSet, basename="borrowings")
 urlpatterns = [
     path("", include(router.urls)),
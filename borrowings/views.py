@@ -1,21 +1,67 @@
 from django.db import transaction
 from django.utils.timezone import now
-from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    OpenApiParameter,
+)
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
-from borrowings.models import Borrowing
+from books.async_views import AsyncReadMixin
+from books.cache import invalidate_catalog
+from books.exporters import EXPORT_FORMATS, stream_export
+from books.fastpath import ValuesListMixin
+from books.fieldsets import SparseFieldsetMixin
+from books.pagination import KeysetPaginationMixin
+from borrowings.models import Borrowing, Reservation
+from borrowings.overdue import ScanInProgress, scan_overdue
+from borrowings.pagination import BorrowingKeysetPagination
+from borrowings.reservations import return_copy
+from borrowings.returns import return_borrowings
 from borrowings.serializers import (
+    BorrowingBatchReturnSerializer,
     BorrowingDetailSerializer,
     BorrowingListSerializer,
     BorrowingCreateSerializer,
     BorrowingReturnSerializer,
+    CheckoutSerializer,
+    OverdueScanSerializer,
+    ReservationSerializer,
+)
+from throttling.throttles import BorrowThrottle
+
+EXPORT_FIELDS = (
+    "id",
+    "user_id",
+    "book_id",
+    "borrow_date",
+    "expected_return_date",
+    "actual_return_date",
 )
 
 
+@extend_schema_view(
+    retrieve=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "fields",
+                type=str,
+                description=(
+                    "Comma-separated fields to return "
+                    "(ex. `?fields=id,book`)"
+                ),
+            ),
+        ]
+    ),
+)
 class BorrowingViewSet(
+    SparseFieldsetMixin,
+    ValuesListMixin,
+    KeysetPaginationMixin,
+    AsyncReadMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -24,6 +70,7 @@ class BorrowingViewSet(
     queryset = Borrowing.objects.select_related("user", "book")
     serializer_class = BorrowingCreateSerializer
     permission_classes = (IsAuthenticated,)
+    keyset_pagination_class = BorrowingKeysetPagination
 
     def get_queryset(self):
         """
@@ -54,14 +101,44 @@ class BorrowingViewSet(
         elif self.action == "return_borrowing":
             return BorrowingReturnSerializer
 
+        elif self.action == "scan_overdue":
+            return OverdueScanSerializer
+
+        elif self.action == "checkout":
+            return CheckoutSerializer
+
+        elif self.action == "return_batch":
+            return BorrowingBatchReturnSerializer
+
         return BorrowingCreateSerializer
 
+    def get_throttles(self):
+        if self.action in ("create", "checkout"):
+            return [BorrowThrottle()]
+        return super().get_throttles()
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @extend_schema(
+        description=(
+            "Borrow several books at once, either all of them or none "
+            "with the errors of each book"
+        ),
+    )
+    @action(methods=["POST"], detail=False)
+    def checkout(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
     @extend_schema(
         request=BorrowingReturnSerializer,
-        description="Endpoint for return borrowing book",
+        description=(
+            "Endpoint for return borrowing book, the copy goes to "
+            "the oldest waiting reservation of the book"
+        ),
     )
     @action(
         methods=["POST"],
@@ -73,31 +150,49 @@ class BorrowingViewSet(
     )
     def return_borrowing(self, request, *args, **kwargs):
         borrowing = self.get_object()
-
-        if borrowing.actual_return_date:
-            return Response(
-                {"detail": "This book is already returned"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        actual_return_date = (
+            request.data["actual_return_date"] or now().date()
+        )
 
         with transaction.atomic():
-            if request.data["actual_return_date"]:
-                borrowing.actual_return_date = request.data[
-                    "actual_return_date"
-                ]
-            else:
-                borrowing.actual_return_date = now().date()
-            borrowing.save()
-            borrowing.book.inventory += 1
-            borrowing.book.save()
+            returned = Borrowing.objects.filter(
+                pk=borrowing.pk, actual_return_date__isnull=True
+            ).update(actual_return_date=actual_return_date)
+            if not returned:
+                return Response(
+                    {"detail": "This book is already returned"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return_copy(borrowing.book)
+            invalidate_catalog()
 
-            return Response(
-                {
-                    "message": f"The book:"
-                    f" `{borrowing.book.title}` was returned."
-                },
-                status=status.HTTP_200_OK,
-            )
+        return Response(
+            {"message": f"The book: `{borrowing.book.title}` was returned."},
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        description=(
+            "Return many borrowings at once, borrowings returned before "
+            "are reported without failing the others"
+        ),
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="return",
+        url_name="return-batch",
+    )
+    def return_batch(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = return_borrowings(
+            self.get_queryset(),
+            serializer.validated_data["borrowings"],
+            serializer.validated_data.get("actual_return_date")
+            or now().date(),
+        )
+        return Response(self.get_serializer(result).data)
 
     @extend_schema(
         parameters=[
@@ -117,8 +212,128 @@ class BorrowingViewSet(
                     "for admin-user (ex. `?user_id=3`)"
                 ),
             ),
+            OpenApiParameter(
+                "fields",
+                type=str,
+                description=(
+                    "Comma-separated fields to return "
+                    "(ex. `?fields=id,expected_return_date`)"
+                ),
+            ),
+            OpenApiParameter(
+                "pagination",
+                type=str,
+                description=(
+                    "Use keyset pagination ordered by `borrow_date, id` "
+                    "instead of limit/offset (ex. `?pagination=cursor`)"
+                ),
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
         """Get list of borrowings"""
         return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "file_format",
+                type=str,
+                enum=tuple(EXPORT_FORMATS),
+                description="Export format, `ndjson` by default",
+            ),
+            OpenApiParameter(
+                "is_active",
+                type=str,
+                description="Export only not returned borrowings",
+            ),
+            OpenApiParameter(
+                "user_id",
+                type=str,
+                description="Export borrowings of the user for admin-user",
+            ),
+        ],
+        responses={(200, "application/x-ndjson"): str, (200, "text/csv"): str},
+        description=(
+            "Stream the borrowing ledger as NDJSON or CSV, "
+            "non-admin users get only their own borrowings"
+        ),
+    )
+    @action(methods=["GET"], detail=False)
+    def export(self, request, *args, **kwargs):
+        file_format = request.query_params.get("file_format", "ndjson")
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"file_format": f"Use one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = self.get_queryset().order_by("id")
+        return stream_export(
+            request, queryset, EXPORT_FIELDS, file_format, "borrowings"
+        )
+
+    @extend_schema(
+        description=(
+            "Calculate fines of overdue borrowings as `daily_fee` "
+            "times days overdue, for admin-user"
+        ),
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="scan-overdue",
+        permission_classes=[IsAdminUser],
+    )
+    def scan_overdue(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            scan = scan_overdue(serializer.validated_data.get("date"))
+        except ScanInProgress as error:
+            return Response(
+                {"detail": str(error)}, status=status.HTTP_409_CONFLICT
+            )
+        return Response(self.get_serializer(scan).data)
+
+
+class ReservationViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Waitlist of books out of inventory. Returned copies are assigned
+    to the oldest waiting reservation, which then gets a borrowing.
+    """
+
+    queryset = Reservation.objects.select_related("book").order_by("id")
+    serializer_class = ReservationSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        """Non-admin users can see only their own reservations."""
+        queryset = self.queryset.with_position()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
+        return queryset
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @extend_schema(request=None, description="Leave the waitlist")
+    @action(methods=["POST"], detail=True)
+    def cancel(self, request, *args, **kwargs):
+        reservation = self.get_object()
+        cancelled = Reservation.objects.filter(
+            pk=reservation.pk, status=Reservation.Status.WAITING
+        ).update(status=Reservation.Status.CANCELLED)
+        if not cancelled:
+            return Response(
+                {"detail": "This reservation is not waiting"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            self.get_serializer(self.get_object()).data,
+            status=status.HTTP_200_OK,
+        )
@@ -29,9 +29,14 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.getenv("SECRET_KEY")
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv("DEBUG", "True") == "True"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [
+    host for host in os.getenv("ALLOWED_HOSTS", "").split(",") if host
+]
+
+# Serve book and borrowing reads as coroutines, see `books.async_views`
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
 
 
 # Application definition
@@ -43,12 +48,15 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "debug_toolbar",
     "drf_spectacular",
     "user",
     "books",
     "borrowings",
+    "notifications",
+    "throttling",
 ]
 
 MIDDLEWARE = [
@@ -97,6 +105,32 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Book responses are cached under a catalog version, so every worker
+# must share the backend (ex. file-based) outside of a single process.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+
+# Telegram notifications
+# Borrowing events are queued in the database and sent by
+# `python manage.py run_notifier`.
+
+BOT_TOKEN = os.getenv("BOT_TOKEN")
+CHAT_ID = os.getenv("CHAT_ID")
+TELEGRAM_BASE_URL = os.getenv(
+    "TELEGRAM_BASE_URL", "https://api.telegram.org/bot"
+)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -142,19 +176,45 @@ AUTH_USER_MODEL = "user.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "books.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    "DEFAULT_PAGINATION_CLASS": "books.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 5,
     "DEFAULT_PERMISSION_CLASSES": ("books.permissions.IsAdminOrReadOnly",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_THROTTLE_RATES": {
+        "borrow": os.environ.get("BORROW_THROTTLE_RATE", "30/min"),
+        "token": os.environ.get("TOKEN_THROTTLE_RATE", "20/min"),
+    },
 }
 
+# Throttle counters shared by all workers, in the default cache when its
+# `incr` is atomic across processes, in an unlogged table otherwise
+ATOMIC_INCR_CACHE_BACKENDS = (
+    "django.core.cache.backends.redis.RedisCache",
+    "django.core.cache.backends.memcached.PyMemcacheCache",
+    "django.core.cache.backends.memcached.PyLibMCCache",
+)
+THROTTLE_STORE = os.environ.get(
+    "THROTTLE_STORE",
+    (
+        "throttling.stores.CacheStore"
+        if CACHES["default"]["BACKEND"] in ATOMIC_INCR_CACHE_BACKENDS
+        else "throttling.stores.DatabaseStore"
+    ),
+)
+
 SIMPLE_JWT = {
     "AUTH_HEADER_NAME": "HTTP_AUTHORIZE",
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_REFRESH_SERIALIZER": "user.serializers.TokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "user.serializers.TokenVerifySerializer",
 }
 
 INTERNAL_IPS = [
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+from telegram.error import BadRequest, RetryAfter, TimedOut
+
+CALL_TIMEOUT = 3.0
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30.0
+
+
+class CircuitOpenError(Exception):
+    """The provider is considered down, the call was not made."""
+
+    def __init__(self, retry_at):
+        super().__init__("Circuit breaker is open")
+        # `time.time()` timestamp of the next trial call
+        self.retry_at = retry_at
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the chat provider is down. Every call gets a hard
+    `call_timeout`, `failure_threshold` failures in a row open the
+    breaker for `reset_timeout` seconds, then a single trial call
+    decides whether it closes again. Flood limits and rejected
+    messages mean the provider is up and do not count as failures.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        call_timeout=CALL_TIMEOUT,
+        failure_threshold=FAILURE_THRESHOLD,
+        reset_timeout=RESET_TIMEOUT,
+    ):
+        self.call_timeout = call_timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+
+    async def call(self, func, *args, **kwargs):
+        if self.state == self.OPEN:
+            if time.time() < self.opened_at + self.reset_timeout:
+                raise CircuitOpenError(self.opened_at + self.reset_timeout)
+            self.state = self.HALF_OPEN
+        elif self.state == self.HALF_OPEN:
+            # Only the trial call goes through
+            raise CircuitOpenError(time.time() + self.call_timeout)
+
+        try:
+            result = await asyncio.wait_for(
+                func(*args, **kwargs), self.call_timeout
+            )
+        except (RetryAfter, BadRequest):
+            self.record_success()
+            raise
+        except asyncio.CancelledError:
+            if self.state == self.HALF_OPEN:
+                # A cancelled trial says nothing about the provider,
+                # the next call makes a new one
+                self.state = self.OPEN
+            raise
+        except asyncio.TimeoutError:
+            self.record_failure()
+            raise TimedOut(
+                f"No response within {self.call_timeout} seconds"
+            ) from None
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if (
+            self.state == self.HALF_OPEN
+            or self.failures >= self.failure_threshold
+        ):
+            self.state = self.OPEN
+            self.opened_at = time.time()
+            self.times_opened += 1
+
+    def metrics(self):
+        return {
+            "breaker_state": self.state,
+            "breaker_failures": self.failures,
+            "breaker_times_opened": self.times_opened,
+        }
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import signal
+import threading
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+
+from notifications.breaker import CALL_TIMEOUT, CircuitBreaker
+from notifications.sender import DIGEST_WINDOW, TelegramSender
+from notifications.worker import NotificationWorker
+
+
+class Command(BaseCommand):
+    help = "Send queued borrowing notifications to the Telegram chat"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait for new notifications between polls",
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--digest-window",
+            type=float,
+            default=DIGEST_WINDOW,
+            help="Seconds to collect notifications into one message",
+        )
+        parser.add_argument(
+            "--call-timeout",
+            type=float,
+            default=CALL_TIMEOUT,
+            help="Seconds a single Telegram call may take",
+        )
+        parser.add_argument(
+            "--metrics-interval",
+            type=float,
+            default=0,
+            help="Print queue depth and send latency every N seconds",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send the notifications that are due and exit",
+        )
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        if not options["once"]:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *args: stop.set())
+        # Database queries run in this thread, the event loop in another
+        async_to_sync(self.serve)(options, stop)
+
+    async def serve(self, options, stop):
+        async with TelegramSender(
+            digest_window=options["digest_window"],
+            breaker=CircuitBreaker(call_timeout=options["call_timeout"]),
+        ) as sender:
+            worker = NotificationWorker(
+                sender, batch_size=options["batch_size"]
+            )
+            if options["once"]:
+                while await worker.process_batch() == options["batch_size"]:
+                    pass
+                return
+
+            if options["metrics_interval"]:
+                reporter = asyncio.create_task(
+                    self.report(worker, options["metrics_interval"])
+                )
+            self.stdout.write("Notifier started")
+            await worker.run(options["interval"], stop)
+            if options["metrics_interval"]:
+                reporter.cancel()
+            self.stdout.write("Notifier stopped")
+
+    async def report(self, worker, interval):
+        while True:
+            await asyncio.sleep(interval)
+            self.stdout.write(json.dumps(await worker.metrics()))
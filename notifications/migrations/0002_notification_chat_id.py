@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="chat_id",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Notification(models.Model):
+    """Outbox row with a chat message waiting for the notifier worker."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        SENT = "sent"
+        FAILED = "failed"
+
+    text = models.TextField()
+    # Chat of a user, the library chat when empty
+    chat_id = models.BigIntegerField(null=True, blank=True)
+    status = models.CharField(
+        max_length=15, choices=Status, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                condition=models.Q(status="pending"),
+                name="notification_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.status}: {self.text[:50]}"
@@ -0,0 +1,19 @@
+from django.db import connection
+
+from notifications.models import Notification
+
+NOTIFY_CHANNEL = "notifications"
+
+
+def enqueue_notification(text, chat_id=None):
+    """
+    Queue a chat message in the current transaction. It is sent by the
+    notifier worker only once the transaction commits, and dropped
+    together with it on rollback. Messages go to the library chat
+    unless `chat_id` is given.
+    """
+    notification = Notification.objects.create(text=text, chat_id=chat_id)
+    # Postgres delivers NOTIFY on commit, waking up an idle worker
+    with connection.cursor() as cursor:
+        cursor.execute(f"NOTIFY {NOTIFY_CHANNEL}")
+    return notification
@@ -0,0 +1,191 @@
+import asyncio
+import time
+import warnings
+from datetime import timedelta
+
+import telegram
+from django.conf import settings
+from telegram.constants import MessageLimit
+from telegram.error import BadRequest, RetryAfter
+from telegram.request import HTTPXRequest
+from telegram.warnings import PTBDeprecationWarning
+
+from notifications.breaker import CircuitBreaker
+
+DIGEST_WINDOW = 1.0
+DIGEST_SEPARATOR = "\n\n"
+MAX_QUEUE_SIZE = 1000
+# Longer flood waits are handed back to the caller to reschedule
+MAX_RETRY_AFTER = 60
+
+
+def get_retry_after(error):
+    """Seconds to wait from a `RetryAfter` error."""
+    with warnings.catch_warnings():
+        # `retry_after` becomes a timedelta in the next PTB major
+        warnings.simplefilter("ignore", PTBDeprecationWarning)
+        retry_after = error.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return retry_after
+
+
+def build_digests(texts, limit=MessageLimit.MAX_TEXT_LENGTH):
+    """
+    Group the indexes of `texts` into as few messages as fit
+    in the length limit, keeping their order.
+    """
+    digests, length = [], 0
+    for index, text in enumerate(texts):
+        if digests and length + len(DIGEST_SEPARATOR) + len(text) <= limit:
+            digests[-1].append(index)
+            length += len(DIGEST_SEPARATOR) + len(text)
+        else:
+            digests.append([index])
+            length = len(text)
+    return digests
+
+
+class TelegramSender:
+    """
+    Long-lived async Telegram sender. Messages to the same chat
+    submitted within `digest_window` seconds of each other are merged
+    into digest messages sent over one kept-alive connection. Flood
+    limits pause sending for `retry_after` seconds. The queue is
+    bounded, so `submit` waits once `max_queue_size` messages are
+    pending.
+    """
+
+    def __init__(
+        self,
+        digest_window=DIGEST_WINDOW,
+        max_queue_size=MAX_QUEUE_SIZE,
+        breaker=None,
+    ):
+        # One kept-alive connection, messages are sent one at a time
+        self.request = HTTPXRequest(connection_pool_size=1)
+        self.bot = telegram.Bot(
+            settings.BOT_TOKEN,
+            base_url=settings.TELEGRAM_BASE_URL,
+            request=self.request,
+        )
+        self.chat_id = settings.CHAT_ID
+        self.breaker = breaker or CircuitBreaker()
+        self.digest_window = digest_window
+        self.max_queue_size = max_queue_size
+        self.queue = None
+        self.consumer = None
+        self.sent_messages = 0
+        self.sent_notifications = 0
+        self.failed_notifications = 0
+        self.send_latencies = []
+
+    async def __aenter__(self):
+        self.queue = asyncio.Queue(self.max_queue_size)
+        self.consumer = asyncio.create_task(self.consume())
+        return self
+
+    async def __aexit__(self, *args):
+        self.consumer.cancel()
+        try:
+            await self.consumer
+        except asyncio.CancelledError:
+            pass
+        await self.request.shutdown()
+
+    async def submit(self, text, chat_id=None):
+        """
+        Queue `text` for `chat_id`, the library chat by default,
+        and wait until the message with it is sent.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((chat_id or self.chat_id, text, future))
+        return await future
+
+    def metrics(self):
+        latencies = sorted(self.send_latencies)
+        return {
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "sent_messages": self.sent_messages,
+            "sent_notifications": self.sent_notifications,
+            "failed_notifications": self.failed_notifications,
+            "send_latency_p50": (
+                latencies[len(latencies) // 2] if latencies else None
+            ),
+            "send_latency_max": latencies[-1] if latencies else None,
+            **self.breaker.metrics(),
+        }
+
+    async def consume(self):
+        while True:
+            batch = [await self.queue.get()]
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.digest_window
+            while len(batch) < self.max_queue_size:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self.queue.get(), timeout)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            chats = {}
+            for chat_id, text, future in batch:
+                chats.setdefault(chat_id, []).append((text, future))
+            for chat_id, items in chats.items():
+                for digest in build_digests([text for text, _ in items]):
+                    await self.send(
+                        chat_id, [items[index] for index in digest]
+                    )
+
+    async def send(self, chat_id, items):
+        text = DIGEST_SEPARATOR.join(text for text, _ in items)
+        futures = [future for _, future in items]
+        while True:
+            started = time.perf_counter()
+            try:
+                await self.breaker.call(
+                    self.bot.send_message, chat_id=chat_id, text=text
+                )
+            except RetryAfter as error:
+                retry_after = get_retry_after(error)
+                if retry_after <= MAX_RETRY_AFTER:
+                    await asyncio.sleep(retry_after)
+                    continue
+                self.resolve(futures, error)
+            except BadRequest as error:
+                if len(items) == 1:
+                    self.resolve(futures, error)
+                else:
+                    # Do not let one bad message fail the whole digest
+                    for item in items:
+                        await self.send(chat_id, [item])
+            except Exception as error:
+                self.resolve(futures, error)
+            else:
+                self.record_latency(time.perf_counter() - started)
+                self.sent_messages += 1
+                self.resolve(futures)
+            return
+
+    def record_latency(self, latency):
+        self.send_latencies.append(latency)
+        # Keep a rolling window for the percentiles
+        del self.send_latencies[:-1000]
+
+    def resolve(self, futures, error=None):
+        for future in futures:
+            if future.done():
+                continue
+            if error is None:
+                self.sent_notifications += 1
+                future.set_result(None)
+            else:
+                self.failed_notifications += 1
+                future.set_exception(error)
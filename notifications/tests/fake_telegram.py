@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+
+class FakeTelegram:
+    """
+    Local Bot API stub. Records sent messages and answers with queued
+    `(status, payload)` responses, or with success once they run out.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.responses = []
+        self.delay = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/bot"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def fail_with(self, status, description, times=1, **parameters):
+        payload = {
+            "ok": False,
+            "error_code": status,
+            "description": description,
+        }
+        if parameters:
+            payload["parameters"] = parameters
+        self.responses.extend([(status, payload)] * times)
+
+    def respond(self, method, params):
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+            if self.responses:
+                return self.responses.pop(0)
+            if method == "getMe":
+                return 200, {
+                    "ok": True,
+                    "result": {
+                        "id": 1,
+                        "is_bot": True,
+                        "first_name": "Fake",
+                        "username": "fake_bot",
+                    },
+                }
+            self.messages.append(params)
+            return 200, {
+                "ok": True,
+                "result": {
+                    "message_id": len(self.messages),
+                    "date": int(time.time()),
+                    "chat": {"id": int(params["chat_id"]), "type": "group"},
+                    "text": params.get("text", ""),
+                },
+            }
+
+    def handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.headers.get("Content-Type", "").startswith(
+                    "application/json"
+                ):
+                    params = json.loads(body)
+                else:
+                    params = dict(parse_qsl(body.decode()))
+                method = self.path.rsplit("/", 1)[-1]
+                status, payload = fake.respond(method, params)
+                content = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(content)))
+                    self.end_headers()
+                    self.wfile.write(content)
+                except ConnectionError:
+                    # The client gave up waiting
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,280 @@
+import asyncio
+import time
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+from telegram.error import NetworkError, RetryAfter
+
+from books.tests.test_book_api import create_book
+from notifications.breaker import CircuitBreaker, CircuitOpenError
+from notifications.models import Notification
+from notifications.outbox import enqueue_notification
+from notifications.sender import TelegramSender, build_digests
+from notifications.tests.fake_telegram import FakeTelegram
+from notifications.worker import MAX_ATTEMPTS, NotificationWorker
+
+BORROWING_URL = reverse("borrowings:borrowings-list")
+
+
+class NotificationOutboxTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_borrowing_queues_notification(self):
+        book = create_book(title="Dune")
+        response = self.client.post(
+            BORROWING_URL,
+            {
+                "book": book.id,
+                "expected_return_date": now().date() + timedelta(days=7),
+            },
+        )
+        notification = Notification.objects.get()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(notification.status, Notification.Status.PENDING)
+        self.assertIn("Book: Dune", notification.text)
+
+    def test_rolled_back_notification_is_dropped(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                enqueue_notification("Lost")
+                raise RuntimeError
+        self.assertFalse(Notification.objects.exists())
+
+
+class NotificationWorkerTests(TestCase):
+    def setUp(self):
+        self.telegram = FakeTelegram().__enter__()
+        self.addCleanup(self.telegram.__exit__)
+        settings = override_settings(
+            BOT_TOKEN="123:abc",
+            CHAT_ID="42",
+            TELEGRAM_BASE_URL=self.telegram.base_url,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def process(self, digest_window=0, breaker=None, **kwargs):
+        async def process():
+            async with TelegramSender(
+                digest_window=digest_window, breaker=breaker
+            ) as sender:
+                processed = await NotificationWorker(
+                    sender, **kwargs
+                ).process_batch()
+                self.metrics = sender.metrics()
+                return processed
+
+        return async_to_sync(process)()
+
+    def test_run_notifier_sends_pending(self):
+        for text in ("First", "Second"):
+            enqueue_notification(text)
+        call_command(
+            "run_notifier", "--once", "--batch-size=1", "--digest-window=0"
+        )
+
+        self.assertEqual(
+            [message["text"] for message in self.telegram.messages],
+            ["First", "Second"],
+        )
+        self.assertEqual(self.telegram.messages[0]["chat_id"], "42")
+        self.assertFalse(
+            Notification.objects.exclude(
+                status=Notification.Status.SENT
+            ).exists()
+        )
+
+    def test_server_error_is_retried_with_backoff(self):
+        notification = enqueue_notification("Hello")
+        self.telegram.fail_with(500, "Internal Server Error")
+        self.process()
+        notification.refresh_from_db()
+
+        self.assertEqual(notification.status, Notification.Status.PENDING)
+        self.assertEqual(notification.attempts, 1)
+        self.assertGreater(notification.next_attempt_at, now())
+        self.assertIn("Internal Server Error", notification.last_error)
+        self.assertEqual(self.process(), 0)
+
+    def test_gives_up_after_max_attempts(self):
+        notification = enqueue_notification("Hello")
+        Notification.objects.update(attempts=MAX_ATTEMPTS - 1)
+        self.telegram.fail_with(502, "Bad Gateway")
+        self.process()
+        notification.refresh_from_db()
+
+        self.assertEqual(notification.status, Notification.Status.FAILED)
+        self.assertEqual(notification.attempts, MAX_ATTEMPTS)
+
+    def test_bad_request_is_not_retried(self):
+        notification = enqueue_notification("Hello")
+        self.telegram.fail_with(400, "Bad Request: chat not found")
+        self.process()
+        notification.refresh_from_db()
+
+        self.assertEqual(notification.status, Notification.Status.FAILED)
+
+    def test_burst_is_sent_as_digest(self):
+        for text in ("First", "Second", "Third"):
+            enqueue_notification(text)
+        self.process(digest_window=0.1)
+
+        self.assertEqual(
+            [message["text"] for message in self.telegram.messages],
+            ["First\n\nSecond\n\nThird"],
+        )
+        self.assertEqual(
+            Notification.objects.filter(
+                status=Notification.Status.SENT
+            ).count(),
+            3,
+        )
+        self.assertEqual(self.metrics["sent_messages"], 1)
+        self.assertEqual(self.metrics["sent_notifications"], 3)
+        self.assertEqual(self.metrics["queue_depth"], 0)
+        self.assertIsNotNone(self.metrics["send_latency_p50"])
+
+    def test_bad_message_does_not_fail_digest(self):
+        bad = enqueue_notification("Bad")
+        good = enqueue_notification("Good")
+        self.telegram.fail_with(400, "Bad Request: message is invalid", 2)
+        self.process()
+        bad.refresh_from_db()
+        good.refresh_from_db()
+
+        self.assertEqual(bad.status, Notification.Status.FAILED)
+        self.assertEqual(good.status, Notification.Status.SENT)
+        self.assertEqual(self.telegram.messages[0]["text"], "Good")
+
+    def test_short_flood_limit_is_waited_out(self):
+        notification = enqueue_notification("Hello")
+        self.telegram.fail_with(
+            429, "Too Many Requests: retry after 1", retry_after=1
+        )
+        self.process()
+        notification.refresh_from_db()
+
+        self.assertEqual(notification.status, Notification.Status.SENT)
+        self.assertEqual(len(self.telegram.messages), 1)
+
+    def test_long_flood_limit_postpones_batch(self):
+        for text in ("First", "Second"):
+            enqueue_notification(text)
+        self.telegram.fail_with(
+            429, "Too Many Requests: retry after 120", retry_after=120
+        )
+        self.process()
+
+        self.assertEqual(self.telegram.messages, [])
+        for notification in Notification.objects.all():
+            self.assertEqual(notification.status, Notification.Status.PENDING)
+            self.assertEqual(notification.attempts, 0)
+            self.assertGreater(
+                notification.next_attempt_at, now() + timedelta(seconds=100)
+            )
+
+    def test_slow_provider_times_out(self):
+        notification = enqueue_notification("Hello")
+        self.telegram.delay = 0.5
+        started = time.monotonic()
+        self.process(breaker=CircuitBreaker(call_timeout=0.1))
+        notification.refresh_from_db()
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(notification.status, Notification.Status.PENDING)
+        self.assertEqual(notification.attempts, 1)
+        self.assertIn("No response", notification.last_error)
+
+    def test_open_breaker_skips_provider(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        self.telegram.fail_with(500, "Internal Server Error", 2)
+        for text in ("First", "Second", "Third"):
+            enqueue_notification(text)
+            self.process(breaker=breaker, batch_size=1)
+        third = Notification.objects.get(text="Third")
+
+        self.assertEqual(self.telegram.requests, 2)
+        self.assertEqual(self.metrics["breaker_state"], CircuitBreaker.OPEN)
+        self.assertEqual(third.attempts, 0)
+        self.assertGreater(
+            third.next_attempt_at, now() + timedelta(seconds=50)
+        )
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    async def fail(self):
+        raise NetworkError("Down")
+
+    async def succeed(self):
+        return "ok"
+
+    def test_trial_call_closes_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        with self.assertRaises(NetworkError):
+            async_to_sync(breaker.call)(self.fail)
+        with self.assertRaises(CircuitOpenError):
+            async_to_sync(breaker.call)(self.succeed)
+        time.sleep(0.1)
+
+        self.assertEqual(async_to_sync(breaker.call)(self.succeed), "ok")
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_trial_call_reopens_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+        for _ in range(3):
+            with self.assertRaises(NetworkError):
+                async_to_sync(breaker.call)(self.fail)
+        time.sleep(0.1)
+        with self.assertRaises(NetworkError):
+            async_to_sync(breaker.call)(self.fail)
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(breaker.metrics()["breaker_times_opened"], 2)
+
+    def test_cancelled_trial_call_reopens_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        with self.assertRaises(NetworkError):
+            async_to_sync(breaker.call)(self.fail)
+        time.sleep(0.1)
+
+        async def cancel_trial():
+            trial = asyncio.ensure_future(breaker.call(asyncio.sleep, 10))
+            await asyncio.sleep(0)
+            trial.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await trial
+
+        async_to_sync(cancel_trial)()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(async_to_sync(breaker.call)(self.succeed), "ok")
+
+    def test_flood_limit_is_not_a_failure(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+
+        async def flood():
+            raise RetryAfter(5)
+
+        with self.assertRaises(RetryAfter):
+            async_to_sync(breaker.call)(flood)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class DigestTests(SimpleTestCase):
+    def test_digests_fit_message_limit(self):
+        texts = ["a" * 3000, "b" * 1100, "c" * 100, "d"]
+        self.assertEqual(build_digests(texts), [[0], [1, 2, 3]])
+        self.assertEqual(build_digests(texts, limit=1100), [[0], [1], [2, 3]])
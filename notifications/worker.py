@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.utils import timezone
+from telegram.error import BadRequest, NetworkError, RetryAfter
+
+from notifications.breaker import CircuitOpenError
+from notifications.models import Notification
+from notifications.outbox import NOTIFY_CHANNEL
+from notifications.sender import get_retry_after
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 2
+BACKOFF_MAX = 15 * 60
+# Claimed rows are hidden from other workers for this long
+LEASE = timedelta(minutes=5)
+UPDATE_FIELDS = (
+    "status",
+    "attempts",
+    "next_attempt_at",
+    "last_error",
+    "sent_at",
+)
+
+
+def get_backoff(attempts):
+    """Seconds to wait before the next attempt: 2, 4, 8, ... 15 minutes."""
+    return min(BACKOFF_BASE**attempts, BACKOFF_MAX)
+
+
+class NotificationWorker:
+    """
+    Send pending outbox notifications through a `TelegramSender`.
+    Due rows are leased with SKIP LOCKED, so several workers can run
+    side by side, and a row leased by a crashed worker is picked up
+    again once the lease runs out. Failed sends are retried with
+    exponential backoff, long flood limits reschedule the row.
+    """
+
+    def __init__(self, sender, batch_size=100, max_attempts=MAX_ATTEMPTS):
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        # LISTEN on a connection of its own, so waiting for
+        # notifications does not hold up the other queries
+        self.listener = ThreadPoolExecutor(max_workers=1)
+        self.listening_on = None
+
+    async def run(self, interval=5.0, stop=None):
+        stop = stop or threading.Event()
+        loop = asyncio.get_running_loop()
+        try:
+            while not stop.is_set():
+                if await self.process_batch() < self.batch_size:
+                    await loop.run_in_executor(
+                        self.listener, self.wait, interval, stop
+                    )
+        finally:
+            await loop.run_in_executor(self.listener, self.stop_listening)
+            self.listener.shutdown()
+
+    async def metrics(self):
+        return {
+            "outbox_pending": await Notification.objects.filter(
+                status=Notification.Status.PENDING
+            ).acount(),
+            **self.sender.metrics(),
+        }
+
+    async def process_batch(self):
+        """Send one batch of due notifications, return its size."""
+        notifications = await sync_to_async(self.claim)()
+        results = await asyncio.gather(
+            *(
+                self.sender.submit(notification.text, notification.chat_id)
+                for notification in notifications
+            ),
+            return_exceptions=True,
+        )
+        for notification, result in zip(notifications, results):
+            self.record(notification, result)
+        await sync_to_async(Notification.objects.bulk_update)(
+            notifications, UPDATE_FIELDS
+        )
+        return len(notifications)
+
+    def claim(self):
+        with transaction.atomic():
+            notifications = list(
+                Notification.objects.select_for_update(skip_locked=True)
+                .filter(
+                    status=Notification.Status.PENDING,
+                    next_attempt_at__lte=timezone.now(),
+                )
+                .order_by("next_attempt_at", "id")[: self.batch_size]
+            )
+            Notification.objects.filter(
+                id__in=[notification.id for notification in notifications]
+            ).update(next_attempt_at=timezone.now() + LEASE)
+        return notifications
+
+    def record(self, notification, error):
+        notification.attempts += 1
+        if error is None:
+            notification.status = Notification.Status.SENT
+            notification.sent_at = timezone.now()
+            notification.last_error = ""
+        elif isinstance(error, RetryAfter):
+            # Flood limits do not count as a failed attempt
+            notification.attempts -= 1
+            self.retry(notification, error, get_retry_after(error))
+        elif isinstance(error, CircuitOpenError):
+            # Not sent at all, wait for the breaker trial call
+            notification.attempts -= 1
+            self.retry(notification, error, error.retry_at - time.time())
+        elif isinstance(error, NetworkError) and not isinstance(
+            error, BadRequest
+        ):
+            if notification.attempts >= self.max_attempts:
+                self.fail(notification, error)
+            else:
+                self.retry(
+                    notification, error, get_backoff(notification.attempts)
+                )
+        else:
+            self.fail(notification, error)
+
+    @staticmethod
+    def retry(notification, error, delay):
+        notification.next_attempt_at = timezone.now() + timedelta(
+            seconds=delay
+        )
+        notification.last_error = str(error)
+
+    @staticmethod
+    def fail(notification, error):
+        notification.status = Notification.Status.FAILED
+        notification.last_error = str(error)
+
+    @staticmethod
+    def stop_listening():
+        connection.close()
+
+    def wait(self, timeout, stop):
+        """Block until a notification is queued, `timeout` or `stop`."""
+        connection.ensure_connection()
+        if self.listening_on is not connection.connection:
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            self.listening_on = connection.connection
+        deadline = time.monotonic() + timeout
+        while not stop.is_set() and (left := deadline - time.monotonic()) > 0:
+            # Wake up every second to notice `stop`
+            for _ in connection.connection.notifies(timeout=min(left, 1)):
+                return
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+
+from throttling.models import ThrottleCounter
+from throttling.throttles import SlidingWindowThrottle
+
+STORES = (
+    "throttling.stores.DatabaseStore",
+    "throttling.stores.CacheStore",
+)
+
+
+class BenchmarkThrottle(SlidingWindowThrottle):
+    scope = "benchmark"
+    rate = "1000000/min"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the cost of a sliding window throttle check per request "
+        "with each counter store, in autocommit like a real request"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20000)
+        parser.add_argument(
+            "--clients", type=int, default=1000, help="Distinct client IPs"
+        )
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        requests = [
+            factory.post(
+                "/", REMOTE_ADDR=f"10.{i // 65536}.{i // 256 % 256}.{i % 256}"
+            )
+            for i in range(options["clients"])
+        ]
+        for path in STORES:
+            try:
+                self.benchmark(path, requests, options)
+            finally:
+                ThrottleCounter.objects.filter(
+                    key__startswith="throttle:benchmark:"
+                ).delete()
+
+    def benchmark(self, path, requests, options):
+        throttle = BenchmarkThrottle()
+        # Without DEBUG query logging, like in production
+        with override_settings(THROTTLE_STORE=path, DEBUG=False):
+            started = time.perf_counter()
+            for i in range(options["requests"]):
+                request = requests[i % len(requests)]
+                request.user = None
+                throttle.allow_request(request, None)
+            elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{path.rsplit('.', 1)[-1]:<14} "
+            f"{elapsed / options['requests'] * 1000:.3f}ms per request"
+        )
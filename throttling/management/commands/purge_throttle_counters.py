@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from throttling.models import ThrottleCounter
+
+
+class Command(BaseCommand):
+    help = "Delete throttle counters of clients idle for two windows"
+
+    def handle(self, *args, **options):
+        deleted, _ = ThrottleCounter.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"{deleted} expired throttle counters deleted")
+        )
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:34
+
+from django.db import migrations, models
+
+# One row per client: hits of the current window roll over into
+# `previous_hits` when the next window starts. A function, because
+# plpgsql caches the plan of the upsert for the session and Django's
+# client side binding cursors can not prepare statements.
+CREATE_HIT_FUNCTION_SQL = """
+    CREATE FUNCTION throttle_hit(
+        hit_key text,
+        hit_window bigint,
+        timeout double precision,
+        OUT hits integer,
+        OUT previous_hits integer
+    )
+    LANGUAGE plpgsql AS $$
+    #variable_conflict use_column
+    BEGIN
+        INSERT INTO throttling_throttlecounter AS counter (
+            key, "window", hits, previous_hits, expires_at
+        )
+        VALUES (
+            hit_key, hit_window, 1, 0,
+            now() + make_interval(secs => timeout)
+        )
+        ON CONFLICT (key) DO UPDATE SET
+            previous_hits = CASE
+                WHEN counter."window" = excluded."window"
+                    THEN counter.previous_hits
+                WHEN counter."window" = excluded."window" - 1
+                    THEN counter.hits
+                ELSE 0
+            END,
+            hits = CASE
+                WHEN counter."window" = excluded."window"
+                    THEN counter.hits + 1
+                ELSE 1
+            END,
+            "window" = excluded."window",
+            expires_at = excluded.expires_at
+        RETURNING counter.hits, counter.previous_hits
+        INTO hits, previous_hits;
+    END
+    $$
+"""
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ThrottleCounter",
+            fields=[
+                (
+                    "key",
+                    models.CharField(
+                        max_length=255, primary_key=True, serialize=False
+                    ),
+                ),
+                ("window", models.BigIntegerField()),
+                ("hits", models.PositiveIntegerField()),
+                ("previous_hits", models.PositiveIntegerField()),
+                ("expires_at", models.DateTimeField()),
+            ],
+        ),
+        # Counters are disposable, skip the WAL write of every hit
+        migrations.RunSQL(
+            "ALTER TABLE throttling_throttlecounter SET UNLOGGED",
+            "ALTER TABLE throttling_throttlecounter SET LOGGED",
+        ),
+        migrations.RunSQL(
+            CREATE_HIT_FUNCTION_SQL,
+            "DROP FUNCTION throttle_hit(text, bigint, double precision)",
+        ),
+    ]
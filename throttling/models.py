@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class ThrottleCounter(models.Model):
+    """Hits of one client of a scope in the current and previous window."""
+
+    key = models.CharField(max_length=255, primary_key=True)
+    window = models.BigIntegerField()
+    hits = models.PositiveIntegerField()
+    previous_hits = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,62 @@
+import math
+from functools import cache
+
+from django.core.cache import caches
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from throttling.models import ThrottleCounter
+
+# See the `throttle_hit` function in the initial migration
+HIT_SQL = "SELECT hits, previous_hits FROM throttle_hit(%s, %s, %s)"
+UNDO_SQL = """
+    UPDATE {table} SET hits = hits - 1
+    WHERE key = %(key)s AND "window" = %(window)s AND hits > 0
+"""
+
+
+@cache
+def get_store(path):
+    return import_string(path)()
+
+
+class DatabaseStore:
+    """
+    Counters in an unlogged Postgres table, one upsert per hit,
+    shared by all worker processes.
+    """
+
+    undo_sql = UNDO_SQL.format(table=ThrottleCounter._meta.db_table)
+
+    def hit(self, key, window, duration):
+        """Count a hit, return hits of the window and the previous one."""
+        with connection.cursor() as cursor:
+            cursor.execute(HIT_SQL, (key, window, 2 * duration))
+            return cursor.fetchone()
+
+    def undo(self, key, window):
+        with connection.cursor() as cursor:
+            cursor.execute(self.undo_sql, {"key": key, "window": window})
+
+
+class CacheStore:
+    """
+    Counters in a Django cache, a key per client and window. `incr`
+    is atomic across processes with Redis and Memcached, the local
+    memory backend counts within one process only.
+    """
+
+    alias = "default"
+
+    def hit(self, key, window, duration):
+        store = caches[self.alias]
+        current = f"{key}:{window}"
+        store.add(current, 0, math.ceil(2 * duration))
+        hits = store.incr(current)
+        return hits, store.get(f"{key}:{window - 1}", 0)
+
+    def undo(self, key, window):
+        try:
+            caches[self.alias].decr(f"{key}:{window}")
+        except ValueError:
+            pass
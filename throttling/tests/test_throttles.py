@@ -0,0 +1,195 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.tests.test_book_api import create_book
+from throttling.models import ThrottleCounter
+from throttling.stores import CacheStore, DatabaseStore
+from throttling.throttles import SlidingWindowThrottle
+
+BORROWING_URL = reverse("borrowings:borrowings-list")
+CHECKOUT_URL = reverse("borrowings:borrowings-checkout")
+TOKEN_URL = reverse("user:token_obtain_pair")
+RATES = {"borrow": "4/min", "token": "2/min"}
+# 15 seconds into a minute window
+START = 1_000_000 * 60 + 15
+
+
+class DatabaseStoreTests(TestCase):
+    store_class = DatabaseStore
+
+    def setUp(self):
+        self.store = self.store_class()
+
+    def test_hits_of_window(self):
+        for expected in (1, 2, 3):
+            self.assertEqual(self.store.hit("key", 10, 60), (expected, 0))
+        self.assertEqual(self.store.hit("other", 10, 60), (1, 0))
+
+    def test_hits_roll_over_to_previous_window(self):
+        self.store.hit("key", 10, 60)
+        self.store.hit("key", 10, 60)
+        self.assertEqual(self.store.hit("key", 11, 60), (1, 2))
+        self.assertEqual(self.store.hit("key", 13, 60), (1, 0))
+
+    def test_undo(self):
+        self.store.hit("key", 10, 60)
+        self.store.hit("key", 10, 60)
+        self.store.undo("key", 10)
+        self.assertEqual(self.store.hit("key", 10, 60), (2, 0))
+
+
+class CacheStoreTests(DatabaseStoreTests):
+    store_class = CacheStore
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+
+@mock.patch.object(SlidingWindowThrottle, "THROTTLE_RATES", RATES)
+class ThrottledEndpointTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.book = create_book(inventory=100)
+
+    def request_at(self, offset, url, data, **kwargs):
+        with mock.patch.object(
+            SlidingWindowThrottle, "timer", return_value=START + offset
+        ):
+            return self.client.post(url, data, **kwargs)
+
+    def borrow_at(self, offset, user=None):
+        self.client.force_authenticate(user or self.user)
+        return self.request_at(
+            offset,
+            CHECKOUT_URL,
+            {
+                "books": [create_book().id],
+                "expected_return_date": now().date() + timedelta(days=5),
+            },
+            format="json",
+        )
+
+    def test_borrow_limit_per_user(self):
+        for _ in range(4):
+            self.assertEqual(
+                self.borrow_at(0).status_code, status.HTTP_201_CREATED
+            )
+        response = self.borrow_at(0)
+        other = get_user_model().objects.create_user(email="other@test.com")
+
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        # The next window starts 45 seconds later, then a quarter
+        # of this window has to slide out
+        self.assertEqual(response["Retry-After"], "60")
+        self.assertEqual(
+            self.borrow_at(0, other).status_code, status.HTTP_201_CREATED
+        )
+
+    def test_borrow_limit_slides(self):
+        for _ in range(4):
+            self.borrow_at(0)
+        # 4 hits of the previous window weigh 3 at a quarter into this one
+        self.assertEqual(
+            self.borrow_at(60).status_code, status.HTTP_201_CREATED
+        )
+        response = self.borrow_at(60)
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertEqual(response["Retry-After"], "15")
+        self.assertEqual(
+            self.borrow_at(75).status_code, status.HTTP_201_CREATED
+        )
+
+    def test_rejected_requests_not_counted(self):
+        for _ in range(10):
+            self.borrow_at(0)
+        self.assertEqual(
+            self.borrow_at(75).status_code, status.HTTP_201_CREATED
+        )
+
+    def test_single_borrow_throttled(self):
+        self.client.force_authenticate(self.user)
+        payload = {
+            "book": self.book.id,
+            "expected_return_date": now().date() + timedelta(days=5),
+        }
+        for _ in range(4):
+            self.request_at(0, BORROWING_URL, payload)
+        response = self.request_at(0, BORROWING_URL, payload)
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+
+    def test_reads_not_throttled(self):
+        self.client.force_authenticate(self.user)
+        for _ in range(6):
+            response = self.client.get(BORROWING_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_token_limit_per_ip(self):
+        credentials = {"email": "user@test.com", "password": "test_password"}
+        responses = [
+            self.request_at(0, TOKEN_URL, credentials) for _ in range(3)
+        ]
+        other_ip = self.request_at(
+            0, TOKEN_URL, credentials, REMOTE_ADDR="10.0.0.2"
+        )
+
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [
+                status.HTTP_200_OK,
+                status.HTTP_200_OK,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+            ],
+        )
+        self.assertIn("Retry-After", responses[-1])
+        self.assertEqual(other_ip.status_code, status.HTTP_200_OK)
+
+    @override_settings(THROTTLE_STORE="throttling.stores.CacheStore")
+    def test_cache_store(self):
+        cache.clear()
+        for _ in range(4):
+            self.borrow_at(0)
+        self.assertEqual(
+            self.borrow_at(0).status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertFalse(ThrottleCounter.objects.exists())
+
+
+class PurgeThrottleCountersTests(TestCase):
+    def test_purge_expired_counters(self):
+        for key, expires_in in (("expired", -1), ("active", 1)):
+            ThrottleCounter.objects.create(
+                key=key,
+                window=1,
+                hits=1,
+                previous_hits=0,
+                expires_at=timezone.now() + timedelta(minutes=expires_in),
+            )
+        out = StringIO()
+        call_command("purge_throttle_counters", stdout=out)
+
+        self.assertIn("1 expired throttle counters deleted", out.getvalue())
+        self.assertEqual(
+            list(ThrottleCounter.objects.values_list("key", flat=True)),
+            ["active"],
+        )
@@ -0,0 +1,61 @@
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from throttling.stores import get_store
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Limit requests of a `scope` per user, or per IP of anonymous
+    clients, over a sliding window. The hits in it are estimated from
+    the counters of the current and the previous fixed window, kept in
+    `settings.THROTTLE_STORE`, so a hit costs one store round trip.
+    Rejected requests are not counted.
+    """
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+        return f"throttle:{self.scope}:{ident}"
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        key = self.get_cache_key(request, view)
+        window, elapsed = divmod(self.timer(), self.duration)
+        window = int(window)
+        store = get_store(settings.THROTTLE_STORE)
+        hits, previous_hits = store.hit(key, window, self.duration)
+
+        weight = 1 - elapsed / self.duration
+        if previous_hits * weight + hits <= self.num_requests:
+            return True
+
+        store.undo(key, window)
+        self.wait_time = self.retry_after(hits - 1, previous_hits, elapsed)
+        return False
+
+    def retry_after(self, hits, previous_hits, elapsed):
+        """Seconds until one more hit fits under the limit."""
+        limit, duration = self.num_requests, self.duration
+        if hits < limit:
+            # Until enough of the previous window slides out
+            fraction = 1 - (limit - hits - 1) / previous_hits
+            return duration * fraction - elapsed
+        # The hits of this window become the previous window
+        fraction = max(0, 1 - (limit - 1) / hits)
+        return duration - elapsed + duration * fraction
+
+    def wait(self):
+        return self.wait_time
+
+
+class BorrowThrottle(SlidingWindowThrottle):
+    scope = "borrow"
+
+
+class TokenThrottle(SlidingWindowThrottle):
+    scope = "token"
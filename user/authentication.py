@@ -0,0 +1,144 @@
+from django.core.cache import cache
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from user.revocation import ais_revoked, is_revoked
+
+PRINCIPAL_CACHE_TIMEOUT = 30
+# Fields of the user that permissions, querysets and `/me/` read,
+# the rest are loaded on first access
+PRINCIPAL_FIELDS = (
+    "id",
+    "email",
+    "first_name",
+    "last_name",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "telegram_chat_id",
+)
+
+
+def principal_cache_key(user_id):
+    return f"user:principal:{user_id}"
+
+
+def invalidate_principal(user_id):
+    """
+    Drop the cached principal right away and once more after commit,
+    so a principal loaded from not yet committed rows is never reused.
+    """
+    key = principal_cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that keeps the principal of the token in the
+    cache for `PRINCIPAL_CACHE_TIMEOUT` seconds instead of loading
+    the user row on every request.
+
+    Saving or deleting a user drops the entry, so deactivation, staff
+    changes and password changes apply to the next request. With a
+    process local cache other workers pick them up within the timeout.
+    Revoked tokens are rejected, see `user.revocation`. Async views
+    authenticate with `aauthenticate`.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_revoked(validated_token):
+            raise InvalidToken(_("Token is revoked"))
+        return validated_token
+
+    async def aauthenticate(self, request):
+        """`authenticate` with the async cache and ORM."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = super().get_validated_token(raw_token)
+        if await ais_revoked(validated_token):
+            raise InvalidToken(_("Token is revoked"))
+        return await self.aget_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        key = principal_cache_key(self.get_user_id(validated_token))
+        principal = cache.get(key)
+        if principal is None:
+            principal = self.to_principal(
+                self.get_principal_rows(validated_token).first()
+            )
+            cache.set(key, principal, PRINCIPAL_CACHE_TIMEOUT)
+        return self.build_user(validated_token, *principal)
+
+    async def aget_user(self, validated_token):
+        key = principal_cache_key(self.get_user_id(validated_token))
+        principal = await cache.aget(key)
+        if principal is None:
+            principal = self.to_principal(
+                await self.get_principal_rows(validated_token).afirst()
+            )
+            await cache.aset(key, principal, PRINCIPAL_CACHE_TIMEOUT)
+        return self.build_user(validated_token, *principal)
+
+    @staticmethod
+    def get_user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as error:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from error
+
+    def get_principal_rows(self, validated_token):
+        return self.user_model.objects.filter(
+            **{api_settings.USER_ID_FIELD: self.get_user_id(validated_token)}
+        ).values(*PRINCIPAL_FIELDS, "password")
+
+    @staticmethod
+    def to_principal(values):
+        """Return `(principal fields, password hash claim)` of the user."""
+        if values is None:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            )
+        return values, get_md5_hash_password(values.pop("password"))
+
+    def build_user(self, validated_token, values, password_hash):
+        if api_settings.CHECK_USER_IS_ACTIVE and not values["is_active"]:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        if (
+            api_settings.CHECK_REVOKE_TOKEN
+            and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+            != password_hash
+        ):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."),
+                code="password_changed",
+            )
+
+        field_names = [
+            field.attname
+            for field in self.user_model._meta.concrete_fields
+            if field.attname in values
+        ]
+        return self.user_model.from_db(
+            router.db_for_read(self.user_model),
+            field_names,
+            [values[name] for name in field_names],
+        )
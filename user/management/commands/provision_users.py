@@ -0,0 +1,49 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from user.provisioning import UserProvisioner
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users from a CSV file with `email,password,first_name,"
+        "last_name` columns, hashing passwords on all cores"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, `-` for stdin")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Password hashing processes, one per core by default",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        provisioner = UserProvisioner(
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            on_error=self.report_error,
+        )
+        path = options["path"]
+        if path == "-":
+            provisioner.run(sys.stdin)
+        else:
+            with open(path, newline="", encoding="utf-8-sig") as file:
+                provisioner.run(file)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created: {provisioner.created}, "
+                f"duplicates: {provisioner.duplicates}, "
+                f"failed: {provisioner.failed} "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        )
+
+    def report_error(self, line, errors):
+        self.stderr.write(f"Line {line}: {json.dumps(errors)}")
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="telegram_chat_id",
+            field=models.BigIntegerField(
+                blank=True, null=True, verbose_name="Telegram chat id"
+            ),
+        ),
+    ]
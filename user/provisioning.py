@@ -0,0 +1,151 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache, partial
+from multiprocessing import get_context
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+PASSWORD_MIN_LENGTH = 8
+
+
+def hash_password(password, hasher):
+    """Hash in a worker process, an empty password is left unusable."""
+    return make_password(password or None, hasher=hasher)
+
+
+def hashing_pool(workers=None):
+    """
+    Worker processes are spawned rather than forked,
+    forking a threaded server copies its locks mid-request.
+    """
+    return ProcessPoolExecutor(workers, mp_context=get_context("spawn"))
+
+
+@cache
+def shared_hashing_pool():
+    """One pool per server process, started by the first provisioning."""
+    return hashing_pool()
+
+
+class UserProvisioner:
+    """
+    Create users from CSV rows (`email,password,first_name,last_name`)
+    in batches. Passwords of a batch are hashed across a process pool,
+    the users are inserted with one `bulk_create`. Emails that are
+    taken already are reported as duplicates without failing the batch.
+
+    A long-lived `pool` is shared between runs, by default every run
+    starts and stops its own.
+    """
+
+    fields = ("email", "first_name", "last_name")
+
+    def __init__(
+        self, batch_size=1000, workers=None, pool=None, on_error=None
+    ):
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count()
+        self.pool = pool
+        self.on_error = on_error
+        self.created = 0
+        self.duplicates = 0
+        self.failed = 0
+
+    def run(self, lines):
+        if self.pool is not None:
+            return self.provision(self.pool, lines)
+        with hashing_pool(self.workers) as pool:
+            return self.provision(pool, lines)
+
+    def provision(self, pool, lines):
+        batch = []
+        reader = csv.DictReader(lines)
+        for row in reader:
+            try:
+                batch.append((reader.line_num, *self.clean(row)))
+            except ValidationError as error:
+                self.failed += 1
+                self.report(reader.line_num, error.message_dict)
+                continue
+
+            if len(batch) >= self.batch_size:
+                self.write(pool, batch)
+                batch = []
+        if batch:
+            self.write(pool, batch)
+        return self
+
+    def clean(self, row):
+        User = get_user_model()
+        values, errors = {}, {}
+        for name in self.fields:
+            field = User._meta.get_field(name)
+            try:
+                values[name] = field.clean(row.get(name) or "", None)
+            except ValidationError as error:
+                errors[name] = error.messages
+        password = row.get("password") or ""
+        if password and len(password) < PASSWORD_MIN_LENGTH:
+            errors["password"] = [
+                f"Ensure this field has at least {PASSWORD_MIN_LENGTH} "
+                "characters."
+            ]
+        if errors:
+            raise ValidationError(errors)
+
+        values["email"] = User.objects.normalize_email(values["email"])
+        return values, password
+
+    def report(self, line, errors):
+        if self.on_error:
+            self.on_error(line, errors)
+
+    def report_duplicate(self, line):
+        self.duplicates += 1
+        self.report(line, {"email": ["User with this email already exists."]})
+
+    def write(self, pool, batch):
+        User = get_user_model()
+        # Skip taken emails before spending hashing time on them
+        taken = set(
+            User.objects.filter(
+                email__in=[values["email"] for _, values, _ in batch]
+            ).values_list("email", flat=True)
+        )
+        rows = []
+        for line, values, password in batch:
+            if values["email"] in taken:
+                self.report_duplicate(line)
+            else:
+                taken.add(values["email"])
+                rows.append((line, values, password))
+        if not rows:
+            return
+
+        hashes = pool.map(
+            # Spawned workers do not see settings changed at runtime
+            partial(hash_password, hasher=get_hasher()),
+            [password for _, _, password in rows],
+            chunksize=max(1, len(rows) // (self.workers * 4)),
+        )
+        users = [
+            User(password=password_hash, **values)
+            for (_, values, _), password_hash in zip(rows, hashes)
+        ]
+        with transaction.atomic():
+            User.objects.bulk_create(users, ignore_conflicts=True)
+            # Emails taken meanwhile keep the hash of the other user
+            inserted = dict(
+                User.objects.filter(
+                    email__in=[user.email for user in users]
+                ).values_list("email", "password")
+            )
+        for (line, _, _), user in zip(rows, users):
+            if inserted.get(user.email) == user.password:
+                self.created += 1
+            else:
+                self.report_duplicate(line)
@@ -0,0 +1,166 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from user.models import RevokedToken
+
+# How long a revocation may take to reach the other workers
+SYNC_INTERVAL = 1
+# Revocations committed up to this late after their `revoked_at`
+# are still picked up by the incremental sync
+SYNC_OVERLAP = timedelta(minutes=1)
+# Full rebuilds drop expired tokens from the filter
+REBUILD_INTERVAL = 60 * 60
+FILTER_CAPACITY = 100_000
+FILTER_ERROR_RATE = 0.001
+
+
+class BloomFilter:
+    """
+    Set of strings that answers "maybe present" or "surely absent"
+    in a fixed `bytearray`, false positives at about `error_rate`
+    while it holds no more than `capacity` items.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, item):
+        # Double hashing of one digest instead of `hashes` digests
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        added = False
+        for position in self.positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & 1 << bit:
+                self.bits[byte] |= 1 << bit
+                added = True
+        self.count += added
+        return added
+
+    def __contains__(self, item):
+        return all(
+            self.bits[position // 8] & 1 << position % 8
+            for position in self.positions(item)
+        )
+
+
+class RevocationFilter:
+    """
+    Per-worker Bloom filter of revoked JTIs. Every `SYNC_INTERVAL`
+    seconds it reads the revocations made since the previous sync,
+    and every `REBUILD_INTERVAL` it is rebuilt from the unexpired ones.
+    Only JTIs the filter may hold are looked up in the database.
+    """
+
+    def __init__(self, capacity=FILTER_CAPACITY, error_rate=FILTER_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom = None
+        self.synced_at = None
+        self.next_sync = 0
+        self.next_rebuild = 0
+        self.lock = threading.Lock()
+
+    def is_revoked(self, jti):
+        self.sync()
+        if jti not in self.bloom:
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    async def ais_revoked(self, jti):
+        if time.monotonic() >= self.next_sync:
+            await sync_to_async(self.sync)()
+        if jti not in self.bloom:
+            return False
+        return await RevokedToken.objects.filter(jti=jti).aexists()
+
+    def add(self, jti):
+        """Put a JTI revoked by this worker into the filter right away."""
+        if self.bloom is not None:
+            self.bloom.add(jti)
+
+    def sync(self):
+        if time.monotonic() < self.next_sync:
+            return
+        with self.lock:
+            now = time.monotonic()
+            if now < self.next_sync:
+                return
+            if (
+                self.bloom is None
+                or now >= self.next_rebuild
+                or self.bloom.count > self.capacity
+            ):
+                self.rebuild()
+                self.next_rebuild = now + REBUILD_INTERVAL
+            else:
+                self.load(
+                    self.bloom,
+                    RevokedToken.objects.filter(
+                        revoked_at__gte=self.synced_at - SYNC_OVERLAP
+                    ),
+                )
+            self.next_sync = now + SYNC_INTERVAL
+
+    def rebuild(self):
+        tokens = RevokedToken.objects.filter(expires_at__gt=timezone.now())
+        # Room for twice the unexpired tokens, so a growing filter
+        # is not rebuilt again right away
+        self.capacity = max(self.capacity, 2 * tokens.count())
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        self.load(bloom, tokens)
+        self.bloom = bloom
+
+    def load(self, bloom, tokens):
+        synced_at = timezone.now()
+        for jti in tokens.values_list("jti", flat=True).iterator(
+            chunk_size=10000
+        ):
+            bloom.add(jti)
+        self.synced_at = synced_at
+
+
+revocations = RevocationFilter()
+
+
+def is_revoked(token):
+    return revocations.is_revoked(token[api_settings.JTI_CLAIM])
+
+
+async def ais_revoked(token):
+    return await revocations.ais_revoked(token[api_settings.JTI_CLAIM])
+
+
+def revoke_token(token, user=None):
+    """Revoke a validated token until it expires."""
+    jti = token[api_settings.JTI_CLAIM]
+    RevokedToken.objects.bulk_create(
+        [
+            RevokedToken(
+                jti=jti,
+                user=user,
+                expires_at=datetime_from_epoch(token["exp"]),
+            )
+        ],
+        ignore_conflicts=True,
+    )
+    # A rolled back revocation only costs a database lookup
+    revocations.add(jti)
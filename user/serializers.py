@@ -1,12 +1,28 @@
+import codecs
+
 from django.contrib.auth import get_user_model, authenticate
 from rest_framework import serializers
 from django.utils.translation import gettext as _
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+
+from user.revocation import is_revoked, revoke_token
+
+PROVISION_MAX_ROWS = 50_000
 
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = get_user_model()
-        fields = ("id", "email", "password", "is_staff")
+        fields = (
+            "id",
+            "email",
+            "password",
+            "is_staff",
+            "telegram_chat_id",
+        )
         read_only_fields = ("id", "is_staff")
         extra_kwargs = {
             "password": {
@@ -65,3 +81,73 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs["user"] = user
         return attrs
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    def validate(self, attrs):
+        if is_revoked(self.token_class(attrs["refresh"])):
+            raise TokenError(_("Token is revoked"))
+        return super().validate(attrs)
+
+
+class TokenVerifySerializer(jwt_serializers.TokenVerifySerializer):
+    def validate(self, attrs):
+        if is_revoked(UntypedToken(attrs["token"])):
+            raise TokenError(_("Token is revoked"))
+        return super().validate(attrs)
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(
+        required=False,
+        write_only=True,
+        help_text=_("Refresh token to revoke with the access token"),
+    )
+
+    def validate_refresh(self, value):
+        try:
+            refresh = RefreshToken(value)
+        except TokenError as error:
+            raise serializers.ValidationError(error.args[0])
+        user = self.context["request"].user
+        if str(refresh[api_settings.USER_ID_CLAIM]) != str(user.id):
+            raise serializers.ValidationError(_("Token of another user."))
+        return refresh
+
+    def save(self):
+        request = self.context["request"]
+        for token in (request.auth, self.validated_data.get("refresh")):
+            if token is not None:
+                revoke_token(token, request.user)
+
+
+class UserProvisionSerializer(serializers.Serializer):
+    file = serializers.FileField(
+        help_text=_("CSV with `email,password,first_name,last_name` columns")
+    )
+
+    def validate_file(self, file):
+        """
+        Check the encoding and the number of lines up front, the file
+        is then read again batch by batch while users are created.
+        """
+        lines = 0
+        try:
+            for line in codecs.iterdecode(file, "utf-8-sig"):
+                lines += 1
+        except UnicodeDecodeError:
+            raise serializers.ValidationError(
+                _("Line %(line)s is not valid UTF-8 text.")
+                % {"line": lines + 1}
+            )
+        # The header and the users
+        if lines > PROVISION_MAX_ROWS + 1:
+            raise serializers.ValidationError(
+                _(
+                    "Ensure this file has no more than %(count)s users, "
+                    "provision more with the `provision_users` command."
+                )
+                % {"count": PROVISION_MAX_ROWS}
+            )
+        file.seek(0)
+        return file
@@ -0,0 +1,11 @@
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from user.authentication import invalidate_principal
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def drop_cached_principal_on_change(sender, instance, **kwargs):
+    invalidate_principal(instance.pk)
@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings
+
+from books.tests.test_book_api import BOOK_URL, create_book
+from user.revocation import RevocationFilter
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+ME_URL = reverse("user:manage_user")
+
+
+@mock.patch("user.revocation.revocations", RevocationFilter())
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.authorize()
+
+    def authorize(self, password="test_password"):
+        response = self.client.post(
+            TOKEN_URL, {"email": self.user.email, "password": password}
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZE=f"Bearer {response.data['access']}"
+        )
+
+    def test_authenticated_reads_skip_user_query(self):
+        create_book()
+        self.client.get(BOOK_URL)
+        # The book list and the principal both come from the cache
+        with self.assertNumQueries(0):
+            response = self.client.get(BOOK_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_me_from_cached_principal(self):
+        self.client.get(ME_URL)
+        with self.assertNumQueries(0):
+            response = self.client.get(ME_URL)
+        self.assertEqual(response.data["email"], self.user.email)
+
+    def test_update_me(self):
+        response = self.client.patch(ME_URL, {"telegram_chat_id": 42})
+        self.user.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.user.telegram_chat_id, 42)
+        self.assertTrue(self.user.check_password("test_password"))
+        self.assertEqual(self.client.get(ME_URL).data["telegram_chat_id"], 42)
+
+    def test_staff_change_applies_to_next_request(self):
+        payload = {
+            "title": "Dune",
+            "author": "Frank Herbert",
+            "cover": "Hard",
+            "inventory": 1,
+            "daily_fee": 1,
+        }
+        response_1 = self.client.post(BOOK_URL, payload)
+        self.user.is_staff = True
+        self.user.save()
+        response_2 = self.client.post(BOOK_URL, payload)
+
+        self.assertEqual(response_1.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response_2.status_code, status.HTTP_201_CREATED)
+
+    def test_deactivated_user_rejected(self):
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_rejected(self):
+        self.client.get(ME_URL)
+        self.user.delete()
+        response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    # simplejwt keeps its settings object across `override_settings`
+    @mock.patch.object(api_settings, "CHECK_REVOKE_TOKEN", True)
+    def test_password_change_revokes_tokens(self):
+        self.authorize()
+        self.client.get(ME_URL)
+        self.user.set_password("new_password")
+        self.user.save()
+        response_1 = self.client.get(ME_URL)
+        self.authorize("new_password")
+        response_2 = self.client.get(ME_URL)
+
+        self.assertEqual(response_1.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response_2.status_code, status.HTTP_200_OK)
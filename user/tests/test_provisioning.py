@@ -0,0 +1,153 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.provisioning import UserProvisioner
+from user.serializers import PROVISION_MAX_ROWS
+
+PROVISION_URL = reverse("user:provision")
+USERS_CSV = (
+    "email,password,first_name,last_name\n"
+    "ann@school.test,ann_password,Ann,Lee\n"
+    "bob@School.TEST,bob_password,Bob,\n"
+    "taken@test.com,taken_password,,\n"
+    "not-an-email,short,,\n"
+    "ann@school.test,other_password,Ann,Twice\n"
+    "eve@school.test,,Eve,\n"
+)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class ProvisionUsersTests(TestCase):
+    def setUp(self):
+        get_user_model().objects.create_user(email="taken@test.com")
+
+    def test_provision_users(self):
+        errors = {}
+        provisioner = UserProvisioner(
+            batch_size=2, workers=2, on_error=errors.__setitem__
+        ).run(StringIO(USERS_CSV))
+        users = get_user_model().objects
+
+        self.assertEqual(
+            (provisioner.created, provisioner.duplicates, provisioner.failed),
+            (3, 2, 1),
+        )
+        self.assertEqual(sorted(errors), [4, 5, 6])
+        self.assertEqual(set(errors[5]), {"email", "password"})
+        self.assertTrue(
+            users.get(email="ann@school.test").check_password("ann_password")
+        )
+        self.assertEqual(users.get(email="ann@school.test").last_name, "Lee")
+        self.assertTrue(
+            users.get(email="bob@school.test").check_password("bob_password")
+        )
+        self.assertFalse(
+            users.get(email="eve@school.test").has_usable_password()
+        )
+
+    def test_provision_users_command(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "users.csv"
+        path.write_text(USERS_CSV, encoding="utf-8")
+        out, err = StringIO(), StringIO()
+        call_command(
+            "provision_users", str(path), "--workers=1", stdout=out, stderr=err
+        )
+
+        self.assertIn("Created: 3, duplicates: 2, failed: 1", out.getvalue())
+        self.assertIn("Line 4:", err.getvalue())
+
+    def test_provision_users_endpoint(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@test.com", password="test_password"
+            )
+        )
+        upload = SimpleUploadedFile("users.csv", USERS_CSV.encode())
+        response = self.client.post(
+            PROVISION_URL, {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [response.data[key] for key in ("created", "duplicates")], [3, 2]
+        )
+        self.assertEqual(
+            sorted(error["line"] for error in response.data["errors"]),
+            [4, 5, 6],
+        )
+
+    def test_provision_users_endpoint_rows_limit(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@test.com", password="test_password"
+            )
+        )
+        rows = "".join(
+            f"user{i}@school.test,,,\n" for i in range(PROVISION_MAX_ROWS + 1)
+        )
+        upload = SimpleUploadedFile(
+            "users.csv",
+            f"email,password,first_name,last_name\n{rows}".encode(),
+        )
+        response = self.client.post(
+            PROVISION_URL, {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("file", response.data)
+        self.assertFalse(
+            get_user_model().objects.filter(email="user0@school.test").exists()
+        )
+
+    def test_provision_users_endpoint_invalid_utf8(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@test.com", password="test_password"
+            )
+        )
+        upload = SimpleUploadedFile(
+            "users.csv",
+            b"email,password,first_name,last_name\n"
+            b"ann@school.test,ann_password,Ann,Lee\n"
+            b"jose@school.test,jose_password,Jos\xe9,\n",
+        )
+        response = self.client.post(
+            PROVISION_URL, {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Line 3", str(response.data["file"][0]))
+        self.assertFalse(
+            get_user_model().objects.filter(email="ann@school.test").exists()
+        )
+
+    def test_provision_users_endpoint_admin_only(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.get(email="taken@test.com")
+        )
+        upload = SimpleUploadedFile("users.csv", USERS_CSV.encode())
+        response = self.client.post(
+            PROVISION_URL, {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(
+            get_user_model().objects.filter(email="ann@school.test").exists()
+        )
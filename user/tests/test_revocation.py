@@ -0,0 +1,178 @@
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.models import RevokedToken
+from user.revocation import (
+    SYNC_INTERVAL,
+    BloomFilter,
+    RevocationFilter,
+    revoke_token,
+)
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+REFRESH_URL = reverse("user:token_refresh")
+VERIFY_URL = reverse("user:token_verify")
+LOGOUT_URL = reverse("user:logout")
+ME_URL = reverse("user:manage_user")
+
+
+class BloomFilterTests(TestCase):
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"revoked-{i}")
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+
+        self.assertTrue(all(f"revoked-{i}" in bloom for i in range(1000)))
+        self.assertLess(false_positives, 200)
+
+
+class RevocationFilterTests(TestCase):
+    def setUp(self):
+        self.worker = RevocationFilter()
+        self.worker.sync()
+
+    def revoke(self, jti, expires_in=timedelta(minutes=5)):
+        return RevokedToken.objects.create(
+            jti=jti, expires_at=timezone.now() + expires_in
+        )
+
+    def test_unrevoked_token_checked_without_queries(self):
+        with self.assertNumQueries(0):
+            self.assertFalse(self.worker.is_revoked("unknown"))
+
+    def test_false_positive_looked_up_in_database(self):
+        self.worker.bloom.add("not-revoked")
+        with self.assertNumQueries(1):
+            self.assertFalse(self.worker.is_revoked("not-revoked"))
+
+    def test_revocation_reaches_other_workers_after_sync_interval(self):
+        other = RevocationFilter()
+        other.sync()
+        with mock.patch("user.revocation.revocations", self.worker):
+            revoke_token({"jti": "stolen", "exp": time.time() + 300})
+        now = time.monotonic()
+
+        self.assertTrue(self.worker.is_revoked("stolen"))
+        self.assertFalse(other.is_revoked("stolen"))
+        with mock.patch("time.monotonic", return_value=now + SYNC_INTERVAL):
+            self.assertTrue(other.is_revoked("stolen"))
+
+    def test_rebuild_drops_expired_tokens(self):
+        self.revoke("expired", expires_in=timedelta(minutes=-1))
+        self.revoke("active")
+        worker = RevocationFilter()
+        worker.sync()
+
+        self.assertNotIn("expired", worker.bloom)
+        self.assertIn("active", worker.bloom)
+
+    def test_filter_grows_when_full(self):
+        worker = RevocationFilter(capacity=10)
+        worker.sync()
+        for i in range(20):
+            self.revoke(f"token-{i}")
+        worker.next_sync = 0
+        worker.sync()
+        worker.next_sync = 0
+        worker.sync()
+
+        self.assertEqual(worker.capacity, 40)
+        self.assertTrue(worker.is_revoked("token-19"))
+
+
+@mock.patch("user.revocation.revocations", RevocationFilter())
+class LogoutApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.tokens = self.obtain_tokens()
+        self.client.credentials(
+            HTTP_AUTHORIZE=f"Bearer {self.tokens['access']}"
+        )
+
+    def obtain_tokens(self):
+        return self.client.post(
+            TOKEN_URL, {"email": self.user.email, "password": "test_password"}
+        ).data
+
+    def test_logout_revokes_tokens(self):
+        response = self.client.post(
+            LOGOUT_URL, {"refresh": self.tokens["refresh"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        responses = (
+            self.client.get(ME_URL),
+            self.client.post(REFRESH_URL, {"refresh": self.tokens["refresh"]}),
+            self.client.post(VERIFY_URL, {"token": self.tokens["access"]}),
+        )
+        for response in responses:
+            self.assertEqual(
+                response.status_code, status.HTTP_401_UNAUTHORIZED
+            )
+        self.assertEqual(
+            RevokedToken.objects.filter(user=self.user).count(), 2
+        )
+
+    def test_other_tokens_stay_valid(self):
+        other_tokens = self.obtain_tokens()
+        self.client.post(LOGOUT_URL)
+        self.client.credentials(
+            HTTP_AUTHORIZE=f"Bearer {other_tokens['access']}"
+        )
+
+        response_1 = self.client.get(ME_URL)
+        response_2 = self.client.post(
+            REFRESH_URL, {"refresh": self.tokens["refresh"]}
+        )
+        self.assertEqual(response_1.status_code, status.HTTP_200_OK)
+        self.assertEqual(response_2.status_code, status.HTTP_200_OK)
+
+    def test_logout_with_refresh_of_other_user_rejected(self):
+        get_user_model().objects.create_user(
+            email="other@test.com", password="test_password"
+        )
+        other_tokens = self.client.post(
+            TOKEN_URL, {"email": "other@test.com", "password": "test_password"}
+        ).data
+        response = self.client.post(
+            LOGOUT_URL, {"refresh": other_tokens["refresh"]}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(RevokedToken.objects.exists())
+
+    def test_logout_auth_required(self):
+        self.client.credentials()
+        response = self.client.post(LOGOUT_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PurgeRevokedTokensTests(TestCase):
+    def test_purge_expired_tokens(self):
+        for jti, expires_in in (("expired", -1), ("active", 1)):
+            RevokedToken.objects.create(
+                jti=jti,
+                expires_at=timezone.now() + timedelta(minutes=expires_in),
+            )
+        out = StringIO()
+        call_command("purge_revoked_tokens", stdout=out)
+
+        self.assertIn("1 expired revoked tokens deleted", out.getvalue())
+        self.assertEqual(
+            list(RevokedToken.objects.values_list("jti", flat=True)),
+            ["active"],
+        )
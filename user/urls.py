@@ -5,14 +5,26 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
-from user.views import CreateUserView, ManageUserView
+from throttling.throttles import TokenThrottle
+from user.views import (
+    CreateUserView,
+    ManageUserView,
+    LogoutView,
+    ProvisionUsersView,
+)
 
 app_name = "user"
 
 urlpatterns = [
     path("register/", CreateUserView.as_view(), name="create_user"),
-    path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path(
+        "token/",
+        TokenObtainPairView.as_view(throttle_classes=[TokenThrottle]),
+        name="token_obtain_pair",
+    ),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
     path("me/", ManageUserView.as_view(), name="manage_user"),
+    path("logout/", LogoutView.as_view(), name="logout"),
+    path("provision/", ProvisionUsersView.as_view(), name="provision"),
 ]
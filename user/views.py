@@ -1,9 +1,23 @@
-from rest_framework import generics
+import codecs
+
+from drf_spectacular.utils import extend_schema
+from rest_framework import generics, status
 from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 
-from user.serializers import UserSerializer, AuthTokenSerializer
+from user.serializers import (
+    PROVISION_MAX_ROWS,
+    UserSerializer,
+    AuthTokenSerializer,
+    LogoutSerializer,
+    UserProvisionSerializer,
+)
+from user.provisioning import UserProvisioner, shared_hashing_pool
+
+PROVISION_REPORTED_ERRORS = 100
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -21,3 +35,57 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
 
     def get_object(self):
         return self.request.user
+
+
+class LogoutView(generics.GenericAPIView):
+    """Revoke the access token of the request and the given refresh token."""
+
+    serializer_class = LogoutSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ProvisionUsersView(generics.GenericAPIView):
+    serializer_class = UserProvisionSerializer
+    permission_classes = (IsAdminUser,)
+    parser_classes = (MultiPartParser,)
+
+    @extend_schema(
+        description=(
+            "Bulk create up to "
+            f"{PROVISION_MAX_ROWS} users from a CSV file (admin only). "
+            "Invalid rows and taken emails are skipped, the first "
+            f"{PROVISION_REPORTED_ERRORS} of them are reported with "
+            "their line numbers."
+        ),
+    )
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        errors = []
+
+        def report_error(line, line_errors):
+            if len(errors) < PROVISION_REPORTED_ERRORS:
+                errors.append({"line": line, "errors": line_errors})
+
+        provisioner = UserProvisioner(
+            pool=shared_hashing_pool(), on_error=report_error
+        ).run(
+            codecs.iterdecode(serializer.validated_data["file"], "utf-8-sig")
+        )
+
+        return Response(
+            {
+                "created": provisioner.created,
+                "duplicates": provisioner.duplicates,
+                "failed": provisioner.failed,
+                "errors": errors,
+            },
+            status=status.HTTP_200_OK,
+        )